@@ -1,33 +1,66 @@
-from fastapi import APIRouter, Query, Depends
+from fastapi import APIRouter, Query, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
 
 from app.core.database import get_db
+from app.core.cache import cached_response, conditional_get
 from app.services.database_service import DatabaseService
+from app.services.analytics_query_service import AnalyticsQueryService, QueryCostExceeded
+from app.services.columnar_job_store import ColumnarJobStore, columnar_job_store
+from app.services.latency_sketch_service import LatencySketchService
+from app.services.cost_accounting_service import CostAccountingService
+from app.services.user_activity_service import user_activity_tracker
+from app.services.usage_heatmap_service import usage_heatmap, utc_offset_hours
+from app.services.throughput_service import throughput_counters
+from app.schemas.quantum_schemas import AnalyticsQuery
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
-@router.get("/job-trends")
+ENGINE_QUERY = Query("sql", regex="^(sql|columnar)$", description="sql or columnar (in-memory store)")
+
+def columnar_engine() -> ColumnarJobStore:
+    if not columnar_job_store.loaded:
+        raise HTTPException(status_code=400, detail="The columnar engine is not available (disabled or still loading)")
+    return columnar_job_store
+
+@router.post("/query")
+@cached_response('jobs')
+async def run_analytics_query(spec: AnalyticsQuery, db: Session = Depends(get_db)):
+    """Aggregate jobs by dimensions (backend, status, user, program_id, time) into metrics"""
+    try:
+        return AnalyticsQueryService(db).run(spec)
+    except (ValueError, QueryCostExceeded) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/job-trends", dependencies=[Depends(conditional_get('jobs'))])
+@cached_response('jobs')
 async def get_job_trends(
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
+    engine: str = ENGINE_QUERY,
     db: Session = Depends(get_db)
 ):
     """Get job trends over time"""
+    if engine == 'columnar':
+        return columnar_engine().job_trends(datetime.now() - timedelta(days=days))
     db_service = DatabaseService(db)
     return await db_service.get_job_trends(days)
 
-@router.get("/backend-utilization")
-async def get_backend_utilization(db: Session = Depends(get_db)):
+@router.get("/backend-utilization", dependencies=[Depends(conditional_get('jobs'))])
+@cached_response('jobs')
+async def get_backend_utilization(engine: str = ENGINE_QUERY, db: Session = Depends(get_db)):
     """Get backend utilization data"""
+    if engine == 'columnar':
+        return columnar_engine().backend_utilization(datetime.now() - timedelta(days=7))
     db_service = DatabaseService(db)
     return await db_service.get_backend_utilization()
 
-@router.get("/status-distribution")
-async def get_status_distribution(db: Session = Depends(get_db)):
+@router.get("/status-distribution", dependencies=[Depends(conditional_get('jobs'))])
+@cached_response('jobs')
+async def get_status_distribution(engine: str = ENGINE_QUERY, db: Session = Depends(get_db)):
     """Get distribution of job statuses"""
     db_service = DatabaseService(db)
-    stats = await db_service.get_job_statistics()
+    stats = columnar_engine().job_statistics() if engine == 'columnar' else await db_service.get_job_statistics()
     
     total = stats['total_jobs']
     if total == 0:
@@ -43,14 +76,37 @@ async def get_status_distribution(db: Session = Depends(get_db)):
     
     return {"distribution": distribution, "total_jobs": total}
 
-@router.get("/backend-comparison")
-async def get_backend_comparison(db: Session = Depends(get_db)):
+@router.get("/latency", dependencies=[Depends(conditional_get('jobs'))])
+@cached_response('jobs')
+async def get_backend_latency(
+    days: int = Query(30, ge=1, le=365, description="Number of days to include"),
+    backend: Optional[str] = Query(None, description="Restrict to one backend"),
+    db: Session = Depends(get_db)
+):
+    """p50/p90/p99 queue and execution times per backend, from the daily latency sketches"""
+    since = (datetime.utcnow() - timedelta(days=days)).date()
+    return {
+        "since": since.isoformat(),
+        "backends": LatencySketchService(db).backend_latency(since=since, backend=backend)
+    }
+
+@router.get("/throughput")
+async def get_throughput(backend: Optional[str] = Query(None, description="Restrict to one backend")):
+    """Submitted, started and completed jobs over the last 1h, 24h, 7d and 30d"""
+    return {"backend": backend, **throughput_counters.summary(backend)}
+
+@router.get("/backend-comparison", dependencies=[Depends(conditional_get('jobs', 'backends', 'queue'))])
+@cached_response('jobs', 'backends', 'queue')
+async def get_backend_comparison(engine: str = ENGINE_QUERY, db: Session = Depends(get_db)):
     """Compare backends by various metrics"""
     db_service = DatabaseService(db)
     
     backends = await db_service.get_all_backends()
     queue_info = await db_service.get_queue_info()
-    utilization = await db_service.get_backend_utilization()
+    if engine == 'columnar':
+        utilization = columnar_engine().backend_utilization(datetime.now() - timedelta(days=7))
+    else:
+        utilization = await db_service.get_backend_utilization()
     
     # Create comparison data
     comparison = []
@@ -75,12 +131,14 @@ async def get_backend_comparison(db: Session = Depends(get_db)):
     
     return {"backends": comparison}
 
-@router.get("/performance-metrics")
-async def get_performance_metrics(db: Session = Depends(get_db)):
+@router.get("/performance-metrics", dependencies=[Depends(conditional_get('jobs', 'backends', 'queue'))])
+@cached_response('jobs', 'backends', 'queue')
+async def get_performance_metrics(engine: str = ENGINE_QUERY, db: Session = Depends(get_db)):
     """Get performance metrics and KPIs"""
     db_service = DatabaseService(db)
     
-    job_stats = await db_service.get_job_statistics()
+    job_stats = columnar_engine().job_statistics() if engine == 'columnar' else await db_service.get_job_statistics()
+    latency = LatencySketchService(db).overall_latency()
     backend_stats = await db_service.get_backend_statistics()
     
     # Calculate success rate
@@ -97,58 +155,62 @@ async def get_performance_metrics(db: Session = Depends(get_db)):
         "system_availability": round(system_availability, 2),
         "average_queue_time": job_stats.get('average_queue_time'),
         "average_execution_time": job_stats.get('average_execution_time'),
+        "queue_time_percentiles": latency['queue_time'],
+        "execution_time_percentiles": latency['execution_time'],
         "total_quantum_time": sum([
             job_stats['completed_jobs'] * (job_stats.get('average_execution_time', 0) or 0)
         ]),
-        "throughput": {
-            "jobs_per_day": job_stats['total_jobs'] / 30,  # Assuming 30-day average
-            "jobs_per_hour": job_stats['total_jobs'] / (30 * 24)
-        }
+        "throughput": throughput_counters.summary()
     }
 
-@router.get("/cost-analysis")
-async def get_cost_analysis(db: Session = Depends(get_db)):
-    """Get cost analysis data"""
-    # This would require actual cost data from IBM Quantum
-    # For now, return mock data
-    return {
-        "total_cost": 1250.75,
-        "average_job_cost": 2.34,
-        "cost_by_backend": [
-            {"backend": "ibm_sherbrooke", "cost": 450.25},
-            {"backend": "ibm_kyiv", "cost": 380.50},
-            {"backend": "ibm_torino", "cost": 420.00}
-        ],
-        "cost_trends": [
-            {"date": "2024-01-01", "cost": 45.50},
-            {"date": "2024-01-02", "cost": 52.25},
-            {"date": "2024-01-03", "cost": 38.75}
-        ]
-    }
+@router.get("/cost-analysis", dependencies=[Depends(conditional_get('jobs'))])
+@cached_response('jobs')
+async def get_cost_analysis(
+    start_date: Optional[date] = Query(None, description="First creation day (defaults to 30 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last creation day, inclusive (defaults to today, UTC)"),
+    top_users: int = Query(10, ge=1, le=100, description="Number of users in cost_by_user"),
+    db: Session = Depends(get_db)
+):
+    """Get cost analysis data from the daily cost totals"""
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - timedelta(days=30)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    return CostAccountingService(db).analysis(start_date, end_date, top_users=top_users)
 
-@router.get("/user-activity")
-async def get_user_activity(db: Session = Depends(get_db)):
-    """Get user activity analytics"""
-    # Mock user activity data
-    return {
-        "active_users": 245,
-        "new_users_this_week": 15,
-        "top_users": [
-            {"user_id": "user_123", "job_count": 45, "total_shots": 125000},
-            {"user_id": "user_456", "job_count": 38, "total_shots": 98000},
-            {"user_id": "user_789", "job_count": 32, "total_shots": 87500}
-        ],
-        "user_distribution": [
-            {"category": "Research", "count": 120},
-            {"category": "Education", "count": 85},
-            {"category": "Industry", "count": 40}
-        ]
-    }
+@router.get("/user-activity", dependencies=[Depends(conditional_get('jobs'))])
+@cached_response('jobs')
+async def get_user_activity(
+    days: int = Query(7, ge=1, le=365, description="Days of daily/weekly active users"),
+    top: int = Query(10, ge=1, le=100, description="Number of top users"),
+):
+    """Get user activity analytics (distinct users are HyperLogLog estimates, top users space-saving estimates)"""
+    return user_activity_tracker.summary(days=days, top=top)
+
+@router.get("/heatmap", dependencies=[Depends(conditional_get('jobs'))])
+@cached_response('jobs')
+async def get_usage_heatmap(
+    metric: str = Query("submissions", regex="^(submissions|running)$", description="submissions or running (job-hours)"),
+    backend: Optional[str] = Query(None, description="Restrict to one backend"),
+    tz: Optional[str] = Query(None, description="IANA timezone or UTC offset such as +02:00"),
+):
+    """Hour-of-week (7x24) heatmap of job submissions or running-job load"""
+    try:
+        return usage_heatmap.heatmap(metric=metric, backend=backend, tz=tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/regional-stats")
-async def get_regional_statistics(db: Session = Depends(get_db)):
+async def get_regional_statistics(
+    tz: Optional[str] = Query(None, description="Timezone of peak_hours (IANA name or UTC offset)"),
+    db: Session = Depends(get_db)
+):
     """Get regional usage statistics"""
-    # Mock regional data
+    try:
+        offset = utc_offset_hours(tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Mock regional data; peak hours come from the usage heatmap
     return {
         "regions": [
             {"region": "North America", "users": 125, "jobs": 2450},
@@ -156,9 +218,5 @@ async def get_regional_statistics(db: Session = Depends(get_db)):
             {"region": "Asia Pacific", "users": 67, "jobs": 1340},
             {"region": "Other", "users": 12, "jobs": 180}
         ],
-        "peak_hours": [
-            {"hour": 14, "job_count": 45},
-            {"hour": 15, "job_count": 52},
-            {"hour": 16, "job_count": 38}
-        ]
+        "peak_hours": usage_heatmap.peak_hours(top=3, offset_hours=offset)
     }
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.cache import conditional_get
 from app.services.quantum_service import quantum_service
 from app.services.database_service import DatabaseService
+from app.services.data_sync_service import data_sync_service
+from app.services.recommendation_service import recommendation_service
+from app.services.fast_read_service import FastReadService, json_bytes_response
+from app.models.quantum_models import QuantumBackend
 from app.schemas.quantum_schemas import QuantumBackendSchema
+from app.utils.helpers import format_timestamp, parse_csv_param
 
 router = APIRouter(prefix="/backends", tags=["Backends"])
 
@@ -49,14 +56,27 @@ async def get_all_backends_live_metrics():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting live metrics: {str(e)}")
 
-@router.get("/", response_model=List[QuantumBackendSchema])
-async def get_all_backends(db: Session = Depends(get_db)):
+@router.get("/recommend", dependencies=[Depends(conditional_get('jobs', 'backends', 'queue'))])
+async def recommend_backends(
+    min_qubits: int = Query(0, ge=0, description="Minimum number of qubits"),
+    max_wait: Optional[float] = Query(None, ge=0, description="Maximum predicted queue wait in seconds"),
+    required_gates: Optional[str] = Query(None, description="Comma-separated basis gates the backend must support"),
+    limit: int = Query(5, ge=1, le=50, description="Number of backends to return"),
+):
+    """Recommend operational real devices ranked by predicted wait, error rate and qubit count"""
+    return {
+        "recommendations": recommendation_service.recommend(
+            min_qubits=min_qubits, max_wait=max_wait, required_gates=parse_csv_param(required_gates), limit=limit
+        ),
+        "ranked_at": format_timestamp(recommendation_service.updated_at)
+    }
+
+@router.get("/", response_model=List[QuantumBackendSchema], dependencies=[Depends(conditional_get('backends'))])
+async def get_all_backends(response: Response, db: Session = Depends(get_db)):
     """Get all quantum backends"""
-    db_service = DatabaseService(db)
-    backends = await db_service.get_all_backends()
-    return [QuantumBackendSchema.from_orm(backend) for backend in backends]
+    return json_bytes_response(FastReadService(db).backends(), response)
 
-@router.get("/{backend_name}", response_model=QuantumBackendSchema)
+@router.get("/{backend_name}", response_model=QuantumBackendSchema, dependencies=[Depends(conditional_get('backends'))])
 async def get_backend(
     backend_name: str,
     db: Session = Depends(get_db)
@@ -81,51 +101,37 @@ async def sync_backends_from_ibm(
 
 async def sync_backends_task(db: Session):
     """Background task to sync backends from IBM Quantum"""
-    try:
-        backends_data = await quantum_service.get_all_backends()
-        
-        db_service = DatabaseService(db)
-        await db_service.bulk_upsert_backends(backends_data)
-        
-        print(f"Successfully synced {len(backends_data)} backends")
-    except Exception as e:
-        print(f"Error syncing backends: {e}")
+    await data_sync_service.sync_backends()
 
-@router.get("/stats/overview")
+@router.get("/stats/overview", dependencies=[Depends(conditional_get('backends', 'queue'))])
 async def get_backend_statistics(db: Session = Depends(get_db)):
     """Get backend statistics overview"""
     db_service = DatabaseService(db)
     return await db_service.get_backend_statistics()
 
-@router.get("/utilization/weekly")
+@router.get("/utilization/weekly", dependencies=[Depends(conditional_get('jobs'))])
 async def get_backend_utilization(db: Session = Depends(get_db)):
     """Get backend utilization data"""
     db_service = DatabaseService(db)
     return await db_service.get_backend_utilization()
 
-@router.get("/filter/operational")
-async def get_operational_backends(db: Session = Depends(get_db)):
+@router.get("/filter/operational", dependencies=[Depends(conditional_get('backends'))])
+async def get_operational_backends(response: Response, db: Session = Depends(get_db)):
     """Get only operational backends"""
-    db_service = DatabaseService(db)
-    backends = await db_service.get_all_backends()
-    operational = [backend for backend in backends if backend.status == 'operational']
-    return [QuantumBackendSchema.from_orm(backend) for backend in operational]
+    payload = FastReadService(db).backends(QuantumBackend.status == 'operational')
+    return json_bytes_response(payload, response)
 
-@router.get("/filter/simulators")
-async def get_simulators(db: Session = Depends(get_db)):
+@router.get("/filter/simulators", dependencies=[Depends(conditional_get('backends'))])
+async def get_simulators(response: Response, db: Session = Depends(get_db)):
     """Get only simulator backends"""
-    db_service = DatabaseService(db)
-    backends = await db_service.get_all_backends()
-    simulators = [backend for backend in backends if backend.simulator]
-    return [QuantumBackendSchema.from_orm(backend) for backend in simulators]
+    payload = FastReadService(db).backends(QuantumBackend.simulator.is_(True))
+    return json_bytes_response(payload, response)
 
-@router.get("/filter/real-devices")
-async def get_real_devices(db: Session = Depends(get_db)):
+@router.get("/filter/real-devices", dependencies=[Depends(conditional_get('backends'))])
+async def get_real_devices(response: Response, db: Session = Depends(get_db)):
     """Get only real quantum device backends"""
-    db_service = DatabaseService(db)
-    backends = await db_service.get_all_backends()
-    real_devices = [backend for backend in backends if not backend.simulator]
-    return [QuantumBackendSchema.from_orm(backend) for backend in real_devices]
+    payload = FastReadService(db).backends(or_(QuantumBackend.simulator.is_(False), QuantumBackend.simulator.is_(None)))
+    return json_bytes_response(payload, response)
 
 @router.get("/{backend_name}/live-status")
 async def get_backend_live_status(backend_name: str):
@@ -139,7 +145,7 @@ async def get_backend_live_status(backend_name: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting live status: {str(e)}")
 
-@router.get("/{backend_name}/queue")
+@router.get("/{backend_name}/queue", dependencies=[Depends(conditional_get('queue'))])
 async def get_backend_queue_info(
     backend_name: str,
     db: Session = Depends(get_db)
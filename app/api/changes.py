@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional
+import asyncio
+
+from app.core.database import SessionLocal
+from app.services.change_log_service import ENTITIES, ChangeLogService, change_notifier
+
+router = APIRouter(prefix="/changes", tags=["Changes"])
+
+# Long-polls also re-read the log this often, to see changes committed by other processes
+POLL_INTERVAL = 1.0
+
+def read_changes(since: int, limit: int, entities: Optional[List[str]]) -> Dict[str, Any]:
+    """One read of the log on its own short-lived session, so long-polls hold no connection while waiting"""
+    db = SessionLocal()
+    try:
+        return ChangeLogService(db).changes(since, limit, entities)
+    finally:
+        db.close()
+
+@router.get("/")
+async def get_changes(
+    since: int = Query(0, ge=0, description="Last sequence number seen; 0 reads from the start of the log"),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for changes when there are none yet"),
+    entity: Optional[List[str]] = Query(None, description="Only job, backend or queue changes")
+):
+    """Job, backend and queue changes after a cursor, oldest first.
+
+    Continue from `next_since`; `reset` means entries after `since` were
+    dropped by retention, so re-read the full lists before continuing.
+    """
+    if entity and any(name not in ENTITIES for name in entity):
+        raise HTTPException(status_code=400, detail=f"Invalid entity. Valid: {', '.join(ENTITIES)}")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        result = await run_in_threadpool(read_changes, since, limit, entity)
+        remaining = deadline - loop.time()
+        if result['changes'] or remaining <= 0:
+            return result
+        await change_notifier.wait(min(remaining, POLL_INTERVAL))
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, BackgroundTasks, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
+from app.core.cache import cached_response, conditional_get, check_not_modified
+from app.core.content_negotiation import negotiate, representation_headers
 from app.services.quantum_service import quantum_service
 from app.services.database_service import DatabaseService
+from app.services.data_sync_service import data_sync_service
+from app.services.dashboard_snapshot import dashboard_snapshot
 from app.schemas.quantum_schemas import (
     SystemStatusSchema, JobStatsSchema, BackendStatsSchema, DashboardDataSchema
 )
@@ -12,42 +16,36 @@ from app.schemas.quantum_schemas import (
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 @router.get("/", response_model=DashboardDataSchema)
-async def get_dashboard_data(db: Session = Depends(get_db)):
+async def get_dashboard_data(request: Request, db: Session = Depends(get_db)):
     """Get comprehensive dashboard data"""
-    db_service = DatabaseService(db)
-    
-    # Get all dashboard data
-    job_stats = await db_service.get_job_statistics()
-    backend_stats = await db_service.get_backend_statistics()
-    recent_jobs = await db_service.get_recent_jobs(limit=10)
-    queue_info = await db_service.get_queue_info()
-    system_status = await db_service.get_system_status()
-    backend_utilization = await db_service.get_backend_utilization()
+    # Pre-serialized snapshot rebuilt by the sync pipeline
+    snapshot = await dashboard_snapshot.get(db)
+    headers = check_not_modified(request, snapshot.etag, snapshot.last_modified)
     
-    return DashboardDataSchema(
-        job_stats=JobStatsSchema(**job_stats),
-        backend_stats=BackendStatsSchema(**backend_stats),
-        recent_jobs=[job for job in recent_jobs],
-        queue_info=queue_info,
-        system_status=system_status,
-        backend_utilization=backend_utilization
-    )
+    # Serve the negotiated representation from the snapshot's precompressed variants
+    media_type, encoding = negotiate(request.headers)
+    body, applied = snapshot.variants.get(media_type, encoding)
+    response = Response(content=body, media_type=media_type, headers=headers)
+    representation_headers(response.headers, media_type, applied, len(body))
+    return response
 
-@router.get("/stats/jobs", response_model=JobStatsSchema)
+@router.get("/stats/jobs", response_model=JobStatsSchema, dependencies=[Depends(conditional_get('jobs'))])
+@cached_response('jobs')
 async def get_job_stats(db: Session = Depends(get_db)):
     """Get job statistics"""
     db_service = DatabaseService(db)
     stats = await db_service.get_job_statistics()
     return JobStatsSchema(**stats)
 
-@router.get("/stats/backends", response_model=BackendStatsSchema)
+@router.get("/stats/backends", response_model=BackendStatsSchema, dependencies=[Depends(conditional_get('backends', 'queue'))])
+@cached_response('backends', 'queue')
 async def get_backend_stats(db: Session = Depends(get_db)):
     """Get backend statistics"""
     db_service = DatabaseService(db)
     stats = await db_service.get_backend_statistics()
     return BackendStatsSchema(**stats)
 
-@router.get("/system-status", response_model=List[SystemStatusSchema])
+@router.get("/system-status", response_model=List[SystemStatusSchema], dependencies=[Depends(conditional_get('system'))])
 async def get_system_status(db: Session = Depends(get_db)):
     """Get system status for all services"""
     db_service = DatabaseService(db)
@@ -65,28 +63,10 @@ async def refresh_dashboard_data(
 
 async def refresh_data_task(db: Session):
     """Background task to refresh all data"""
-    try:
-        db_service = DatabaseService(db)
-        
-        # Sync backends
-        backends_data = await quantum_service.get_all_backends()
-        await db_service.bulk_upsert_backends(backends_data)
-        
-        # Sync jobs
-        jobs_data = await quantum_service.get_jobs(limit=200)
-        await db_service.bulk_create_jobs(jobs_data)
-        
-        # Update queue info
-        queue_data = await quantum_service.get_queue_info()
-        await db_service.update_queue_info(queue_data)
-        
-        # Update system status
-        status_data = await quantum_service.get_system_status()
-        await db_service.update_system_status(status_data)
-        
-        print("Dashboard data refreshed successfully")
-    except Exception as e:
-        print(f"Error refreshing dashboard data: {e}")
+    await data_sync_service.sync_backends()
+    await data_sync_service.sync_jobs(limit=200)
+    await data_sync_service.sync_queue_info()
+    await data_sync_service.sync_system_status()
 
 @router.get("/health")
 async def get_health_status():
@@ -107,7 +87,8 @@ async def get_health_status():
             "timestamp": "2024-01-01T00:00:00Z"
         }
 
-@router.get("/metrics")
+@router.get("/metrics", dependencies=[Depends(conditional_get('jobs', 'backends', 'queue'))])
+@cached_response('jobs', 'backends', 'queue')
 async def get_metrics(db: Session = Depends(get_db)):
     """Get detailed metrics for monitoring"""
     db_service = DatabaseService(db)
@@ -1,53 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, UploadFile, File, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
 from app.core.database import get_db
-from app.services.quantum_service import quantum_service
+from app.core.cache import data_generation, conditional_get
+from app.services.dashboard_snapshot import dashboard_snapshot
 from app.services.database_service import DatabaseService
+from app.services.data_sync_service import data_sync_service
+from app.services.bulk_import_service import BulkImportService, iter_ndjson, iter_parquet
+from app.services.search_service import SearchService
+from app.services.fast_read_service import FastReadService, encode_json, json_bytes_response
+from app.services.tag_index_service import TagIndexService
+from app.services.job_state import load_job_state
+from app.services.query_filters import parse_filter_expression, explain_filters
+from app.utils.helpers import parse_csv_param
 from app.schemas.quantum_schemas import (
-    QuantumJobSchema, FilterParams, PaginatedResponse
+    QuantumJobSchema, FilterParams, PaginatedResponse, JobBatchRequest
 )
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
-@router.get("/", response_model=PaginatedResponse)
-async def get_jobs(
-    status: Optional[str] = Query(None, description="Filter by job status"),
-    backend: Optional[str] = Query(None, description="Filter by backend name"),
-    user_id: Optional[str] = Query(None, description="Filter by user ID"),
+def job_filter_params(
+    status: Optional[str] = Query(None, description="Filter by job status (comma-separated for several)"),
+    backend: Optional[str] = Query(None, description="Filter by backend name (comma-separated for several)"),
+    user_id: Optional[str] = Query(None, description="Filter by user ID (comma-separated for several)"),
     start_date: Optional[datetime] = Query(None, description="Start date filter"),
     end_date: Optional[datetime] = Query(None, description="End date filter"),
+    min_shots: Optional[int] = Query(None, ge=0, description="Minimum shots"),
+    max_shots: Optional[int] = Query(None, ge=0, description="Maximum shots"),
+    min_circuits: Optional[int] = Query(None, ge=0, description="Minimum circuits"),
+    max_circuits: Optional[int] = Query(None, ge=0, description="Maximum circuits"),
+    started_after: Optional[datetime] = Query(None, description="Start time lower bound"),
+    started_before: Optional[datetime] = Query(None, description="Start time upper bound"),
+    ended_after: Optional[datetime] = Query(None, description="End time lower bound"),
+    ended_before: Optional[datetime] = Query(None, description="End time upper bound"),
+    filter: Optional[str] = Query(None, description="Filter expression, e.g. status:in:DONE,ERROR;shots:gte:1000"),
+    tags_any: Optional[str] = Query(None, description="Comma-separated tags, job must have at least one"),
+    tags_all: Optional[str] = Query(None, description="Comma-separated tags, job must have all of them"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(50, ge=1, le=1000, description="Items per page"),
+) -> FilterParams:
+    """Build FilterParams from the /jobs query parameters"""
+    try:
+        return FilterParams(
+            statuses=parse_csv_param(status) or None,
+            backends=parse_csv_param(backend) or None,
+            user_ids=parse_csv_param(user_id) or None,
+            start_date=start_date,
+            end_date=end_date,
+            min_shots=min_shots,
+            max_shots=max_shots,
+            min_circuits=min_circuits,
+            max_circuits=max_circuits,
+            started_after=started_after,
+            started_before=started_before,
+            ended_after=ended_after,
+            ended_before=ended_before,
+            conditions=parse_filter_expression(filter) or None,
+            tags_any=parse_csv_param(tags_any) or None,
+            tags_all=parse_csv_param(tags_all) or None,
+            page=page,
+            per_page=per_page
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/", response_model=PaginatedResponse, dependencies=[Depends(conditional_get('jobs'))])
+async def get_jobs(
+    response: Response,
+    filters: FilterParams = Depends(job_filter_params),
     db: Session = Depends(get_db)
 ):
     """Get paginated list of quantum jobs with filtering options"""
-    filters = FilterParams(
-        status=status,
-        backend=backend,
-        user_id=user_id,
-        start_date=start_date,
-        end_date=end_date,
-        page=page,
-        per_page=per_page
-    )
-    
-    db_service = DatabaseService(db)
-    return await db_service.get_jobs(filters)
+    try:
+        payload = FastReadService(db).jobs_page(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_bytes_response(payload, response)
 
-@router.get("/recent", response_model=List[QuantumJobSchema])
+@router.get("/filter-plan")
+async def get_filter_plan(
+    filters: FilterParams = Depends(job_filter_params),
+    db: Session = Depends(get_db)
+):
+    """Explain the query plan for a filter shape and flag full table scans"""
+    try:
+        return explain_filters(db, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/recent", response_model=List[QuantumJobSchema], dependencies=[Depends(conditional_get('jobs'))])
 async def get_recent_jobs(
+    response: Response,
     limit: int = Query(20, ge=1, le=100, description="Number of recent jobs to fetch"),
     db: Session = Depends(get_db)
 ):
     """Get recently created jobs"""
-    db_service = DatabaseService(db)
-    jobs = await db_service.get_recent_jobs(limit)
-    return [QuantumJobSchema.from_orm(job) for job in jobs]
+    return json_bytes_response(FastReadService(db).recent_jobs(limit), response)
+
+@router.get("/search", response_model=PaginatedResponse, dependencies=[Depends(conditional_get('jobs'))])
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms (name, tags, program ID, error message); 'term*' for prefix"),
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(50, ge=1, le=1000, description="Items per page"),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over jobs, best matches first"""
+    search_service = SearchService(db)
+    return await search_service.search_jobs(q, page=page, per_page=per_page)
 
-@router.get("/{job_id}", response_model=QuantumJobSchema)
+@router.get("/tags", dependencies=[Depends(conditional_get('jobs'))])
+async def get_job_tags(
+    prefix: Optional[str] = Query(None, description="Only tags starting with this prefix"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of tags to return"),
+    db: Session = Depends(get_db)
+):
+    """Get job tags with the number of jobs carrying each tag"""
+    return TagIndexService(db).tag_counts(prefix=prefix, limit=limit)
+
+@router.get("/{job_id}", response_model=QuantumJobSchema, dependencies=[Depends(conditional_get('jobs'))])
 async def get_job(
     job_id: str,
     db: Session = Depends(get_db)
@@ -74,23 +147,72 @@ async def sync_jobs_from_ibm(
 
 async def sync_jobs_task(db: Session, limit: int, backend: Optional[str]):
     """Background task to sync jobs from IBM Quantum"""
+    await data_sync_service.sync_jobs(limit=limit, backend=backend)
+
+@router.post("/import")
+async def import_jobs(
+    file: UploadFile = File(..., description="NDJSON or Parquet job dump"),
+    format: Optional[str] = Query(None, regex="^(ndjson|parquet)$", description="Input format (defaults to file extension)"),
+    chunk_size: int = Query(5000, ge=100, le=50000, description="Rows per INSERT batch"),
+    defer_indexes: bool = Query(False, description="Drop secondary indexes during the load (offline backfills only)"),
+    db: Session = Depends(get_db)
+):
+    """Bulk import historical jobs, deduplicated on job_id"""
+    input_format = format or ('parquet' if (file.filename or '').endswith('.parquet') else 'ndjson')
+    rows = iter_parquet(file.file) if input_format == 'parquet' else iter_ndjson(file.file)
+    
+    service = BulkImportService(db, chunk_size=chunk_size, defer_indexes=defer_indexes)
     try:
-        jobs_data = await quantum_service.get_jobs(limit=limit, backend=backend)
-        
-        db_service = DatabaseService(db)
-        await db_service.bulk_create_jobs(jobs_data)
-        
-        print(f"Successfully synced {len(jobs_data)} jobs")
+        progress = await run_in_threadpool(service.import_rows, rows)
     except Exception as e:
-        print(f"Error syncing jobs: {e}")
+        raise HTTPException(status_code=400, detail=f"Error importing jobs: {str(e)}")
+    
+    # Imported history changes the learned wait-time distributions and job-derived responses
+    await run_in_threadpool(load_job_state, db, True)
+    data_generation.bump('jobs')
+    data_sync_service.publish_invalidation('jobs', reload=True)
+    await dashboard_snapshot.rebuild(db)
+    
+    return {"message": "Job import completed", "format": input_format, **progress.to_dict()}
 
-@router.get("/stats/overview")
+ACTIVE_JOB_STATUSES = {'INITIALIZING', 'QUEUED', 'VALIDATING', 'RUNNING'}
+# Upper bound on upstream calls a single batch request may trigger
+MAX_BATCH_REFRESH = 20
+
+@router.post("/batch")
+async def get_jobs_batch(
+    batch: JobBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """Look up many jobs by ID at once; unknown IDs map to null and are listed in not_found"""
+    job_ids = list(dict.fromkeys(batch.job_ids))
+    fast_read = FastReadService(db)
+    found = fast_read.jobs_by_ids(job_ids)
+    
+    refreshed = []
+    if batch.refresh:
+        active_ids = [job_id for job_id in job_ids if job_id in found and found[job_id]['status'] in ACTIVE_JOB_STATUSES]
+        refreshed = await data_sync_service.refresh_jobs(active_ids[:MAX_BATCH_REFRESH])
+        if refreshed:
+            db.expire_all()
+            found.update(fast_read.jobs_by_ids(refreshed))
+    
+    not_found = [job_id for job_id in job_ids if job_id not in found]
+    payload = encode_json({
+        "jobs": {job_id: found.get(job_id) for job_id in job_ids},
+        "found": len(job_ids) - len(not_found),
+        "not_found": not_found,
+        "refreshed": refreshed
+    })
+    return Response(content=payload, media_type="application/json")
+
+@router.get("/stats/overview", dependencies=[Depends(conditional_get('jobs'))])
 async def get_job_statistics(db: Session = Depends(get_db)):
     """Get job statistics overview"""
     db_service = DatabaseService(db)
     return await db_service.get_job_statistics()
 
-@router.get("/trends/daily")
+@router.get("/trends/daily", dependencies=[Depends(conditional_get('jobs'))])
 async def get_job_trends(
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
     db: Session = Depends(get_db)
@@ -99,8 +221,9 @@ async def get_job_trends(
     db_service = DatabaseService(db)
     return await db_service.get_job_trends(days)
 
-@router.get("/by-backend/{backend_name}")
+@router.get("/by-backend/{backend_name}", dependencies=[Depends(conditional_get('jobs'))])
 async def get_jobs_by_backend(
+    response: Response,
     backend_name: str,
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=1000),
@@ -108,11 +231,11 @@ async def get_jobs_by_backend(
 ):
     """Get jobs filtered by specific backend"""
     filters = FilterParams(backend=backend_name, page=page, per_page=per_page)
-    db_service = DatabaseService(db)
-    return await db_service.get_jobs(filters)
+    return json_bytes_response(FastReadService(db).jobs_page(filters), response)
 
-@router.get("/by-status/{status}")
+@router.get("/by-status/{status}", dependencies=[Depends(conditional_get('jobs'))])
 async def get_jobs_by_status(
+    response: Response,
     status: str,
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=1000),
@@ -120,5 +243,4 @@ async def get_jobs_by_status(
 ):
     """Get jobs filtered by status"""
     filters = FilterParams(status=status, page=page, per_page=per_page)
-    db_service = DatabaseService(db)
-    return await db_service.get_jobs(filters)
+    return json_bytes_response(FastReadService(db).jobs_page(filters), response)
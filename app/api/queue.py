@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
 from app.core.database import get_db
+from app.core.cache import cached_response, conditional_get
 from app.services.database_service import DatabaseService
+from app.services.fast_read_service import FastReadService, json_bytes_response
+from app.services.queue_history_service import queue_history_service
+from app.services.wait_time_estimator import wait_time_estimator
 from app.schemas.quantum_schemas import JobQueueSchema
 
 router = APIRouter(prefix="/queue", tags=["Queue"])
 
-@router.get("/", response_model=List[JobQueueSchema])
-async def get_all_queue_info(db: Session = Depends(get_db)):
+@router.get("/", response_model=List[JobQueueSchema], dependencies=[Depends(conditional_get('queue'))])
+async def get_all_queue_info(response: Response, db: Session = Depends(get_db)):
     """Get queue information for all backends"""
-    db_service = DatabaseService(db)
-    queue_info = await db_service.get_queue_info()
-    return [JobQueueSchema.from_orm(queue) for queue in queue_info]
+    return json_bytes_response(FastReadService(db).queue_info(), response)
 
-@router.get("/summary")
+@router.get("/summary", dependencies=[Depends(conditional_get('queue'))])
+@cached_response('queue')
 async def get_queue_summary(db: Session = Depends(get_db)):
     """Get a summary of queue statistics"""
     db_service = DatabaseService(db)
@@ -40,7 +44,7 @@ async def get_queue_summary(db: Session = Depends(get_db)):
         "operational_backends": len([q for q in queue_info if q.status == 'operational'])
     }
 
-@router.get("/longest-wait")
+@router.get("/longest-wait", dependencies=[Depends(conditional_get('queue'))])
 async def get_longest_wait_times(db: Session = Depends(get_db)):
     """Get backends with longest wait times"""
     db_service = DatabaseService(db)
@@ -55,7 +59,7 @@ async def get_longest_wait_times(db: Session = Depends(get_db)):
     
     return [JobQueueSchema.from_orm(queue) for queue in sorted_queues[:10]]
 
-@router.get("/shortest-wait")
+@router.get("/shortest-wait", dependencies=[Depends(conditional_get('queue'))])
 async def get_shortest_wait_times(db: Session = Depends(get_db)):
     """Get backends with shortest wait times"""
     db_service = DatabaseService(db)
@@ -69,7 +73,16 @@ async def get_shortest_wait_times(db: Session = Depends(get_db)):
     
     return [JobQueueSchema.from_orm(queue) for queue in sorted_queues[:10]]
 
-@router.get("/by-backend/{backend_name}")
+@router.get("/wait-estimates", dependencies=[Depends(conditional_get('jobs', 'queue'))])
+async def get_wait_estimates():
+    """Get expected and p90 wait times per backend from the wait-time model"""
+    estimates = sorted(
+        wait_time_estimator.get_estimates(),
+        key=lambda e: (e['estimated_wait_time'] is None, e['estimated_wait_time'] or 0)
+    )
+    return {"estimates": estimates}
+
+@router.get("/by-backend/{backend_name}", dependencies=[Depends(conditional_get('queue'))])
 async def get_backend_queue(
     backend_name: str,
     db: Session = Depends(get_db)
@@ -83,3 +96,17 @@ async def get_backend_queue(
         return {"message": "No queue information found for this backend"}
     
     return JobQueueSchema.from_orm(backend_queue)
+
+@router.get("/history/{backend_name}", dependencies=[Depends(conditional_get('queue'))])
+async def get_queue_history(
+    backend_name: str,
+    from_date: Optional[datetime] = Query(None, alias="from", description="Start of the range (default: 24h before 'to')"),
+    to_date: Optional[datetime] = Query(None, alias="to", description="End of the range (default: now)"),
+    resolution: str = Query("auto", regex="^(auto|raw|1m|1h|1d)$", description="Sample resolution"),
+    max_points: int = Query(1000, ge=1, le=5000, description="Maximum number of points returned"),
+    db: Session = Depends(get_db)
+):
+    """Get queue-length history (min/max/avg per bucket) for a specific backend"""
+    return queue_history_service.get_history(
+        db, backend_name, start=from_date, end=to_date, resolution=resolution, max_points=max_points
+    )
@@ -1,111 +1,302 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 import asyncio
 import json
 import logging
-from typing import List
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Hashable, Iterator, List, Optional, Set, Tuple
 
-from app.core.database import get_db
-from app.services.database_service import DatabaseService
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.event_broadcaster import CHANNELS, event_broadcaster
+from app.services.fast_read_service import encode_json
+from app.services.subscriptions import (
+    CHANNEL_FILTERS, EntityStates, SubscriptionIndex, job_snapshot, parse_filters, queue_snapshot
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+SLOW_CONSUMER_POLICIES = ('coalesce', 'drop', 'disconnect')
+
+# Channel -> key field of its entities
+ENTITY_KEYS = {'jobs': 'job_id', 'queue': 'backend'}
+
+def _entity_updates(channel: str, event: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """(entity after, entity before) pairs carried by a channel event"""
+    data = event['data']
+    if channel == 'jobs':
+        for job in data.get('new_jobs', []):
+            yield job, None
+        for change in data.get('status_changes', []):
+            yield change['job'], {**change['job'], 'status': change['old_status']}
+    elif channel == 'queue':
+        for update in data.get('backend_updates', []):
+            yield {name: value for name, value in update.items() if name != 'previous_queue_length'}, None
+
+class ClientConnection:
+    """A connection's bounded send queue, drained by its own writer task.
+
+    Enqueueing never waits on the socket, so a slow client only fills its
+    own queue. With the `coalesce` policy a message for an entity that
+    still has one queued replaces it (merging delta fields), so a lagging
+    client gets the latest state; when the queue is full `coalesce` and
+    `drop` drop the oldest message and `disconnect` closes the connection.
+    """
+
+    def __init__(self, websocket: WebSocket, channel: str, max_queue: int, policy: str, on_error):
+        self.websocket = websocket
+        self.channel = channel
+        self.max_queue = max_queue
+        self.policy = policy
+        self.on_error = on_error
+        self.queue: Deque[list] = deque()  # [key, message, event]
+        self.keyed: Dict[Hashable, list] = {}
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self.task = asyncio.create_task(self._write())
+
+    def enqueue(self, message: str, key: Optional[Hashable] = None, event: Optional[Dict[str, Any]] = None):
+        """Queue a serialized message; `key` identifies the entity it updates, for coalescing"""
+        if self.closed:
+            return
+        if self.policy == 'coalesce' and key is not None and key in self.keyed:
+            self._coalesce(self.keyed[key], message, event)
+            return
+        if len(self.queue) >= self.max_queue:
+            if self.policy == 'disconnect':
+                self.dropped += 1
+                self.close(1013)
+                return
+            self._discard(self.queue.popleft())
+            self.dropped += 1
+        item = [key, message, event]
+        self.queue.append(item)
+        if key is not None:
+            self.keyed[key] = item
+        if len(self.queue) == 1:
+            self.ready.set()
+
+    def _coalesce(self, item: list, message: str, event: Optional[Dict[str, Any]]):
+        """Fold a newer message for the same entity into the queued one (moved to the end to keep entity order)"""
+        previous = item[2]
+        if previous is not None and event is not None and 'changes' in previous['data'] and 'changes' in event['data']:
+            event = {**event, 'data': {**event['data'], 'changes': {**previous['data']['changes'], **event['data']['changes']}}}
+            message = encode_json(event).decode()
+        self.queue.remove(item)
+        item[1], item[2] = message, event
+        self.queue.append(item)
+        self.coalesced += 1
+
+    def _discard(self, item: list):
+        if item[0] is not None and self.keyed.get(item[0]) is item:
+            del self.keyed[item[0]]
+
+    async def _write(self):
+        try:
+            while True:
+                while not self.queue:
+                    self.ready.clear()
+                    await self.ready.wait()
+                item = self.queue.popleft()
+                self._discard(item)
+                await self.websocket.send_text(item[1])
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.closed = True
+            self.on_error(self.websocket, self.channel)
+
+    def close(self, code: int = 1000):
+        """Stop sending; a slow consumer is told to try again later (1013)"""
+        if self.closed:
+            return
+        self.closed = True
+        self.on_error(self.websocket, self.channel)
+        asyncio.create_task(self.websocket.close(code=code))
+
+    def stop(self):
+        self.closed = True
+        self.task.cancel()
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    """Connections per channel.
 
-    async def connect(self, websocket: WebSocket):
+    Connections get the full feed of their channel until they subscribe;
+    subscribed ones move into the channel's SubscriptionIndex and receive
+    one snapshot, then only deltas of the entities matching their filters.
+    Messages are serialized once and put on each recipient's send queue;
+    every connection's writer task delivers concurrently.
+    """
+
+    def __init__(self, max_queue: int = settings.ws_send_queue_size, policy: str = settings.ws_slow_consumer_policy):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy '{policy}'. Valid: {', '.join(SLOW_CONSUMER_POLICIES)}")
+        self.max_queue = max_queue
+        self.policy = policy
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.channels: Dict[str, Set[WebSocket]] = {channel: set() for channel in CHANNELS}
+        self.subscriptions: Dict[str, SubscriptionIndex] = {channel: SubscriptionIndex(channel) for channel in CHANNEL_FILTERS}
+        self.states: Dict[str, EntityStates] = {channel: EntityStates() for channel in CHANNEL_FILTERS}
+        self.dropped = {channel: 0 for channel in CHANNELS}
+        self.slow_disconnects = {channel: 0 for channel in CHANNELS}
+
+    @property
+    def active_connections(self) -> int:
+        return len(self.clients)
+
+    async def connect(self, websocket: WebSocket, channel: str):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.clients[websocket] = ClientConnection(websocket, channel, self.max_queue, self.policy, self.disconnect)
+        self.channels[channel].add(websocket)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+    def disconnect(self, websocket: WebSocket, channel: str):
+        self.channels[channel].discard(websocket)
+        if channel in self.subscriptions:
+            self.subscriptions[channel].remove(websocket)
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            self.dropped[channel] += client.dropped
+            if client.closed and client.policy == 'disconnect' and client.dropped:
+                self.slow_disconnects[channel] += 1
+            client.stop()
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        self.clients[websocket].enqueue(message)
+
+    async def subscribe(self, websocket: WebSocket, channel: str, raw_filters: Any):
+        """Replace the connection's filters and queue a snapshot of the matching entities"""
+        filters = parse_filters(channel, raw_filters)
+        # Leave the full feed first, so no unfiltered event is queued ahead of the snapshot
+        self.channels[channel].discard(websocket)
+        entities = await run_in_threadpool(self._snapshot, channel, filters)
+        if websocket not in self.clients:
+            return  # disconnected during the read
+        # No await between indexing and queueing the snapshot, so every delta follows it
+        self.subscriptions[channel].add(websocket, filters)
+        self.clients[websocket].enqueue(encode_json({
+            'type': 'snapshot',
+            'timestamp': datetime.now(timezone.utc),
+            'data': {'filters': {name: sorted(values) for name, values in filters.items()}, channel: entities}
+        }).decode())
+
+    @staticmethod
+    def _snapshot(channel: str, filters: Dict[str, Set[str]]) -> List[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            return job_snapshot(db, filters) if channel == 'jobs' else queue_snapshot(db, filters)
+        finally:
+            db.close()
+
+    def unsubscribe(self, websocket: WebSocket, channel: str):
+        """Return a connection to the full channel feed"""
+        if channel in self.subscriptions and websocket in self.subscriptions[channel]:
+            self.subscriptions[channel].remove(websocket)
+            self.channels[channel].add(websocket)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                # Remove disconnected clients
-                self.active_connections.remove(connection)
+    def _send(self, connections, message: str, key: Optional[Hashable] = None, event: Optional[Dict[str, Any]] = None):
+        # Iterate over a copy: disconnect-policy clients are removed along the way
+        for connection in list(connections):
+            client = self.clients.get(connection)
+            if client is not None:
+                client.enqueue(message, key, event)
+
+    async def broadcast(self, channel: str, event: Dict[str, Any], message: str):
+        """Queue an event for the channel's full-feed connections and its deltas for matching subscribers"""
+        # Only the dashboard event is a full state that a newer one can replace
+        self._send(self.channels[channel], message, event['type'] if channel == 'dashboard' else None, event)
+
+        index = self.subscriptions.get(channel)
+        if not index:
+            return
+        key_field = ENTITY_KEYS[channel]
+        for entity, before in _entity_updates(channel, event):
+            key = entity.get(key_field)
+            changes = self.states[channel].diff(key, entity)
+            if before is None:
+                subscribers, entered = index.match(entity), []
+            else:
+                # Subscribers the entity only now matches have never seen it: send it whole
+                subscribers, entered = [], []
+                for subscriber in index.match(entity, before):
+                    (subscribers if index.subscriptions[subscriber].matches(before) else entered).append(subscriber)
+            for targets, fields in ((subscribers, changes), (entered, entity)):
+                if not targets or not fields:
+                    continue
+                delta = {
+                    'type': 'delta',
+                    'timestamp': event['timestamp'],
+                    'data': {key_field: key, 'changes': fields}
+                }
+                self._send(targets, encode_json(delta).decode(), key, delta)
+
+    def stats(self) -> Dict[str, Any]:
+        """Connections, send queue depth and dropped messages per channel"""
+        result = {}
+        for channel in CHANNELS:
+            clients = [client for client in self.clients.values() if client.channel == channel]
+            depths = [len(client.queue) for client in clients]
+            result[channel] = {
+                'connections': len(clients),
+                'subscribed': len(self.subscriptions[channel]) if channel in self.subscriptions else 0,
+                'queued': sum(depths),
+                'max_queue_depth': max(depths, default=0),
+                'sent': sum(client.sent for client in clients),
+                'coalesced': sum(client.coalesced for client in clients),
+                'dropped': self.dropped[channel] + sum(client.dropped for client in clients),
+                'slow_disconnects': self.slow_disconnects[channel],
+            }
+        return {'policy': self.policy, 'max_queue': self.max_queue, 'channels': result}
 
 manager = ConnectionManager()
+event_broadcaster.add_listener(manager.broadcast)
 
-@router.websocket("/ws/dashboard")
-async def dashboard_websocket(websocket: WebSocket):
-    """WebSocket endpoint for real-time dashboard updates"""
-    await manager.connect(websocket)
+@router.get("/ws/stats")
+async def websocket_stats():
+    """Event broadcaster backlog and per-channel connection, queue depth and dropped message counts"""
+    return {'broadcaster': event_broadcaster.stats(), 'connections': manager.stats()}
+
+async def handle_client_message(websocket: WebSocket, channel: str, text: str):
+    """Apply a subscribe/unsubscribe request; anything else is ignored"""
+    if channel not in CHANNEL_FILTERS:
+        return
+    try:
+        request = json.loads(text)
+        action = request.get('action') if isinstance(request, dict) else None
+        if action == 'subscribe':
+            await manager.subscribe(websocket, channel, request.get('filters'))
+        elif action == 'unsubscribe':
+            manager.unsubscribe(websocket, channel)
+    except ValueError as e:
+        manager.clients[websocket].enqueue(encode_json({'type': 'error', 'data': {'detail': str(e)}}).decode())
+
+async def serve_channel(websocket: WebSocket, channel: str):
+    """Keep a client connected to a channel until it disconnects; events arrive from the broadcaster"""
+    await manager.connect(websocket, channel)
     try:
         while True:
-            # Send periodic updates
-            await asyncio.sleep(10)  # Update every 10 seconds
-            
-            # Get fresh data (this would normally use a database session)
-            dashboard_data = {
-                "type": "dashboard_update",
-                "timestamp": "2024-01-01T00:00:00Z",
-                "data": {
-                    "total_jobs": 1250,
-                    "running_jobs": 45,
-                    "queued_jobs": 120,
-                    "completed_jobs": 1085
-                }
-            }
-            
-            await manager.send_personal_message(json.dumps(dashboard_data), websocket)
-            
+            await handle_client_message(websocket, channel, await websocket.receive_text())
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        manager.disconnect(websocket, channel)
+
+@router.websocket("/ws/dashboard")
+async def dashboard_websocket(websocket: WebSocket):
+    """WebSocket endpoint for real-time dashboard updates"""
+    await serve_channel(websocket, 'dashboard')
 
 @router.websocket("/ws/jobs")
 async def jobs_websocket(websocket: WebSocket):
-    """WebSocket endpoint for real-time job updates"""
-    await manager.connect(websocket)
-    try:
-        while True:
-            await asyncio.sleep(5)  # Update every 5 seconds
-            
-            job_update = {
-                "type": "job_update",
-                "timestamp": "2024-01-01T00:00:00Z",
-                "data": {
-                    "new_jobs": 3,
-                    "status_changes": [
-                        {"job_id": "job_123", "old_status": "QUEUED", "new_status": "RUNNING"},
-                        {"job_id": "job_456", "old_status": "RUNNING", "new_status": "DONE"}
-                    ]
-                }
-            }
-            
-            await manager.send_personal_message(json.dumps(job_update), websocket)
-            
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
+    """WebSocket endpoint for real-time job updates (new jobs and status changes); supports subscriptions"""
+    await serve_channel(websocket, 'jobs')
 
 @router.websocket("/ws/queue")
 async def queue_websocket(websocket: WebSocket):
-    """WebSocket endpoint for real-time queue updates"""
-    await manager.connect(websocket)
-    try:
-        while True:
-            await asyncio.sleep(15)  # Update every 15 seconds
-            
-            queue_update = {
-                "type": "queue_update",
-                "timestamp": "2024-01-01T00:00:00Z",
-                "data": {
-                    "backend_updates": [
-                        {"backend": "ibm_sherbrooke", "queue_length": 25, "estimated_wait": 120},
-                        {"backend": "ibm_kyiv", "queue_length": 18, "estimated_wait": 95}
-                    ]
-                }
-            }
-            
-            await manager.send_personal_message(json.dumps(queue_update), websocket)
-            
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
+    """WebSocket endpoint for real-time queue updates (changed backends only); supports subscriptions"""
+    await serve_channel(websocket, 'queue')
@@ -0,0 +1,252 @@
+"""
+Response caching invalidated by data generation counters
+"""
+import functools
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DATA_DOMAINS = ('jobs', 'backends', 'queue', 'system')
+
+class DataGeneration:
+    """Monotonic per-domain counters bumped whenever a sync writes that domain.
+
+    Cache keys embed the generations of the domains a response is derived
+    from, so a job sync invalidates job-derived responses only. With Redis
+    the counters live there, so every worker sharing the Redis tier agrees
+    on them.
+    """
+
+    def __init__(self, redis_client: Optional[Any] = None):
+        self.redis = redis_client
+        self.generations: Dict[str, int] = {domain: 0 for domain in DATA_DOMAINS}
+        self.last_modified: Dict[str, Optional[datetime]] = {domain: None for domain in DATA_DOMAINS}
+        self.lock = threading.Lock()
+
+    def bump(self, domain: str) -> int:
+        with self.lock:
+            self.generations[domain] += 1
+            self.last_modified[domain] = datetime.now(timezone.utc)
+            generation = self.generations[domain]
+        if self.redis is not None:
+            try:
+                generation = self.redis.incr(f"data_generation:{domain}")
+            except Exception as e:
+                logger.warning(f"Redis data generation bump failed: {e}")
+        return generation
+
+    def get(self, domain: str) -> int:
+        return self.snapshot((domain,))[0]
+
+    def load_last_modified(self, db: Session):
+        """Seed modification times from the stored rows, before any sync has run"""
+        from app.models.quantum_models import QuantumBackend, QuantumJob, JobQueue, SystemStatus
+
+        stored = {
+            'jobs': db.query(func.max(func.coalesce(QuantumJob.updated_at, QuantumJob.created_at))).scalar(),
+            'backends': db.query(func.max(func.coalesce(QuantumBackend.updated_at, QuantumBackend.created_at))).scalar(),
+            'queue': db.query(func.max(JobQueue.last_updated)).scalar(),
+            'system': db.query(func.max(SystemStatus.last_check)).scalar(),
+        }
+        with self.lock:
+            for domain, value in stored.items():
+                if value is not None and self.last_modified[domain] is None:
+                    self.last_modified[domain] = _as_utc(value)
+
+    def last_modified_at(self, domains: Tuple[str, ...]) -> Optional[datetime]:
+        """Latest modification time across domains"""
+        times = [self.last_modified[domain] for domain in domains if self.last_modified[domain] is not None]
+        return max(times) if times else None
+
+    def snapshot(self, domains: Tuple[str, ...]) -> Tuple[int, ...]:
+        if self.redis is not None:
+            try:
+                values = self.redis.mget([f"data_generation:{domain}" for domain in domains])
+                return tuple(int(value or 0) for value in values)
+            except Exception as e:
+                logger.warning(f"Redis data generation read failed: {e}")
+        return tuple(self.generations[domain] for domain in domains)
+
+class ResponseCache:
+    """Two-tier response cache: in-process LRU, optionally backed by Redis"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, redis_client: Optional[Any] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.redis = redis_client
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        value = None
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(f"response_cache:{key}")
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._store_local(key, value)
+            except Exception as e:
+                logger.warning(f"Redis response cache read failed: {e}")
+
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        self._store_local(key, value)
+        if self.redis is not None:
+            try:
+                self.redis.setex(f"response_cache:{key}", self.ttl_seconds, json.dumps(value))
+            except Exception as e:
+                logger.warning(f"Redis response cache write failed: {e}")
+
+    def _store_local(self, key: str, value: Any):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'redis': self.redis is not None
+        }
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps from the database are UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    """ETag and Last-Modified response headers"""
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if last_modified is not None:
+        headers['Last-Modified'] = format_datetime(_as_utc(last_modified).replace(microsecond=0), usegmt=True)
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in candidates or etag in candidates
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+def check_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    """Validator headers for a response; raises 304 when the client's copy is current"""
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        raise HTTPException(status_code=304, headers=headers)
+    return headers
+
+def conditional_get(*domains: str) -> Callable:
+    """Dependency answering conditional GETs from the data generation of domains.
+
+    The ETag covers path, query parameters and generations, so it is known
+    before the endpoint runs and a 304 skips all database work.
+    """
+
+    def dependency(request: Request, response: Response):
+        query = sorted(request.query_params.multi_items())
+        generations = data_generation.snapshot(domains)
+        digest = hashlib.sha1(f"{request.url.path}:{query}:{generations}".encode()).hexdigest()
+        headers = check_not_modified(request, f'"{digest}"', data_generation.last_modified_at(domains))
+        response.headers.update(headers)
+
+    return dependency
+
+def _connect_redis() -> Optional[Any]:
+    """Redis client for the shared cache tier, or None when disabled or unreachable"""
+    if not settings.response_cache_redis:
+        return None
+    if not REDIS_AVAILABLE:
+        logger.warning("redis package not available, response cache is in-process only")
+        return None
+    try:
+        client = redis.Redis.from_url(settings.redis_url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        client.ping()
+        return client
+    except Exception as e:
+        logger.warning(f"Redis unavailable for response cache, using in-process cache only: {e}")
+        return None
+
+def cached_response(*domains: str) -> Callable:
+    """Cache an endpoint's JSON-encoded result per parameters and data generation of domains"""
+
+    def decorator(func: Callable) -> Callable:
+        endpoint = f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            params = sorted(
+                (name, str(value)) for name, value in kwargs.items() if not isinstance(value, Session)
+            )
+            key = f"{endpoint}:{params}:{data_generation.snapshot(domains)}"
+
+            cached = response_cache.get(key)
+            if cached is not None:
+                return cached
+
+            result = jsonable_encoder(await func(*args, **kwargs))
+            response_cache.set(key, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+# Global instances
+redis_client = _connect_redis()
+data_generation = DataGeneration(redis_client)
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_size,
+    ttl_seconds=settings.response_cache_ttl,
+    redis_client=redis_client
+)
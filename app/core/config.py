@@ -17,6 +17,37 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     
+    # Response cache
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+    response_cache_ttl: int = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    response_cache_redis: bool = os.getenv("RESPONSE_CACHE_REDIS", "False").lower() == "true"
+    
+    # Analytics query API
+    analytics_query_timeout: float = float(os.getenv("ANALYTICS_QUERY_TIMEOUT", "5"))
+    analytics_max_buckets: int = int(os.getenv("ANALYTICS_MAX_BUCKETS", "5000"))
+    columnar_store: bool = os.getenv("COLUMNAR_STORE", "True").lower() == "true"
+    
+    # Cost accounting: price applied to jobs that report usage but no cost
+    cost_per_quantum_second: float = float(os.getenv("COST_PER_QUANTUM_SECOND", "1.6"))
+    
+    # WebSocket fan-out: per-client send queue bound and what to do when it is full (coalesce, drop or disconnect)
+    ws_send_queue_size: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+    ws_slow_consumer_policy: str = os.getenv("WS_SLOW_CONSUMER_POLICY", "coalesce")
+    
+    # Event bus between publishers and WebSocket workers: memory, redis (REDIS_URL) or socket (EVENT_BUS_SOCKET)
+    event_bus: str = os.getenv("EVENT_BUS", "memory")
+    event_bus_socket: str = os.getenv("EVENT_BUS_SOCKET", "/tmp/quantum_jobs_events.sock")
+    # Take part in the background IBM Quantum sync; on one host the workers elect the lock holder to run it
+    data_sync_enabled: bool = os.getenv("DATA_SYNC_ENABLED", "True").lower() == "true"
+    data_sync_lock: str = os.getenv("DATA_SYNC_LOCK", "/tmp/quantum_jobs_sync.lock")
+    
+    # Change log: entries older than the compaction age keep only the latest per entity; retention drops them
+    change_log_compact_after_hours: float = float(os.getenv("CHANGE_LOG_COMPACT_AFTER_HOURS", "1"))
+    change_log_retention_days: float = float(os.getenv("CHANGE_LOG_RETENTION_DAYS", "7"))
+    
+    # Response encoding
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    
     # API Settings
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
     api_port: int = int(os.getenv("API_PORT", "8000"))
@@ -0,0 +1,207 @@
+"""
+Content negotiation for JSON responses: MessagePack and gzip/brotli encodings
+"""
+import gzip
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, 'application/x-msgpack'}
+
+# Compression levels for responses encoded per request; precomputed
+# snapshots are compressed once and use the maximum
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+def _accepted(header: Optional[str]) -> List[str]:
+    """Tokens of an Accept-style header, without parameters, excluding those with q=0"""
+    tokens = []
+    for part in (header or '').split(','):
+        token, *params = [item.strip() for item in part.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if token and quality > 0:
+            tokens.append(token.lower())
+    return tokens
+
+def negotiate(headers: Headers) -> Tuple[str, Optional[str]]:
+    """Media type and content encoding for a JSON response, from the request headers"""
+    accept = _accepted(headers.get('accept'))
+    media_type = MSGPACK_MEDIA_TYPE if MSGPACK_AVAILABLE and MSGPACK_MEDIA_TYPES.intersection(accept) else JSON_MEDIA_TYPE
+
+    encodings = _accepted(headers.get('accept-encoding'))
+    if BROTLI_AVAILABLE and 'br' in encodings:
+        encoding = 'br'
+    elif 'gzip' in encodings:
+        encoding = 'gzip'
+    else:
+        encoding = None
+    return media_type, encoding
+
+def to_msgpack(body: bytes) -> bytes:
+    """Re-encode a JSON body as MessagePack"""
+    content = orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+    return msgpack.packb(content, use_bin_type=True)
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if best else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if best else GZIP_LEVEL)
+
+def encode_json_body(
+    body: bytes,
+    media_type: str,
+    encoding: Optional[str],
+    min_size: int,
+    best: bool = False
+) -> Tuple[bytes, Optional[str]]:
+    """Body in the negotiated representation and the content encoding applied, if any"""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        body = to_msgpack(body)
+    if encoding is not None and len(body) >= min_size:
+        return compress(body, encoding, best), encoding
+    return body, None
+
+def weak_etag(etag: str) -> str:
+    # A transformed representation is only semantically equivalent to the original
+    return etag if etag.startswith('W/') else f'W/{etag}'
+
+def representation_headers(
+    headers: MutableHeaders,
+    media_type: str,
+    encoding: Optional[str],
+    length: int
+):
+    """Update the headers of a response re-encoded from JSON"""
+    if media_type != JSON_MEDIA_TYPE or encoding is not None:
+        headers['content-type'] = media_type
+        if 'etag' in headers:
+            headers['etag'] = weak_etag(headers['etag'])
+    if encoding is not None:
+        headers['content-encoding'] = encoding
+    headers['content-length'] = str(length)
+    vary = [name.strip() for name in headers.get('vary', '').split(',') if name.strip()]
+    for name in ('Accept', 'Accept-Encoding'):
+        if name.lower() not in (existing.lower() for existing in vary):
+            vary.append(name)
+    headers['vary'] = ', '.join(vary)
+
+class EncodedVariants:
+    """Lazily built encodings of one immutable JSON payload.
+
+    Snapshot-style responses hold one of these next to their payload, so
+    each (media type, encoding) pair is compressed once per snapshot
+    rather than once per request.
+    """
+
+    def __init__(self, payload: bytes, min_size: Optional[int] = None):
+        self.payload = payload
+        self.min_size = settings.compression_min_size if min_size is None else min_size
+        self.variants: Dict[Tuple[str, Optional[str]], Tuple[bytes, Optional[str]]] = {}
+
+    def get(self, media_type: str, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        key = (media_type, encoding)
+        variant = self.variants.get(key)
+        if variant is None:
+            variant = encode_json_body(self.payload, media_type, encoding, self.min_size, best=True)
+            self.variants[key] = variant
+        return variant
+
+    def prepare(self, variants: Iterable[Tuple[str, Optional[str]]]):
+        for media_type, encoding in variants:
+            self.get(media_type, encoding)
+
+class ContentNegotiationMiddleware:
+    """Re-encode JSON responses as MessagePack and/or gzip/brotli per request headers.
+
+    Responses that already carry a Content-Encoding (e.g. precompressed
+    snapshots) and non-JSON responses pass through untouched, as do bodies
+    below the compression threshold when no format change was requested.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.compression_min_size if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or scope['method'] == 'HEAD':
+            await self.app(scope, receive, send)
+            return
+
+        media_type, encoding = negotiate(Headers(scope=scope))
+        if media_type == JSON_MEDIA_TYPE and encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_encoded(message: Message):
+            nonlocal start_message, passthrough
+            if message['type'] == 'http.response.start':
+                headers = Headers(raw=message['headers'])
+                content_type = headers.get('content-type', '').split(';')[0].strip()
+                passthrough = content_type != JSON_MEDIA_TYPE or 'content-encoding' in headers
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough or message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            chunks.append(message.get('body', b''))
+            if message.get('more_body', False):
+                return
+
+            body = b''.join(chunks)
+            try:
+                encoded, applied = encode_json_body(body, media_type, encoding, self.minimum_size)
+                target_type = media_type
+            except Exception as e:
+                logger.warning(f"Could not re-encode response as {media_type}: {e}")
+                encoded, applied = body, None
+                target_type = JSON_MEDIA_TYPE
+
+            headers = MutableHeaders(raw=start_message['headers'])
+            representation_headers(headers, target_type, applied, len(encoded))
+            await send(start_message)
+            await send({'type': 'http.response.body', 'body': encoded})
+
+        await self.app(scope, receive, send_encoded)
@@ -1,13 +1,24 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, SessionLocal, ensure_columns, ensure_indexes
+from app.core.cache import data_generation
+from app.core.content_negotiation import ContentNegotiationMiddleware
 from app.services.quantum_service import quantum_service
-from app.api import jobs, backends, queue, dashboard, analytics, websockets
+from app.services.data_sync_service import data_sync_service
+from app.services.recommendation_service import recommendation_service
+from app.services.dashboard_snapshot import dashboard_snapshot
+from app.services.event_broadcaster import event_broadcaster
+from app.services.search_service import ensure_search_index
+from app.services.tag_index_service import TagIndexService
+from app.services.job_state import load_job_state
+from app.services.query_filters import check_filter_plans
+from app.api import jobs, backends, queue, dashboard, analytics, websockets, changes
 
 # Configure logging
 logging.basicConfig(
@@ -25,16 +36,44 @@ async def lifespan(app: FastAPI):
     
     # Create database tables
     Base.metadata.create_all(bind=engine)
+    ensure_columns()
+    ensure_indexes()
     logger.info("Database tables created")
+    ensure_search_index(engine)
+    
+    # Build in-memory models and indexes from stored data
+    db = SessionLocal()
+    try:
+        TagIndexService(db).backfill()
+        load_job_state(db)
+        check_filter_plans(db)
+        recommendation_service.load(db)
+        data_generation.load_last_modified(db)
+        await dashboard_snapshot.rebuild(db)
+    finally:
+        db.close()
     
     # Initialize quantum service
     await quantum_service.initialize()
     logger.info("Quantum service initialized")
     
+    # Fan out sync change events to WebSocket clients, through the event bus shared by all workers
+    await event_broadcaster.start()
+    
+    # Start background data sync in the worker that wins the sync lock; the bus carries its invalidations to the rest
+    sync_task = None
+    if settings.data_sync_enabled:
+        sync_task = asyncio.create_task(data_sync_service.run_elected())
+        logger.info("Data sync service started")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Quantum Jobs Tracker API")
+    await data_sync_service.stop()
+    if sync_task is not None:
+        sync_task.cancel()
+    await event_broadcaster.stop()
 
 # Create FastAPI app
 app = FastAPI(
@@ -66,12 +105,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# MessagePack and gzip/brotli encodings of JSON responses
+app.add_middleware(ContentNegotiationMiddleware, minimum_size=settings.compression_min_size)
+
 # Include routers
 app.include_router(jobs.router, prefix="/api/v1")
 app.include_router(backends.router, prefix="/api/v1")
 app.include_router(queue.router, prefix="/api/v1")
 app.include_router(dashboard.router, prefix="/api/v1")
 app.include_router(analytics.router, prefix="/api/v1")
+app.include_router(changes.router, prefix="/api/v1")
 app.include_router(websockets.router, prefix="/api/v1")
 
 @app.get("/")
@@ -88,6 +131,7 @@ async def root():
             "queue": "/api/v1/queue",
             "dashboard": "/api/v1/dashboard",
             "analytics": "/api/v1/analytics",
+            "changes": "/api/v1/changes",
             "websockets": {
                 "dashboard": "/api/v1/ws/dashboard",
                 "jobs": "/api/v1/ws/jobs",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, JSON
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Boolean, Float, JSON, Index, ForeignKey, LargeBinary
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -15,7 +15,7 @@ class QuantumJob(Base):
     backend_coupling_map = Column(JSON)
     backend_n_qubits = Column(Integer)
     status = Column(String, index=True)
-    creation_date = Column(DateTime(timezone=True))
+    creation_date = Column(DateTime(timezone=True), index=True)
     tags = Column(JSON)
     user_id = Column(String, index=True)
     program_id = Column(String)
@@ -28,10 +28,10 @@ class QuantumJob(Base):
     queue_position = Column(Integer)
     estimated_start_time = Column(DateTime(timezone=True))
     estimated_completion_time = Column(DateTime(timezone=True))
-    start_time = Column(DateTime(timezone=True))
-    end_time = Column(DateTime(timezone=True))
-    shots = Column(Integer)
-    circuits = Column(Integer)
+    start_time = Column(DateTime(timezone=True), index=True)
+    end_time = Column(DateTime(timezone=True), index=True)
+    shots = Column(Integer, index=True)
+    circuits = Column(Integer, index=True)
     transpiled_circuits = Column(JSON)
     qobj = Column(JSON)
     result = Column(JSON)
@@ -39,6 +39,103 @@ class QuantumJob(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+class JobTag(Base):
+    __tablename__ = "job_tags"
+    
+    # Inverted tag index: the (tag, job_id) primary key is the posting list per tag
+    tag = Column(String, primary_key=True)
+    job_id = Column(Integer, ForeignKey("quantum_jobs.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+class JobDailyRollup(Base):
+    __tablename__ = "job_daily_rollups"
+    
+    # Per (creation day, backend, status) job aggregates; sums and counts so averages stay composable
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)  # UTC creation date
+    backend_name = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    job_count = Column(Integer, default=0)
+    shots_count = Column(Integer, default=0)
+    total_shots = Column(Integer, default=0)
+    queue_time_count = Column(Integer, default=0)
+    queue_time_sum = Column(Float, default=0.0)  # seconds
+    execution_time_count = Column(Integer, default=0)
+    execution_time_sum = Column(Float, default=0.0)  # seconds
+    
+    __table_args__ = (
+        Index("ix_job_daily_rollups_day_backend_status", "day", "backend_name", "status", unique=True),
+    )
+
+class JobLatencySketch(Base):
+    __tablename__ = "job_latency_sketches"
+    
+    # Mergeable quantile sketch of one duration per (creation day, backend)
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)  # UTC creation date
+    backend_name = Column(String, nullable=False)
+    metric = Column(String, nullable=False)  # queue_time, execution_time
+    count = Column(Integer, default=0)
+    sketch = Column(LargeBinary, nullable=False)  # serialized DDSketch
+    
+    __table_args__ = (
+        Index("ix_job_latency_sketches_day_backend_metric", "day", "backend_name", "metric", unique=True),
+    )
+
+class JobUsage(Base):
+    __tablename__ = "job_usage"
+    
+    # Numeric usage extracted from QuantumJob.usage / cost at ingest
+    job_id = Column(Integer, ForeignKey("quantum_jobs.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, nullable=False)  # UTC creation date
+    backend_name = Column(String, nullable=False)
+    user_id = Column(String, nullable=False)
+    quantum_seconds = Column(Float, default=0.0)
+    billed_units = Column(Float, default=0.0)
+    cost = Column(Float, default=0.0)
+
+class JobCostDaily(Base):
+    __tablename__ = "job_cost_daily"
+    
+    # Per (creation day, backend, user) usage and cost totals
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    backend_name = Column(String, nullable=False)
+    user_id = Column(String, nullable=False)
+    job_count = Column(Integer, default=0)
+    quantum_seconds = Column(Float, default=0.0)
+    billed_units = Column(Float, default=0.0)
+    cost = Column(Float, default=0.0)
+    
+    __table_args__ = (
+        Index("ix_job_cost_daily_day_backend_user", "day", "backend_name", "user_id", unique=True),
+    )
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    
+    # Outbox of job, backend and queue changes, written in the transaction that makes them
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)  # job, backend or queue
+    entity_key = Column(String, nullable=False)  # job_id, backend name
+    operation = Column(String, nullable=False)  # created or updated
+    changes = Column(JSON)  # changed fields (all fields for created)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_change_log_entity_key", "entity", "entity_key"),
+        Index("ix_change_log_changed_at", "changed_at"),
+        # Never reuse sequence numbers of pruned entries
+        {"sqlite_autoincrement": True},
+    )
+
+class ChangeLogHorizon(Base):
+    __tablename__ = "change_log_horizon"
+    
+    # Highest sequence number removed by retention; older cursors must resync
+    id = Column(Integer, primary_key=True)
+    pruned_through = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class QuantumBackend(Base):
     __tablename__ = "quantum_backends"
     
@@ -86,6 +183,7 @@ class QuantumBackend(Base):
     timing_constraints = Column(JSON)
     instruction_durations = Column(JSON)
     instruction_schedule_map = Column(JSON)
+    error_rate = Column(Float)  # Mean gate error from the latest calibration, for recommendations
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -103,6 +201,22 @@ class JobQueue(Base):
     last_updated = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class QueueHistory(Base):
+    __tablename__ = "queue_history"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    backend_name = Column(String, nullable=False)
+    resolution = Column(String, nullable=False)  # 1m, 1h or 1d downsampling tier
+    bucket_start = Column(DateTime(timezone=True), nullable=False)  # UTC
+    sample_count = Column(Integer, default=0)
+    min_queue_length = Column(Float)
+    max_queue_length = Column(Float)
+    avg_queue_length = Column(Float)
+    
+    __table_args__ = (
+        Index("ix_queue_history_backend_resolution_bucket", "backend_name", "resolution", "bucket_start", unique=True),
+    )
+
 class SystemStatus(Base):
     __tablename__ = "system_status"
     
@@ -88,6 +88,7 @@ class QuantumBackendSchema(BaseModel):
     meas_levels: Optional[List[int]] = None
     qubit_lo_range: Optional[List[List[float]]] = None
     meas_lo_range: Optional[List[List[float]]] = None
+    error_rate: Optional[float] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -158,11 +159,45 @@ class PaginatedResponse(BaseModel):
     has_next: bool
     has_prev: bool
 
+class JobBatchRequest(BaseModel):
+    job_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    refresh: bool = False
+
+class FilterCondition(BaseModel):
+    field: str
+    op: str
+    value: Any
+
+class AnalyticsQuery(BaseModel):
+    dimensions: List[str] = Field(default_factory=list)
+    metrics: List[str] = Field(default_factory=lambda: ['count'], min_length=1)
+    time_bucket: Optional[str] = Field(default=None, pattern="^(hour|day|week|month)$")
+    filter: Optional[str] = None
+    conditions: List[FilterCondition] = Field(default_factory=list)
+    order_by: Optional[str] = None
+    descending: bool = True
+    limit: int = Field(default=1000, ge=1, le=10000)
+    engine: str = Field(default='sql', pattern="^(sql|columnar)$")
+
 class FilterParams(BaseModel):
     status: Optional[str] = None
     backend: Optional[str] = None
     user_id: Optional[str] = None
+    statuses: Optional[List[str]] = None
+    backends: Optional[List[str]] = None
+    user_ids: Optional[List[str]] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
+    min_shots: Optional[int] = None
+    max_shots: Optional[int] = None
+    min_circuits: Optional[int] = None
+    max_circuits: Optional[int] = None
+    started_after: Optional[datetime] = None
+    started_before: Optional[datetime] = None
+    ended_after: Optional[datetime] = None
+    ended_before: Optional[datetime] = None
+    conditions: Optional[List[FilterCondition]] = None
+    tags_any: Optional[List[str]] = None
+    tags_all: Optional[List[str]] = None
     page: int = Field(default=1, ge=1)
     per_page: int = Field(default=50, ge=1, le=1000)
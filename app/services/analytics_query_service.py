@@ -0,0 +1,320 @@
+"""
+Ad-hoc job aggregations compiled to a single GROUP BY, on raw jobs or daily rollups,
+or answered from the in-memory columnar job store
+"""
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import asc, desc, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.quantum_models import JobDailyRollup, QuantumJob
+from app.schemas.quantum_schemas import AnalyticsQuery, FilterCondition, FilterParams
+from app.services.columnar_job_store import columnar_job_store
+from app.services.job_rollup_service import seconds_between
+from app.services.query_filters import compile_filters, filter_conditions, parse_filter_expression, FILTER_FIELDS
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = {
+    'backend': QuantumJob.backend_name,
+    'status': QuantumJob.status,
+    'user': QuantumJob.user_id,
+    'program_id': QuantumJob.program_id,
+    'time': None,  # bucketed creation_date, see time_bucket
+}
+ROLLUP_DIMENSIONS = {'backend': JobDailyRollup.backend_name, 'status': JobDailyRollup.status, 'time': None}
+
+# (duration, quantile) for percentile metrics
+PERCENTILES = {
+    f"p{int(q * 100)}_{duration}": (duration, q)
+    for duration in ('queue_time', 'execution_time')
+    for q in (0.5, 0.9, 0.99)
+}
+AGGREGATE_METRICS = {'count', 'sum_shots', 'avg_shots', 'avg_queue_time', 'avg_execution_time'}
+METRICS = AGGREGATE_METRICS | set(PERCENTILES)
+
+BUCKET_WIDTHS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+}
+
+class QueryCostExceeded(Exception):
+    """Raised when an analytics query exceeds its execution budget"""
+
+def _utc_bound(value: Any) -> datetime:
+    """creation_date filter value as naive UTC, the time zone of the daily rollup days"""
+    value = FILTER_FIELDS['creation_date'].parse(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _time_bucket(dialect: str, column: Any, bucket: str) -> Any:
+    """ISO string label of the bucket a timestamp falls in (weeks start on Monday)"""
+    if dialect == 'postgresql':
+        formats = {'hour': 'YYYY-MM-DD"T"HH24:00:00', 'day': 'YYYY-MM-DD', 'week': 'YYYY-MM-DD', 'month': 'YYYY-MM-DD'}
+        return func.to_char(func.date_trunc(bucket, func.timezone('UTC', column)), formats[bucket])
+    if bucket == 'hour':
+        return func.strftime('%Y-%m-%dT%H:00:00', column)
+    if bucket == 'day':
+        return func.date(column)
+    if bucket == 'week':
+        return func.date(column, '-6 days', 'weekday 1')
+    return func.strftime('%Y-%m-01', column)
+
+class AnalyticsQueryService:
+    """Compiles AnalyticsQuery specs to SQL.
+
+    A spec whose grain is covered by job_daily_rollups (backend/status/day
+    or coarser, no percentiles, filters on backend, status and whole days)
+    is answered from the rollups; everything else becomes one GROUP BY over
+    quantum_jobs. With engine='columnar' the same spec is evaluated by the
+    vectorized kernels of the columnar job store instead. Queries are bounded by bucket count, result size and an
+    execution time budget.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def run(self, spec: AnalyticsQuery) -> Dict[str, Any]:
+        """Execute a query spec; raises ValueError on invalid specs and QueryCostExceeded over budget"""
+        conditions = list(spec.conditions) + parse_filter_expression(spec.filter)
+        self._validate(spec)
+        filters = FilterParams(conditions=conditions or None)
+        compile_filters(filters)  # validates fields and operators
+        self._check_bucket_count(spec, filters)
+        if spec.engine == 'columnar':
+            return self._run_columnar(spec, conditions)
+
+        use_rollup = self._rollup_covers(spec, filters)
+        if use_rollup:
+            columns, statement = self._compile_rollup(spec, filters)
+        else:
+            columns, statement = self._compile_jobs(spec, filters)
+
+        started = time.perf_counter()
+        with self._time_budget():
+            rows = self.db.execute(statement).all()
+
+        truncated = len(rows) > spec.limit
+        results = [self._finish_row(columns, row) for row in rows[:spec.limit]]
+        return {
+            'dimensions': spec.dimensions,
+            'metrics': spec.metrics,
+            'time_bucket': spec.time_bucket,
+            'source': JobDailyRollup.__tablename__ if use_rollup else QuantumJob.__tablename__,
+            'rows': results,
+            'truncated': truncated,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def _run_columnar(self, spec: AnalyticsQuery, conditions: List[FilterCondition]) -> Dict[str, Any]:
+        if not columnar_job_store.loaded:
+            raise ValueError("The columnar engine is not available (disabled or still loading)")
+
+        started = time.perf_counter()
+        rows = columnar_job_store.aggregate(spec.dimensions, spec.metrics, spec.time_bucket, conditions)
+        order = spec.order_by or ('time' if 'time' in spec.dimensions else None)
+        if order is not None:
+            # NULLs first ascending, as in SQLite
+            rows.sort(key=lambda row: (row[order] is not None, row[order] or 0), reverse=spec.descending and bool(spec.order_by))
+
+        columns = spec.dimensions + spec.metrics
+        results = [self._finish_row(columns, tuple(row[name] for name in columns)) for row in rows[:spec.limit]]
+        return {
+            'dimensions': spec.dimensions,
+            'metrics': spec.metrics,
+            'time_bucket': spec.time_bucket,
+            'source': 'columnar',
+            'rows': results,
+            'truncated': len(rows) > spec.limit,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def _validate(self, spec: AnalyticsQuery):
+        unknown = [d for d in spec.dimensions if d not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimensions: {', '.join(unknown)}. Valid: {', '.join(DIMENSIONS)}")
+        unknown = [m for m in spec.metrics if m not in METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(unknown)}. Valid: {', '.join(sorted(METRICS))}")
+        if 'time' in spec.dimensions and spec.time_bucket is None:
+            raise ValueError("The 'time' dimension requires time_bucket (hour, day, week or month)")
+        if spec.order_by is not None and spec.order_by not in spec.dimensions + spec.metrics:
+            raise ValueError("order_by must be one of the requested dimensions or metrics")
+        if spec.order_by in PERCENTILES:
+            raise ValueError("Ordering by a percentile metric is not supported")
+
+    def _check_bucket_count(self, spec: AnalyticsQuery, filters: FilterParams):
+        """Reject time-bucketed queries whose range would produce too many buckets"""
+        if 'time' not in spec.dimensions:
+            return
+        start, end = None, None
+        for condition in filter_conditions(filters):
+            if condition.field != 'creation_date':
+                continue
+            value = FILTER_FIELDS['creation_date'].parse(condition.value)
+            if condition.op in ('gt', 'gte'):
+                start = value if start is None else max(start, value)
+            elif condition.op in ('lt', 'lte'):
+                end = value if end is None else min(end, value)
+        if start is None or end is None:
+            first, last = self.db.query(func.min(QuantumJob.creation_date), func.max(QuantumJob.creation_date)).one()
+            start = start or first
+            end = end or last
+        if start is None or end is None:
+            return
+
+        buckets = (end.replace(tzinfo=None) - start.replace(tzinfo=None)) / BUCKET_WIDTHS[spec.time_bucket]
+        if buckets > settings.analytics_max_buckets:
+            raise ValueError(
+                f"Query spans ~{int(buckets)} {spec.time_bucket} buckets (limit {settings.analytics_max_buckets}); "
+                f"narrow the creation_date range or use a coarser time_bucket"
+            )
+
+    def _rollup_covers(self, spec: AnalyticsQuery, filters: FilterParams) -> bool:
+        if any(d not in ROLLUP_DIMENSIONS for d in spec.dimensions):
+            return False
+        if ('time' in spec.dimensions and spec.time_bucket == 'hour') or any(m in PERCENTILES for m in spec.metrics):
+            return False
+        for condition in filter_conditions(filters):
+            if condition.field in ('status', 'backend'):
+                continue
+            if condition.field == 'creation_date' and condition.op in ('gte', 'lt'):
+                value = _utc_bound(condition.value)
+                if (value.hour, value.minute, value.second, value.microsecond) == (0, 0, 0, 0):
+                    continue
+            return False
+        return self.db.query(JobDailyRollup.id).first() is not None
+
+    def _group_columns(self, spec: AnalyticsQuery, dimensions: Dict[str, Any], time_column: Any) -> List[Any]:
+        return [
+            (_time_bucket(self.dialect, time_column, spec.time_bucket) if name == 'time' else dimensions[name]).label(name)
+            for name in spec.dimensions
+        ]
+
+    def _compile_jobs(self, spec: AnalyticsQuery, filters: FilterParams) -> Tuple[List[str], Any]:
+        group_columns = self._group_columns(spec, DIMENSIONS, QuantumJob.creation_date)
+        durations = {
+            'queue_time': seconds_between(self.dialect, QuantumJob.creation_date, QuantumJob.start_time),
+            'execution_time': seconds_between(self.dialect, QuantumJob.start_time, QuantumJob.end_time),
+        }
+
+        metric_columns = []
+        for metric in spec.metrics:
+            if metric in PERCENTILES:
+                duration, q = PERCENTILES[metric]
+                if self.dialect == 'postgresql':
+                    expression = func.percentile_cont(q).within_group(durations[duration])
+                else:
+                    # No ordered-set aggregates in SQLite: collect the group's values in the same pass
+                    expression = func.group_concat(durations[duration])
+            else:
+                expression = {
+                    'count': lambda: func.count(QuantumJob.id),
+                    'sum_shots': lambda: func.coalesce(func.sum(QuantumJob.shots), 0),
+                    'avg_shots': lambda: func.avg(QuantumJob.shots),
+                    'avg_queue_time': lambda: func.avg(durations['queue_time']),
+                    'avg_execution_time': lambda: func.avg(durations['execution_time']),
+                }[metric]()
+            metric_columns.append(expression.label(metric))
+
+        statement = select(*group_columns, *metric_columns).where(*compile_filters(filters))
+        return self._finish_statement(spec, statement, group_columns)
+
+    def _compile_rollup(self, spec: AnalyticsQuery, filters: FilterParams) -> Tuple[List[str], Any]:
+        group_columns = self._group_columns(spec, ROLLUP_DIMENSIONS, JobDailyRollup.day)
+
+        def ratio(total, count):
+            return func.sum(total) * 1.0 / func.nullif(func.sum(count), 0)
+
+        metric_columns = [{
+            'count': lambda: func.coalesce(func.sum(JobDailyRollup.job_count), 0),
+            'sum_shots': lambda: func.coalesce(func.sum(JobDailyRollup.total_shots), 0),
+            'avg_shots': lambda: ratio(JobDailyRollup.total_shots, JobDailyRollup.shots_count),
+            'avg_queue_time': lambda: ratio(JobDailyRollup.queue_time_sum, JobDailyRollup.queue_time_count),
+            'avg_execution_time': lambda: ratio(JobDailyRollup.execution_time_sum, JobDailyRollup.execution_time_count),
+        }[metric]().label(metric) for metric in spec.metrics]
+
+        rollup_columns = {'status': JobDailyRollup.status, 'backend': JobDailyRollup.backend_name}
+        predicates = []
+        for condition in filter_conditions(filters):
+            if condition.field == 'creation_date':
+                value = _utc_bound(condition.value).date()
+                predicates.append(JobDailyRollup.day >= value if condition.op == 'gte' else JobDailyRollup.day < value)
+            else:
+                column = rollup_columns[condition.field]
+                values = condition.value if isinstance(condition.value, list) else [condition.value]
+                predicates.append(column.in_([str(v) for v in values]))
+
+        statement = select(*group_columns, *metric_columns).where(*predicates)
+        return self._finish_statement(spec, statement, group_columns)
+
+    def _finish_statement(self, spec: AnalyticsQuery, statement: Any, group_columns: List[Any]) -> Tuple[List[str], Any]:
+        if group_columns:
+            statement = statement.group_by(*group_columns)
+        order = spec.order_by or ('time' if 'time' in spec.dimensions else None)
+        if order is not None:
+            direction = desc if spec.descending and spec.order_by else asc
+            statement = statement.order_by(direction(text(order)))
+        # One extra row tells whether the result was truncated
+        return spec.dimensions + spec.metrics, statement.limit(spec.limit + 1)
+
+    def _finish_row(self, columns: List[str], row: Any) -> Dict[str, Any]:
+        result = dict(zip(columns, row))
+        for metric, (_, q) in PERCENTILES.items():
+            value = result.get(metric)
+            if isinstance(value, str):
+                samples = np.array(value.split(','), dtype=float)
+                result[metric] = float(np.quantile(samples, q))
+        for name, value in result.items():
+            if isinstance(value, float):
+                result[name] = round(value, 4)
+        return result
+
+    @contextmanager
+    def _time_budget(self):
+        """Abort the statement once it runs past settings.analytics_query_timeout"""
+        timeout = settings.analytics_query_timeout
+        if self.dialect == 'postgresql':
+            self.db.execute(text(f"SET LOCAL statement_timeout = {int(timeout * 1000)}"))
+            try:
+                yield
+            except Exception as e:
+                if 'statement timeout' in str(e):
+                    self.db.rollback()
+                    raise QueryCostExceeded(f"Analytics query exceeded {timeout}s") from e
+                raise
+            return
+
+        if self.dialect != 'sqlite':
+            yield
+            return
+
+        connection = self.db.connection().connection.driver_connection
+        deadline = time.perf_counter() + timeout
+        exceeded = []
+
+        def check() -> int:
+            if time.perf_counter() > deadline:
+                exceeded.append(True)
+                return 1
+            return 0
+
+        connection.set_progress_handler(check, 10000)
+        try:
+            yield
+        except Exception as e:
+            if exceeded:
+                raise QueryCostExceeded(f"Analytics query exceeded {timeout}s") from e
+            raise
+        finally:
+            connection.set_progress_handler(None, 0)
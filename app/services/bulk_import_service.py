@@ -0,0 +1,235 @@
+"""
+Bulk import of historical job dumps (NDJSON / Parquet) into quantum_jobs
+"""
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+from sqlalchemy import DateTime, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QuantumJob
+from app.services.tag_index_service import TagIndexService
+from app.utils.helpers import parse_timestamp
+
+# Parquet support is optional - NDJSON works without it
+try:
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+JOBS_TABLE = QuantumJob.__table__
+IMPORT_COLUMNS = {c.name for c in JOBS_TABLE.columns} - {'id', 'created_at', 'updated_at'}
+DATETIME_COLUMNS = {c.name for c in JOBS_TABLE.columns if isinstance(c.type, DateTime)}
+
+def iter_ndjson(stream: IO) -> Iterator[Dict[str, Any]]:
+    """Stream job records from a newline-delimited JSON file object"""
+    for line_number, line in enumerate(stream, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed NDJSON line {line_number}")
+            continue
+        if isinstance(record, dict):
+            yield record
+
+def iter_parquet(source: Any, batch_size: int = 10000) -> Iterator[Dict[str, Any]]:
+    """Stream job records from a Parquet file (path or file object) batch by batch"""
+    if not PARQUET_AVAILABLE:
+        raise Exception("pyarrow is required for Parquet import. Please install: pip install pyarrow")
+
+    parquet_file = pq.ParquetFile(source)
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+def iter_chunks(rows: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group a row stream into lists of at most chunk_size rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class ImportProgress:
+    """Running counters for a bulk import"""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_inserted = 0
+        self.rows_skipped = 0
+        self.chunks = 0
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.rows_read / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rows_read': self.rows_read,
+            'rows_inserted': self.rows_inserted,
+            'rows_skipped': self.rows_skipped,
+            'chunks': self.chunks,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'rows_per_second': round(self.rows_per_second, 1)
+        }
+
+class BulkImportService:
+    """Chunked, transaction-batched loader for historical quantum jobs.
+
+    Rows are normalised to the quantum_jobs columns, deduplicated on job_id
+    (within a chunk in Python, against existing rows via ON CONFLICT DO NOTHING)
+    and written with a single executemany INSERT per chunk. Several chunks share
+    one transaction. With defer_indexes the non-unique secondary indexes are
+    dropped for the duration of the load and rebuilt once at the end - only use
+    this for offline backfills, since reads are unindexed meanwhile.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: int = 5000,
+        chunks_per_transaction: int = 20,
+        defer_indexes: bool = False,
+        progress_callback: Optional[Callable[[ImportProgress], None]] = None
+    ):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.chunks_per_transaction = chunks_per_transaction
+        self.defer_indexes = defer_indexes
+        self.progress_callback = progress_callback
+        self.dialect = db.get_bind().dialect.name
+
+    def import_rows(self, rows: Iterable[Dict[str, Any]]) -> ImportProgress:
+        """Import a stream of job records and return the final progress counters"""
+        progress = ImportProgress()
+        deferred = self._drop_secondary_indexes() if self.defer_indexes else []
+
+        try:
+            pending_chunks = 0
+            for chunk in iter_chunks(rows, self.chunk_size):
+                progress.rows_read += len(chunk)
+                records = self._prepare_chunk(chunk)
+                progress.rows_skipped += len(chunk) - len(records)
+
+                inserted = self._insert_chunk(records) if records else 0
+                progress.rows_inserted += inserted
+                progress.rows_skipped += len(records) - inserted
+                progress.chunks += 1
+
+                pending_chunks += 1
+                if pending_chunks >= self.chunks_per_transaction:
+                    self.db.commit()
+                    pending_chunks = 0
+
+                logger.info(
+                    f"Bulk import: {progress.rows_read} rows read, {progress.rows_inserted} inserted "
+                    f"({progress.rows_per_second:.0f} rows/s)"
+                )
+                if self.progress_callback:
+                    self.progress_callback(progress)
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            if deferred:
+                self._recreate_indexes(deferred)
+
+        progress.finished_at = time.perf_counter()
+        logger.info(f"Bulk import finished: {progress.to_dict()}")
+        return progress
+
+    def _prepare_chunk(self, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep known columns, parse timestamps and drop rows without (or repeating) a job_id"""
+        records = {}
+        for row in chunk:
+            job_id = row.get('job_id')
+            if not job_id or str(job_id) in records:
+                continue
+
+            record = {key: value for key, value in row.items() if key in IMPORT_COLUMNS}
+            for column in DATETIME_COLUMNS & record.keys():
+                if isinstance(record[column], str):
+                    record[column] = parse_timestamp(record[column])
+            record['job_id'] = str(job_id)
+            records[record['job_id']] = record
+
+        # executemany needs every parameter set to carry the same keys
+        columns = set().union(*(record.keys() for record in records.values())) if records else set()
+        return [{column: record.get(column) for column in columns} for record in records.values()]
+
+    def _insert_chunk(self, records: List[Dict[str, Any]]) -> int:
+        """Insert one chunk with executemany, ignoring job_ids that already exist"""
+        if self.dialect == 'sqlite':
+            stmt = sqlite_insert(JOBS_TABLE).on_conflict_do_nothing(index_elements=['job_id'])
+        elif self.dialect == 'postgresql':
+            stmt = pg_insert(JOBS_TABLE).on_conflict_do_nothing(index_elements=['job_id'])
+        else:
+            existing = {
+                job_id for (job_id,) in self.db.query(QuantumJob.job_id).filter(
+                    QuantumJob.job_id.in_([r['job_id'] for r in records])
+                )
+            }
+            records = [r for r in records if r['job_id'] not in existing]
+            if not records:
+                return 0
+            stmt = insert(JOBS_TABLE)
+
+        result = self.db.execute(stmt, records)
+        inserted = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(records)
+
+        # Postings are idempotent, so re-indexing jobs skipped as duplicates is harmless
+        tagged_ids = [r['job_id'] for r in records if r.get('tags')]
+        if tagged_ids:
+            TagIndexService(self.db).index_jobs(
+                self.db.query(QuantumJob.id, QuantumJob.tags).filter(QuantumJob.job_id.in_(tagged_ids))
+            )
+        return inserted
+
+    def _drop_secondary_indexes(self) -> List[Any]:
+        """Drop non-unique quantum_jobs indexes so the load does not maintain them row by row"""
+        if self.dialect not in ('sqlite', 'postgresql'):
+            return []
+
+        connection = self.db.connection()
+        dropped = []
+        for index in JOBS_TABLE.indexes:
+            if index.unique:
+                continue
+            index.drop(bind=connection, checkfirst=True)
+            dropped.append(index)
+        self.db.commit()
+
+        logger.info(f"Deferred {len(dropped)} secondary indexes for bulk import")
+        return dropped
+
+    def _recreate_indexes(self, indexes: List[Any]):
+        """Rebuild indexes dropped by _drop_secondary_indexes"""
+        connection = self.db.connection()
+        for index in indexes:
+            index.create(bind=connection, checkfirst=True)
+        self.db.commit()
+        logger.info(f"Rebuilt {len(indexes)} secondary indexes after bulk import")
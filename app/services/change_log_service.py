@@ -0,0 +1,188 @@
+"""
+Change data capture: change_log outbox entries, cursor reads, compaction and retention
+"""
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.quantum_models import ChangeLog, ChangeLogHorizon
+
+logger = logging.getLogger(__name__)
+
+ENTITIES = ('job', 'backend', 'queue')
+
+# How long entries stay unreadable on databases that may commit them out of sequence order
+COMMIT_LAG = timedelta(seconds=5)
+
+# Bookkeeping columns, and bulky job payloads that are read from /jobs/{job_id} instead
+UNLOGGED_FIELDS = {
+    'job': {'id', 'created_at', 'updated_at', 'qobj', 'result', 'transpiled_circuits', 'properties'},
+    'backend': {'id', 'created_at', 'updated_at'},
+    'queue': {'id', 'created_at', 'last_updated'},
+}
+
+def _json_value(value: Any) -> Any:
+    """JSON-storable form of a column value; datetimes as naive UTC ISO strings"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def created_fields(entity: str, row: Any) -> Dict[str, Any]:
+    """All logged fields of a newly created row"""
+    return {
+        column.name: _json_value(getattr(row, column.key))
+        for column in row.__table__.columns if column.name not in UNLOGGED_FIELDS[entity]
+    }
+
+def changed_fields(entity: str, row: Any, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Logged fields whose new value differs from the row's current one; call before applying them"""
+    changes = {}
+    for name, value in values.items():
+        if name in UNLOGGED_FIELDS[entity]:
+            continue
+        new = _json_value(value)
+        if _json_value(getattr(row, name, None)) != new:
+            changes[name] = new
+    return changes
+
+def record_change(db: Session, entity: str, key: str, operation: str, changes: Dict[str, Any]):
+    """Add a change_log entry to the session; it commits with the change it describes"""
+    if changes:
+        db.add(ChangeLog(entity=entity, entity_key=key, operation=operation, changes=changes))
+
+class ChangeNotifier:
+    """Wakes this process's long-polling /changes requests after changes commit"""
+
+    def __init__(self):
+        self.waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+
+    def notify(self):
+        for loop, future in list(self.waiters):
+            loop.call_soon_threadsafe(lambda future=future: future.done() or future.set_result(None))
+
+    async def wait(self, timeout: float):
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        self.waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.waiters.discard(waiter)
+
+class ChangeLogService:
+    """Reads and maintains the change_log outbox.
+
+    Entries get increasing sequence numbers and a consumer only keeps the
+    last one it has seen. Sequence numbers are taken at insert, so they are
+    in commit order only where writers are serialized (SQLite). Elsewhere
+    concurrent transactions can commit a lower number after a higher one
+    was read, and the cursor would skip it: there, reads return only
+    entries older than COMMIT_LAG, which covers transactions shorter than
+    the lag at the cost of that much delivery delay. Compaction folds the
+    older entries of an entity into its latest one (merging changed
+    fields), which keeps every cursor converging to the current state;
+    retention then drops entries past the retention age and records the
+    horizon, so cursors older than it are told to resync.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def latest_seq(self) -> int:
+        return self.db.query(func.max(ChangeLog.seq)).scalar() or 0
+
+    def pruned_through(self) -> int:
+        horizon = self.db.query(ChangeLogHorizon).first()
+        return horizon.pruned_through if horizon is not None else 0
+
+    def changes(self, since: int, limit: int = 100, entities: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Entries after `since`, oldest first, and the cursor to continue from"""
+        query = self.db.query(ChangeLog).filter(ChangeLog.seq > since)
+        if self.db.get_bind().dialect.name != 'sqlite':
+            query = query.filter(ChangeLog.changed_at < datetime.now(timezone.utc) - COMMIT_LAG)
+        if entities:
+            query = query.filter(ChangeLog.entity.in_(list(entities)))
+        rows = query.order_by(ChangeLog.seq).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'changes': [
+                {
+                    'seq': row.seq,
+                    'entity': row.entity,
+                    'key': row.entity_key,
+                    'operation': row.operation,
+                    'changes': row.changes,
+                    'changed_at': row.changed_at
+                }
+                for row in rows
+            ],
+            'next_since': rows[-1].seq if rows else since,
+            'has_more': has_more,
+            'reset': since < self.pruned_through()
+        }
+
+    def compact(self, older_than: timedelta, batch_size: int = 1000) -> int:
+        """Fold entries older than `older_than` into the latest entry of their entity; returns entries removed"""
+        cutoff = datetime.utcnow() - older_than
+        keys = self.db.query(ChangeLog.entity, ChangeLog.entity_key).filter(
+            ChangeLog.changed_at < cutoff
+        ).group_by(ChangeLog.entity, ChangeLog.entity_key).having(func.count(ChangeLog.seq) > 1).all()
+
+        removed = 0
+        for start in range(0, len(keys), batch_size):
+            for entity, key in keys[start:start + batch_size]:
+                rows = self.db.query(ChangeLog).filter(
+                    ChangeLog.entity == entity, ChangeLog.entity_key == key, ChangeLog.changed_at < cutoff
+                ).order_by(ChangeLog.seq).all()
+                latest = rows[-1]
+                merged: Dict[str, Any] = {}
+                for row in rows:
+                    merged.update(row.changes or {})
+                latest.changes = merged
+                if rows[0].operation == 'created':
+                    latest.operation = 'created'
+                for row in rows[:-1]:
+                    self.db.delete(row)
+                removed += len(rows) - 1
+            self.db.commit()
+        if removed:
+            logger.info(f"Change log compacted {removed} entries")
+        return removed
+
+    def prune(self, retention: timedelta) -> int:
+        """Drop entries older than `retention` and advance the resync horizon; returns entries removed"""
+        cutoff = datetime.utcnow() - retention
+        through = self.db.query(func.max(ChangeLog.seq)).filter(ChangeLog.changed_at < cutoff).scalar()
+        if through is None:
+            return 0
+        removed = self.db.execute(delete(ChangeLog).where(ChangeLog.seq <= through)).rowcount
+        horizon = self.db.query(ChangeLogHorizon).first()
+        if horizon is None:
+            self.db.add(ChangeLogHorizon(id=1, pruned_through=through))
+        else:
+            horizon.pruned_through = max(horizon.pruned_through, through)
+        self.db.commit()
+        logger.info(f"Change log pruned {removed} entries through seq {through}")
+        return removed
+
+    def maintain(self) -> Dict[str, int]:
+        """Compaction then retention, with the configured ages"""
+        return {
+            'compacted': self.compact(timedelta(hours=settings.change_log_compact_after_hours)),
+            'pruned': self.prune(timedelta(days=settings.change_log_retention_days))
+        }
+
+# Global instance
+change_notifier = ChangeNotifier()
@@ -0,0 +1,375 @@
+"""
+In-process columnar replica of the analytically relevant job fields
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QuantumJob
+from app.schemas.quantum_schemas import FilterCondition
+from app.services.job_rollup_service import epoch_seconds
+from app.services.query_filters import FILTER_FIELDS
+from app.utils.helpers import record_field
+
+logger = logging.getLogger(__name__)
+
+TIME_COLUMNS = ('creation_date', 'start_time', 'end_time')
+NUMERIC_COLUMNS = ('shots', 'circuits')
+CODED_COLUMNS = ('backend_name', 'status', 'user_id', 'program_id')
+
+# Analytics dimension / filter field -> column
+DIMENSION_COLUMNS = {'backend': 'backend_name', 'status': 'status', 'user': 'user_id', 'program_id': 'program_id'}
+FILTER_COLUMNS = {
+    'status': 'status', 'backend': 'backend_name', 'user_id': 'user_id',
+    'shots': 'shots', 'circuits': 'circuits',
+    'creation_date': 'creation_date', 'start_time': 'start_time', 'end_time': 'end_time',
+}
+
+NULL_CODE = -1
+MISSING_CODE = -2  # filter value that no row carries
+NULL_BUCKET = np.iinfo(np.int64).min
+
+def to_epoch(value: Any) -> float:
+    """Epoch seconds of a datetime (naive values are UTC), NaN for missing values"""
+    if not isinstance(value, datetime):
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class Dictionary:
+    """Dictionary encoding of a string column; NULL_CODE stands for NULL"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return NULL_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, values: Iterable[Any]) -> np.ndarray:
+        return np.array([self.codes.get(str(value), MISSING_CODE) for value in values], dtype=np.int32)
+
+    def decode(self, code: int) -> Optional[str]:
+        return None if code == NULL_CODE else self.values[code]
+
+def _bucket_keys(timestamps: np.ndarray, bucket: str) -> np.ndarray:
+    """Integer bucket per timestamp: hours, days, Monday-start weeks (as day numbers) or months since epoch"""
+    valid = ~np.isnan(timestamps)
+    keys = np.full(timestamps.shape, NULL_BUCKET, dtype=np.int64)
+    seconds = timestamps[valid]
+    if bucket == 'hour':
+        keys[valid] = np.floor(seconds / 3600).astype(np.int64)
+    elif bucket == 'day':
+        keys[valid] = np.floor(seconds / 86400).astype(np.int64)
+    elif bucket == 'week':
+        days = np.floor(seconds / 86400).astype(np.int64)
+        keys[valid] = days - (days + 3) % 7  # 1970-01-01 was a Thursday
+    else:
+        keys[valid] = seconds.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+    return keys
+
+def _bucket_label(key: int, bucket: str) -> Optional[str]:
+    """Same labels as the SQL engine's time buckets"""
+    if key == NULL_BUCKET:
+        return None
+    if bucket == 'hour':
+        return f"{np.datetime64(key, 'h')}:00:00"
+    if bucket == 'month':
+        return f"{np.datetime64(key, 'M')}-01"
+    return str(np.datetime64(key, 'D'))
+
+def _grouped_quantile(groups: np.ndarray, values: np.ndarray, q: float, n_groups: int) -> np.ndarray:
+    """Per-group linear-interpolated quantile (np.quantile semantics), NaN for empty groups"""
+    valid = ~np.isnan(values)
+    groups, values = groups[valid], values[valid]
+    result = np.full(n_groups, np.nan)
+    if not values.size:
+        return result
+
+    order = np.lexsort((values, groups))
+    values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+
+    position = q * (counts[present] - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    fraction = position - lower
+    base = starts[present]
+    result[present] = values[base + lower] * (1 - fraction) + values[base + upper] * fraction
+    return result
+
+class ColumnarJobStore:
+    """NumPy column arrays for job timestamps, durations, shots and dictionary-encoded strings.
+
+    Loaded from the database at startup and kept current by the sync
+    pipeline, it answers analytics aggregations with vectorized masks and
+    bincount group-bys instead of row scans. Arrays grow by doubling; rows
+    beyond `size` are unused capacity.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.size = 0
+        self.columns: Dict[str, np.ndarray] = {}
+        self.dictionaries: Dict[str, Dictionary] = {}
+        self.row_of: Dict[str, int] = {}
+        self.loaded = False
+        self.loaded_at: Optional[datetime] = None
+        self._reset(initial_capacity)
+
+    def _reset(self, capacity: int):
+        self.size = 0
+        self.row_of = {}
+        self.dictionaries = {name: Dictionary() for name in CODED_COLUMNS}
+        self.columns = {name: np.full(capacity, np.nan) for name in TIME_COLUMNS + NUMERIC_COLUMNS}
+        self.columns.update({name: np.full(capacity, NULL_CODE, dtype=np.int32) for name in CODED_COLUMNS})
+
+    def _reserve(self, rows: int):
+        capacity = len(self.columns['creation_date'])
+        if self.size + rows <= capacity:
+            return
+        while capacity < self.size + rows:
+            capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.full(capacity, NULL_CODE if column.dtype == np.int32 else np.nan, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def _append_batch(self, job_ids: Sequence[str], values: Dict[str, Sequence[Any]]):
+        count = len(job_ids)
+        self._reserve(count)
+        start, end = self.size, self.size + count
+        for name in TIME_COLUMNS + NUMERIC_COLUMNS:
+            self.columns[name][start:end] = np.array(values[name], dtype=float)
+        for name in CODED_COLUMNS:
+            encode = self.dictionaries[name].encode
+            self.columns[name][start:end] = [encode(value) for value in values[name]]
+        self.row_of.update(zip(job_ids, range(start, end)))
+        self.size = end
+
+    def load(self, db: Session, batch_size: int = 50000):
+        """(Re)build the store from every job in the database.
+
+        Reloads build into a separate store and swap its arrays in at the
+        end, so a reload running in a threadpool never exposes a partial store.
+        """
+        dialect = db.get_bind().dialect.name
+        fresh = ColumnarJobStore()
+        statement = select(
+            QuantumJob.job_id,
+            *(epoch_seconds(dialect, getattr(QuantumJob, name)) for name in TIME_COLUMNS),
+            *(getattr(QuantumJob, name) for name in NUMERIC_COLUMNS + CODED_COLUMNS),
+        ).order_by(QuantumJob.id).execution_options(yield_per=batch_size)
+
+        names = TIME_COLUMNS + NUMERIC_COLUMNS + CODED_COLUMNS
+        for rows in db.execute(statement).partitions():
+            job_ids, *columns = zip(*rows)
+            fresh._append_batch(job_ids, {
+                name: [np.nan if value is None else value for value in column] if name not in CODED_COLUMNS else column
+                for name, column in zip(names, columns)
+            })
+
+        # Columns before size: a reader between the two sees at most the old row count
+        self.columns, self.dictionaries, self.row_of = fresh.columns, fresh.dictionaries, fresh.row_of
+        self.size = fresh.size
+        self.loaded = True
+        self.loaded_at = datetime.now()
+        logger.info(f"Columnar job store loaded {self.size} jobs")
+
+    def append_jobs(self, jobs: Iterable[Any]):
+        """Add new jobs and update changed ones (dicts or QuantumJob rows)"""
+        if not self.loaded:
+            return
+        new_ids, new_values = [], {name: [] for name in TIME_COLUMNS + NUMERIC_COLUMNS + CODED_COLUMNS}
+        for job in jobs:
+            job_id = record_field(job, 'job_id')
+            row = self.row_of.get(job_id)
+            values = {name: to_epoch(record_field(job, name)) for name in TIME_COLUMNS}
+            values.update({
+                name: record_field(job, name, np.nan) for name in NUMERIC_COLUMNS
+            })
+            values.update({name: record_field(job, name) for name in CODED_COLUMNS})
+            if row is None:
+                new_ids.append(job_id)
+                for name, value in values.items():
+                    new_values[name].append(value)
+            else:
+                for name, value in values.items():
+                    self.columns[name][row] = self.dictionaries[name].encode(value) if name in CODED_COLUMNS else value
+        if new_ids:
+            self._append_batch(new_ids, new_values)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name][:self.size]
+
+    def duration(self, name: str) -> np.ndarray:
+        if name == 'queue_time':
+            return self.column('start_time') - self.column('creation_date')
+        return self.column('end_time') - self.column('start_time')
+
+    def creation_range(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        created = self.column('creation_date')
+        if not created.size or np.isnan(created).all():
+            return None, None
+        return tuple(datetime.fromtimestamp(value, tz=timezone.utc) for value in (np.nanmin(created), np.nanmax(created)))
+
+    def mask(self, conditions: Iterable[FilterCondition]) -> np.ndarray:
+        """Rows matching all conditions (validated against FILTER_FIELDS)"""
+        selected = np.ones(self.size, dtype=bool)
+        for condition in conditions:
+            field = FILTER_FIELDS.get(condition.field)
+            if field is None:
+                raise ValueError(f"Unknown filter field '{condition.field}'. Valid fields: {', '.join(FILTER_FIELDS)}")
+            if condition.op not in field.ops:
+                raise ValueError(f"Operator '{condition.op}' not supported for '{condition.field}'. Valid: {', '.join(sorted(field.ops))}")
+
+            name = FILTER_COLUMNS[condition.field]
+            column = self.column(name)
+            values = condition.value if isinstance(condition.value, list) else [condition.value]
+            parsed = [field.parse(value) for value in values]
+
+            if name in CODED_COLUMNS:
+                selected &= np.isin(column, self.dictionaries[name].lookup(parsed))
+                continue
+            if name in TIME_COLUMNS:
+                parsed = [to_epoch(value) for value in parsed]
+            if condition.op == 'in':
+                selected &= np.isin(column, parsed)
+            else:
+                value = parsed[0]
+                selected &= {
+                    'eq': lambda: column == value,
+                    'gt': lambda: column > value,
+                    'gte': lambda: column >= value,
+                    'lt': lambda: column < value,
+                    'lte': lambda: column <= value,
+                }[condition.op]()
+        return selected
+
+    def aggregate(
+        self,
+        dimensions: Sequence[str],
+        metrics: Sequence[str],
+        time_bucket: Optional[str] = None,
+        conditions: Iterable[FilterCondition] = ()
+    ) -> List[Dict[str, Any]]:
+        """Group the matching rows by dimensions and compute metrics, one dict per group"""
+        selected = self.mask(conditions)
+        rows = np.flatnonzero(selected)
+
+        keys = []
+        for name in dimensions:
+            if name == 'time':
+                keys.append(_bucket_keys(self.column('creation_date')[rows], time_bucket))
+            else:
+                keys.append(self.column(DIMENSION_COLUMNS[name])[rows].astype(np.int64))
+
+        if keys:
+            # Factorize each key, then combine them into one mixed-radix key so grouping is a 1-D unique
+            factors = [np.unique(key, return_inverse=True) for key in keys]
+            combined = np.ravel_multi_index(
+                [inverse.reshape(-1) for _, inverse in factors], [len(values) for values, _ in factors]
+            )
+            combined_keys, groups = np.unique(combined, return_inverse=True)
+            groups = groups.reshape(-1)
+            positions = np.unravel_index(combined_keys, [len(values) for values, _ in factors])
+            unique_keys = np.stack([values[position] for (values, _), position in zip(factors, positions)], axis=1)
+        else:
+            if not rows.size:
+                return []
+            unique_keys, groups = np.zeros((1, 0), dtype=np.int64), np.zeros(rows.size, dtype=np.int64)
+        n_groups = len(unique_keys)
+
+        def grouped_sum(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            valid = ~np.isnan(values)
+            sums = np.bincount(groups[valid], weights=values[valid], minlength=n_groups)
+            counts = np.bincount(groups[valid], minlength=n_groups)
+            return sums, counts
+
+        def mean(values: np.ndarray) -> np.ndarray:
+            sums, counts = grouped_sum(values)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+        computed = {}
+        for metric in metrics:
+            if metric == 'count':
+                computed[metric] = np.bincount(groups, minlength=n_groups)
+            elif metric == 'sum_shots':
+                computed[metric] = grouped_sum(self.column('shots')[rows])[0]
+            elif metric == 'avg_shots':
+                computed[metric] = mean(self.column('shots')[rows])
+            elif metric.startswith('avg_'):
+                computed[metric] = mean(self.duration(metric[4:])[rows])
+            else:
+                quantile, duration = metric.split('_', 1)
+                computed[metric] = _grouped_quantile(
+                    groups, self.duration(duration)[rows], int(quantile[1:]) / 100, n_groups
+                )
+
+        results = []
+        for index, key in enumerate(unique_keys):
+            result = {}
+            for name, code in zip(dimensions, key):
+                if name == 'time':
+                    result[name] = _bucket_label(int(code), time_bucket)
+                else:
+                    result[name] = self.dictionaries[DIMENSION_COLUMNS[name]].decode(int(code))
+            for metric, values in computed.items():
+                value = values[index]
+                if metric in ('count', 'sum_shots'):
+                    result[metric] = int(value)
+                else:
+                    result[metric] = None if np.isnan(value) else float(value)
+            results.append(result)
+        return results
+
+    def job_statistics(self) -> Dict[str, Any]:
+        """Same figures as DatabaseService.get_job_statistics"""
+        counts = {row['status']: row['count'] for row in self.aggregate(['status'], ['count'])}
+        averages = self.aggregate([], ['avg_queue_time', 'avg_execution_time'])
+        averages = averages[0] if averages else {}
+        return {
+            'total_jobs': self.size,
+            'running_jobs': counts.get('RUNNING', 0),
+            'queued_jobs': counts.get('QUEUED', 0),
+            'completed_jobs': counts.get('DONE', 0),
+            'error_jobs': counts.get('ERROR', 0),
+            'cancelled_jobs': counts.get('CANCELLED', 0),
+            'average_queue_time': averages.get('avg_queue_time') or None,
+            'average_execution_time': averages.get('avg_execution_time') or None
+        }
+
+    def job_trends(self, since: datetime) -> Dict[str, Any]:
+        """Same shape as DatabaseService.get_job_trends"""
+        rows = self.aggregate(
+            ['time'], ['count'], 'day', [FilterCondition(field='creation_date', op='gte', value=since)]
+        )
+        return {'daily_jobs': [{'date': row['time'], 'count': row['count']} for row in rows]}
+
+    def backend_utilization(self, since: datetime) -> Dict[str, Any]:
+        """Same shape as DatabaseService.get_backend_utilization"""
+        rows = self.aggregate(
+            ['backend'], ['count', 'sum_shots'], conditions=[FilterCondition(field='creation_date', op='gte', value=since)]
+        )
+        return {
+            'weekly_utilization': [
+                {'backend': row['backend'], 'job_count': row['count'], 'total_shots': row['sum_shots']}
+                for row in sorted(rows, key=lambda row: row['backend'] or '')
+            ]
+        }
+
+# Global instance
+columnar_job_store = ColumnarJobStore()
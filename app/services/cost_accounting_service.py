@@ -0,0 +1,207 @@
+"""
+Cost accounting: numeric job usage extracted at ingest and per (day, backend, user) cost totals
+"""
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, desc, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.quantum_models import JobCostDaily, JobUsage, QuantumJob
+from app.services.job_rollup_service import _day_of
+
+logger = logging.getLogger(__name__)
+
+CostKey = Tuple[date, str, str]  # (day, backend_name, user_id)
+
+def _number(value: Any) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+def parse_usage(usage: Any) -> Tuple[float, float]:
+    """(quantum_seconds, billed_units) from a job's usage payload.
+
+    Runtime jobs report usage as a bare number of quantum seconds, which is
+    also what they are billed on; dict payloads may carry both explicitly.
+    """
+    if isinstance(usage, (int, float)) and not isinstance(usage, bool):
+        return float(usage), float(usage)
+    if not isinstance(usage, dict):
+        return 0.0, 0.0
+    seconds = _number(usage.get('quantum_seconds', usage.get('seconds')))
+    units = _number(usage.get('billed_units', usage.get('billed_seconds', seconds)))
+    return seconds, units
+
+def usage_values(creation_date: Any, backend_name: Optional[str], user_id: Optional[str], cost: Any, usage: Any) -> Optional[Dict[str, Any]]:
+    """JobUsage column values for one job, or None for jobs without a creation date"""
+    day = _day_of(creation_date)
+    if day is None:
+        return None
+    seconds, units = parse_usage(usage)
+    return {
+        'day': day,
+        'backend_name': backend_name or 'unknown',
+        'user_id': user_id or 'unknown',
+        'quantum_seconds': seconds,
+        'billed_units': units,
+        # Jobs without a reported cost are priced by their quantum seconds
+        'cost': _number(cost) if cost is not None else seconds * settings.cost_per_quantum_second,
+    }
+
+class CostAccountingService:
+    """Maintains job_usage and job_cost_daily.
+
+    Each ingested or refreshed job's usage is parsed once into job_usage;
+    the difference from its previous row is applied to job_cost_daily, so
+    totals stay exact without recomputation. Cost reports only read the
+    daily totals.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_jobs(self, jobs: Iterable[QuantumJob]):
+        """Extract usage of new or updated QuantumJob rows and apply it to the daily totals"""
+        values = {}
+        for job in jobs:
+            if getattr(job, 'id', None) is None:
+                continue
+            row = usage_values(job.creation_date, job.backend_name, job.user_id, job.cost, job.usage)
+            if row is not None:
+                values[job.id] = row
+        if not values:
+            return
+
+        deltas: Dict[CostKey, List[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+
+        def apply(row: Any, sign: int):
+            key = (row['day'], row['backend_name'], row['user_id'])
+            delta = deltas[key]
+            delta[0] += sign
+            delta[1] += sign * row['quantum_seconds']
+            delta[2] += sign * row['billed_units']
+            delta[3] += sign * row['cost']
+
+        existing = {usage.job_id: usage for usage in self.db.query(JobUsage).filter(JobUsage.job_id.in_(list(values)))}
+        for job_id, row in values.items():
+            previous = existing.get(job_id)
+            if previous is None:
+                self.db.add(JobUsage(job_id=job_id, **row))
+            else:
+                apply({name: getattr(previous, name) for name in row}, -1)
+                for name, value in row.items():
+                    setattr(previous, name, value)
+            apply(row, 1)
+
+        self._apply_deltas(deltas)
+        self.db.commit()
+
+    def _apply_deltas(self, deltas: Dict[CostKey, List[float]]):
+        totals = {
+            (total.day, total.backend_name, total.user_id): total
+            for total in self.db.query(JobCostDaily).filter(
+                tuple_(JobCostDaily.day, JobCostDaily.backend_name, JobCostDaily.user_id).in_(list(deltas))
+            )
+        }
+        for key, (jobs, seconds, units, cost) in deltas.items():
+            total = totals.get(key)
+            if total is None:
+                if jobs > 0:
+                    self.db.add(JobCostDaily(
+                        day=key[0], backend_name=key[1], user_id=key[2],
+                        job_count=jobs, quantum_seconds=seconds, billed_units=units, cost=cost
+                    ))
+                continue
+            total.job_count += jobs
+            total.quantum_seconds += seconds
+            total.billed_units += units
+            total.cost += cost
+            if total.job_count <= 0:
+                self.db.delete(total)
+
+    def rebuild(self, batch_size: int = 10000) -> int:
+        """Re-extract usage of every job and recompute the daily totals; returns the jobs accounted"""
+        self.db.execute(delete(JobCostDaily))
+        self.db.execute(delete(JobUsage))
+
+        statement = select(
+            QuantumJob.id, QuantumJob.creation_date, QuantumJob.backend_name,
+            QuantumJob.user_id, QuantumJob.cost, QuantumJob.usage
+        ).execution_options(yield_per=batch_size)
+        accounted = 0
+        for rows in self.db.execute(statement).partitions():
+            batch = []
+            for job_id, *fields in rows:
+                row = usage_values(*fields)
+                if row is not None:
+                    batch.append({'job_id': job_id, **row})
+            if batch:
+                self.db.execute(insert(JobUsage), batch)
+                accounted += len(batch)
+
+        self.db.execute(insert(JobCostDaily).from_select(
+            ['day', 'backend_name', 'user_id', 'job_count', 'quantum_seconds', 'billed_units', 'cost'],
+            select(
+                JobUsage.day, JobUsage.backend_name, JobUsage.user_id, func.count(JobUsage.job_id),
+                func.sum(JobUsage.quantum_seconds), func.sum(JobUsage.billed_units), func.sum(JobUsage.cost)
+            ).group_by(JobUsage.day, JobUsage.backend_name, JobUsage.user_id)
+        ))
+        self.db.commit()
+        logger.info(f"Cost accounting rebuilt for {accounted} jobs")
+        return accounted
+
+    def build_if_empty(self) -> int:
+        """Account existing jobs on first start"""
+        if self.db.query(JobUsage.job_id).first() is not None:
+            return 0
+        if self.db.query(QuantumJob.id).first() is None:
+            return 0
+        return self.rebuild()
+
+    def analysis(self, start_date: date, end_date: date, top_users: int = 10) -> Dict[str, Any]:
+        """Cost totals, breakdowns by backend and user, and the daily trend over an inclusive date range"""
+        in_range = (JobCostDaily.day >= start_date, JobCostDaily.day <= end_date)
+        measures = (
+            func.coalesce(func.sum(JobCostDaily.cost), 0.0).label('cost'),
+            func.coalesce(func.sum(JobCostDaily.quantum_seconds), 0.0).label('quantum_seconds'),
+            func.coalesce(func.sum(JobCostDaily.billed_units), 0.0).label('billed_units'),
+            func.coalesce(func.sum(JobCostDaily.job_count), 0).label('job_count'),
+        )
+
+        def breakdown(column: Any, name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+            query = self.db.query(column, *measures).filter(*in_range).group_by(column).order_by(desc('cost'))
+            if limit is not None:
+                query = query.limit(limit)
+            return [
+                {
+                    name: row[0],
+                    'cost': round(row.cost, 2),
+                    'quantum_seconds': round(row.quantum_seconds, 4),
+                    'billed_units': round(row.billed_units, 4),
+                    'job_count': row.job_count
+                }
+                for row in query.all()
+            ]
+
+        totals = self.db.query(*measures).filter(*in_range).one()
+        trends = self.db.query(JobCostDaily.day, *measures).filter(*in_range).group_by(JobCostDaily.day).order_by(JobCostDaily.day)
+        return {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'total_cost': round(totals.cost, 2),
+            'total_quantum_seconds': round(totals.quantum_seconds, 4),
+            'total_billed_units': round(totals.billed_units, 4),
+            'job_count': totals.job_count,
+            'average_job_cost': round(totals.cost / totals.job_count, 4) if totals.job_count else 0.0,
+            'cost_by_backend': breakdown(JobCostDaily.backend_name, 'backend'),
+            'cost_by_user': breakdown(JobCostDaily.user_id, 'user_id', top_users),
+            'cost_trends': [
+                {'date': row.day.isoformat(), 'cost': round(row.cost, 2), 'quantum_seconds': round(row.quantum_seconds, 4), 'job_count': row.job_count}
+                for row in trends.all()
+            ]
+        }
@@ -0,0 +1,92 @@
+"""
+Precomputed dashboard snapshot published by the sync pipeline
+"""
+import hashlib
+import logging
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import DATA_DOMAINS, data_generation
+from app.core.content_negotiation import BROTLI_AVAILABLE, JSON_MEDIA_TYPE, EncodedVariants
+from app.services.database_service import DatabaseService
+from app.services.event_broadcaster import event_broadcaster
+from app.schemas.quantum_schemas import DashboardDataSchema, JobStatsSchema, BackendStatsSchema
+
+logger = logging.getLogger(__name__)
+
+class PublishedSnapshot(NamedTuple):
+    payload: bytes
+    etag: str
+    last_modified: Optional[datetime]
+    variants: EncodedVariants
+
+class DashboardSnapshot:
+    """Serialized dashboard payload, rebuilt after each sync.
+
+    The payload is encoded to JSON bytes once per rebuild and published by
+    reference swap, so /dashboard serves it without touching the database
+    and readers never observe a partially built snapshot. Compressed JSON is
+    prepared at rebuild time; other representations are encoded on first
+    request and kept with the snapshot.
+    """
+
+    def __init__(self):
+        self.current: Optional[PublishedSnapshot] = None
+        self.built_at: Optional[datetime] = None
+
+    async def rebuild(self, db: Session, publish: bool = True) -> PublishedSnapshot:
+        """Query all dashboard sections and publish the serialized result.
+
+        `publish=False` only refreshes this worker's copy: workers applying
+        another worker's invalidation leave the dashboard event to it, so
+        clients get one per change.
+        """
+        db_service = DatabaseService(db)
+
+        job_stats = await db_service.get_job_statistics()
+        backend_stats = await db_service.get_backend_statistics()
+        recent_jobs = await db_service.get_recent_jobs(limit=10)
+        queue_info = await db_service.get_queue_info()
+        system_status = await db_service.get_system_status()
+        backend_utilization = await db_service.get_backend_utilization()
+
+        data = DashboardDataSchema(
+            job_stats=JobStatsSchema(**job_stats),
+            backend_stats=BackendStatsSchema(**backend_stats),
+            recent_jobs=recent_jobs,
+            queue_info=queue_info,
+            system_status=system_status,
+            backend_utilization=backend_utilization
+        )
+        payload = data.model_dump_json().encode()
+
+        variants = EncodedVariants(payload)
+        variants.prepare([(JSON_MEDIA_TYPE, 'gzip')] + ([(JSON_MEDIA_TYPE, 'br')] if BROTLI_AVAILABLE else []))
+
+        snapshot = PublishedSnapshot(
+            payload=payload,
+            etag=f'"{hashlib.sha1(payload).hexdigest()}"',
+            last_modified=data_generation.last_modified_at(DATA_DOMAINS),
+            variants=variants
+        )
+        previous = self.current
+        self.current = snapshot
+        self.built_at = datetime.now()
+        if publish and (previous is None or previous.etag != snapshot.etag):
+            event_broadcaster.publish('dashboard', 'dashboard_update', {
+                'job_stats': job_stats,
+                'backend_stats': backend_stats
+            })
+        return snapshot
+
+    async def get(self, db: Session) -> PublishedSnapshot:
+        """Published snapshot, built on demand before the first sync has run"""
+        snapshot = self.current
+        if snapshot is None:
+            snapshot = await self.rebuild(db)
+        return snapshot
+
+# Global instance
+dashboard_snapshot = DashboardSnapshot()
@@ -1,19 +1,66 @@
 import asyncio
 import logging
+import uuid
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
 from app.core.database import engine
+from app.core.cache import data_generation
+from app.models.quantum_models import JobQueue, QuantumJob
 from app.services.quantum_service import quantum_service
 from app.services.database_service import DatabaseService
+from app.services.queue_history_service import queue_history_service
+from app.services.wait_time_estimator import wait_time_estimator
+from app.services.user_activity_service import user_activity_tracker
+from app.services.usage_heatmap_service import usage_heatmap
+from app.services.throughput_service import throughput_counters
+from app.services.recommendation_service import recommendation_service
+from app.services.dashboard_snapshot import dashboard_snapshot
+from app.services.job_rollup_service import JobRollupService
+from app.services.latency_sketch_service import LatencySketchService
+from app.services.cost_accounting_service import CostAccountingService
+from app.services.columnar_job_store import columnar_job_store
+from app.services.event_broadcaster import event_broadcaster, job_event_fields
+from app.services.change_log_service import ChangeLogService, changed_fields
+from app.services.job_state import load_job_models
+from app.utils.helpers import try_lock_file
 
 logger = logging.getLogger(__name__)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Upstream job fetches a refresh runs at once
+REFRESH_CONCURRENCY = 4
+
+# Job fields whose change marks a transition worth re-storing a known job for
+TRANSITION_FIELDS = ('status', 'start_time', 'end_time')
+
 class DataSyncService:
-    """Background service for periodic data synchronization"""
+    """Background service for periodic data synchronization.
+
+    One worker per host runs the sync: the holder of the DATA_SYNC_LOCK
+    file lock. After each write it publishes an invalidation on the 'sync'
+    bus channel, and every other worker applies the same in-memory updates,
+    bumps its data generations and rebuilds its dashboard snapshot.
+    """
     
     def __init__(self):
         self.running = False
+        self.lock = None
+        # Identifies this worker's invalidations, which it has already applied
+        self.origin = uuid.uuid4().hex
+        # Last published queue state per backend, to emit only what changed
+        self.queue_state: Dict[str, Dict[str, Any]] = {}
+    
+    async def run_elected(self, retry_seconds: int = 30):
+        """Run the sync once this worker holds the sync lock; if the holder exits another worker takes over"""
+        while self.lock is None:
+            self.lock = try_lock_file(settings.data_sync_lock)
+            if self.lock is None:
+                await asyncio.sleep(retry_seconds)
+        logger.info("Holding the data sync lock")
+        await self.start()
         
     async def start(self):
         """Start the background sync service"""
@@ -25,12 +72,16 @@ class DataSyncService:
             self.sync_jobs_periodically(),
             self.sync_backends_periodically(),
             self.sync_queue_info_periodically(),
-            self.sync_system_status_periodically()
+            self.sync_system_status_periodically(),
+            self.maintain_change_log_periodically()
         )
     
     async def stop(self):
         """Stop the background sync service"""
         self.running = False
+        if self.lock is not None:
+            self.lock.close()
+            self.lock = None
         logger.info("Stopping data sync service")
     
     async def sync_jobs_periodically(self):
@@ -73,20 +124,203 @@ class DataSyncService:
                 logger.error(f"Error syncing system status: {e}")
                 await asyncio.sleep(240)
     
-    async def sync_jobs(self):
-        """Sync jobs from IBM Quantum"""
+    async def maintain_change_log_periodically(self):
+        """Compact and prune the change log every 15 minutes"""
+        while self.running:
+            try:
+                db = SessionLocal()
+                try:
+                    ChangeLogService(db).maintain()
+                finally:
+                    db.close()
+                await asyncio.sleep(900)
+            except Exception as e:
+                logger.error(f"Error maintaining change log: {e}")
+                await asyncio.sleep(900)
+    
+    async def sync_jobs(self, limit: int = 100, backend: Optional[str] = None):
+        """Sync jobs from IBM Quantum: store new jobs and the state changes of known ones"""
         try:
             db = SessionLocal()
             db_service = DatabaseService(db)
             
-            jobs_data = await quantum_service.get_jobs(limit=100)
-            await db_service.bulk_create_jobs(jobs_data)
+            jobs_data = await quantum_service.get_jobs(limit=limit, backend=backend)
+            job_ids = [job_data['job_id'] for job_data in jobs_data]
+            known = {
+                job.job_id: job for job in db.query(QuantumJob).filter(QuantumJob.job_id.in_(job_ids))
+            } if job_ids else {}
+            new_jobs = await db_service.bulk_create_jobs(
+                [job_data for job_data in jobs_data if job_data['job_id'] not in known]
+            )
+            self._observe_new_jobs(new_jobs)
+            JobRollupService(db).refresh_jobs(new_jobs)
+            LatencySketchService(db).add_jobs(new_jobs)
+            CostAccountingService(db).record_jobs(new_jobs)
             
-            logger.info(f"Synced {len(jobs_data)} jobs")
+            # Known jobs that started, finished or changed status since they were stored
+            changed = [
+                job_data for job_data in jobs_data
+                if job_data['job_id'] in known and any(
+                    job_data.get(field) != getattr(known[job_data['job_id']], field)
+                    for field in TRANSITION_FIELDS
+                )
+            ]
+            updates = await self._store_job_updates(db_service, changed, known)
+            self._observe_job_updates(updates)
+            self._record_job_updates(db, updates)
+            
+            # Generations, ETags and the snapshot only turn over when this sync wrote rows
+            if new_jobs or updates['updated']:
+                data_generation.bump('jobs')
+                self.publish_job_invalidation(new_jobs, updates)
+                if new_jobs or updates['status_changes']:
+                    event_broadcaster.publish('jobs', 'job_update', {
+                        'new_jobs': [job_event_fields(job) for job in new_jobs],
+                        'status_changes': updates['status_changes']
+                    })
+                await dashboard_snapshot.rebuild(db)
+            
+            logger.info(f"Synced {len(jobs_data)} jobs ({len(new_jobs)} new, {len(updates['updated'])} updated)")
             db.close()
         except Exception as e:
             logger.error(f"Error in sync_jobs: {e}")
     
+    async def refresh_jobs(self, job_ids: List[str]) -> List[str]:
+        """Re-fetch specific jobs from IBM Quantum and store their current state"""
+        refreshed = []
+        try:
+            db = SessionLocal()
+            db_service = DatabaseService(db)
+            
+            semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+            async def fetch(job_id: str) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    return await quantum_service.get_job(job_id)
+            jobs_data = [job_data for job_data in await asyncio.gather(*map(fetch, job_ids)) if job_data is not None]
+            known = {
+                job.job_id: job
+                for job in db.query(QuantumJob).filter(QuantumJob.job_id.in_([job_data['job_id'] for job_data in jobs_data]))
+            } if jobs_data else {}
+            updates = await self._store_job_updates(db_service, jobs_data, known)
+            refreshed = [job_data['job_id'] for job_data in jobs_data if job_data['job_id'] in known]
+            
+            if updates['updated']:
+                self._observe_job_updates(updates)
+                self._record_job_updates(db, updates)
+                data_generation.bump('jobs')
+                self.publish_job_invalidation([], updates)
+                if updates['status_changes']:
+                    event_broadcaster.publish('jobs', 'job_update', {'new_jobs': [], 'status_changes': updates['status_changes']})
+                await dashboard_snapshot.rebuild(db)
+            
+            logger.info(f"Refreshed {len(refreshed)} of {len(job_ids)} jobs")
+            db.close()
+        except Exception as e:
+            logger.error(f"Error in refresh_jobs: {e}")
+        return refreshed
+    
+    async def _store_job_updates(self, db_service: DatabaseService, jobs_data: List[Dict[str, Any]],
+                                 known: Dict[str, QuantumJob]) -> Dict[str, List]:
+        """Update stored jobs that changed; returns them, those that just started or finished, and status changes"""
+        # Read the previous state before update_job writes to the same rows
+        previous = {
+            job_id: (job.start_time is not None, job.end_time is not None, job.status)
+            for job_id, job in known.items()
+        }
+        updates = {'updated': [], 'started': [], 'finished': [], 'status_changes': []}
+        for job_data in jobs_data:
+            job_id = job_data['job_id']
+            if job_id not in previous:
+                continue
+            # An identical refetch writes nothing, so it keeps generations and ETags valid
+            if not changed_fields('job', known[job_id], job_data):
+                continue
+            was_started, was_finished, old_status = previous[job_id]
+            job = await db_service.update_job(job_id, job_data)
+            if job is None:
+                continue
+            updates['updated'].append(job)
+            if not was_started and job.start_time is not None:
+                updates['started'].append(job)
+            if not was_finished and job.end_time is not None:
+                updates['finished'].append(job)
+            if job.status != old_status:
+                updates['status_changes'].append({
+                    'job_id': job_id,
+                    'old_status': old_status,
+                    'new_status': job.status,
+                    'job': job_event_fields(job)
+                })
+        return updates
+    
+    def _observe_new_jobs(self, jobs: List[Any]):
+        """Feed new jobs to this worker's in-memory models"""
+        wait_time_estimator.observe_jobs(jobs)
+        user_activity_tracker.observe_jobs(jobs)
+        usage_heatmap.observe_jobs(jobs)
+        throughput_counters.observe_jobs(jobs)
+        columnar_job_store.append_jobs(jobs)
+    
+    def _observe_job_updates(self, updates: Dict[str, List]):
+        """Feed updated jobs to this worker's in-memory models; each transition is counted once"""
+        wait_time_estimator.observe_jobs(updates['started'], timings=['queue'])
+        wait_time_estimator.observe_jobs(updates['finished'], timings=['service'])
+        usage_heatmap.observe_completed(updates['finished'])
+        throughput_counters.observe_jobs(updates['started'], events=['started'])
+        throughput_counters.observe_jobs(updates['finished'], events=['completed'])
+        columnar_job_store.append_jobs(updates['updated'])
+    
+    def _record_job_updates(self, db, updates: Dict[str, List]):
+        """Bring the persisted job-derived tables up to date; done once, by the worker that stored the jobs"""
+        if not updates['updated']:
+            return
+        JobRollupService(db).refresh_jobs(updates['updated'])
+        LatencySketchService(db).refresh_jobs(updates['updated'])
+        CostAccountingService(db).record_jobs(updates['updated'])
+    
+    def publish_invalidation(self, domain: str, **data: Any):
+        """Tell the other workers that `domain` changed in the database"""
+        event_broadcaster.publish('sync', 'invalidate', {'origin': self.origin, 'domain': domain, **data})
+    
+    def publish_job_invalidation(self, new_jobs: List[Any], updates: Dict[str, List]):
+        self.publish_invalidation('jobs', **{
+            'new': [job.job_id for job in new_jobs],
+            **{name: [job.job_id for job in jobs] for name, jobs in updates.items() if name != 'status_changes'}
+        })
+    
+    async def apply_invalidation(self, channel: str, event: Dict[str, Any], message: str):
+        """Bus listener: apply another worker's writes to this worker's in-memory state and caches"""
+        data = event['data']
+        if data.get('origin') == self.origin:
+            return
+        domain = data['domain']
+        db = SessionLocal()
+        try:
+            if domain == 'jobs' and data.get('reload'):
+                await run_in_threadpool(load_job_models, db)
+            elif domain == 'jobs':
+                job_ids = set(data.get('new', [])) | set(data.get('updated', []))
+                jobs = {
+                    job.job_id: job for job in db.query(QuantumJob).filter(QuantumJob.job_id.in_(job_ids))
+                } if job_ids else {}
+                def stored(name: str) -> List[QuantumJob]:
+                    return [jobs[job_id] for job_id in data.get(name, []) if job_id in jobs]
+                self._observe_new_jobs(stored('new'))
+                self._observe_job_updates({name: stored(name) for name in ('updated', 'started', 'finished')})
+            elif domain == 'backends':
+                recommendation_service.load(db)
+            elif domain == 'queue':
+                queue_data = [
+                    {'backend_name': queue.backend_name, 'queue_length': queue.queue_length, 'pending_jobs': queue.pending_jobs}
+                    for queue in db.query(JobQueue).all()
+                ]
+                queue_history_service.record_samples(queue_data)
+                recommendation_service.update_queue(queue_data)
+            data_generation.bump(domain)
+            await dashboard_snapshot.rebuild(db, publish=False)
+        finally:
+            db.close()
+    
     async def sync_backends(self):
         """Sync backends from IBM Quantum"""
         try:
@@ -94,7 +328,12 @@ class DataSyncService:
             db_service = DatabaseService(db)
             
             backends_data = await quantum_service.get_all_backends()
-            await db_service.bulk_upsert_backends(backends_data)
+            changed = await db_service.bulk_upsert_backends(backends_data)
+            recommendation_service.update_backends(backends_data)
+            if changed:
+                data_generation.bump('backends')
+                self.publish_invalidation('backends')
+                await dashboard_snapshot.rebuild(db)
             
             logger.info(f"Synced {len(backends_data)} backends")
             db.close()
@@ -108,13 +347,47 @@ class DataSyncService:
             db_service = DatabaseService(db)
             
             queue_data = await quantum_service.get_queue_info()
-            await db_service.update_queue_info(queue_data)
+            changed = await db_service.update_queue_info(queue_data)
+            
+            # Keep the queue-length time series that update_queue_info overwrites
+            queue_history_service.record_samples(queue_data)
+            queue_history_service.downsample(db)
+            recommendation_service.update_queue(queue_data)
+            if changed:
+                data_generation.bump('queue')
+                self.publish_invalidation('queue')
+                self.publish_queue_deltas(queue_data)
+                await dashboard_snapshot.rebuild(db)
             
             logger.info(f"Synced queue info for {len(queue_data)} backends")
             db.close()
         except Exception as e:
             logger.error(f"Error in sync_queue_info: {e}")
     
+    def publish_queue_deltas(self, queue_data: List[Dict[str, Any]]):
+        """Publish the backends whose queue state changed since the last sync"""
+        updates = []
+        for data in queue_data:
+            backend = data['backend_name']
+            state = {
+                'queue_length': data.get('queue_length'),
+                'pending_jobs': data.get('pending_jobs'),
+                'running_jobs': data.get('running_jobs'),
+                'estimated_wait_time': data.get('estimated_wait_time'),
+                'status': data.get('status')
+            }
+            previous = self.queue_state.get(backend)
+            if previous == state:
+                continue
+            self.queue_state[backend] = state
+            updates.append({
+                'backend': backend,
+                **state,
+                'previous_queue_length': previous['queue_length'] if previous else None
+            })
+        if updates:
+            event_broadcaster.publish('queue', 'queue_update', {'backend_updates': updates})
+    
     async def sync_system_status(self):
         """Sync system status"""
         try:
@@ -122,7 +395,11 @@ class DataSyncService:
             db_service = DatabaseService(db)
             
             status_data = await quantum_service.get_system_status()
-            await db_service.update_system_status(status_data)
+            changed = await db_service.update_system_status(status_data)
+            if changed:
+                data_generation.bump('system')
+                self.publish_invalidation('system')
+                await dashboard_snapshot.rebuild(db)
             
             logger.info(f"Synced status for {len(status_data)} services")
             db.close()
@@ -131,3 +408,4 @@ class DataSyncService:
 
 # Global instance
 data_sync_service = DataSyncService()
+event_broadcaster.add_listener(data_sync_service.apply_invalidation, channels=('sync',))
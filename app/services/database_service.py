@@ -7,6 +7,11 @@ from app.schemas.quantum_schemas import (
     QuantumJobSchema, QuantumBackendSchema, JobQueueSchema, 
     SystemStatusSchema, FilterParams, PaginatedResponse
 )
+from app.services.tag_index_service import TagIndexService
+from app.services.change_log_service import change_notifier, changed_fields, created_fields, record_change
+from app.services.query_filters import compile_filters
+
+BACKEND_COLUMNS = {column.name for column in QuantumBackend.__table__.columns}
 
 class DatabaseService:
     
@@ -18,7 +23,11 @@ class DatabaseService:
         """Create a new quantum job record"""
         job = QuantumJob(**job_data)
         self.db.add(job)
+        self.db.flush()
+        TagIndexService(self.db).index_jobs([(job.id, job.tags)])
+        record_change(self.db, 'job', job.job_id, 'created', created_fields('job', job))
         self.db.commit()
+        change_notifier.notify()
         self.db.refresh(job)
         return job
     
@@ -26,10 +35,16 @@ class DatabaseService:
         """Update an existing quantum job"""
         job = self.db.query(QuantumJob).filter(QuantumJob.job_id == job_id).first()
         if job:
+            changes = changed_fields('job', job, job_data)
             for key, value in job_data.items():
                 setattr(job, key, value)
             job.updated_at = datetime.now()
+            if 'tags' in job_data:
+                TagIndexService(self.db).reindex_job(job.id, job.tags)
+            record_change(self.db, 'job', job_id, 'updated', changes)
             self.db.commit()
+            if changes:
+                change_notifier.notify()
             self.db.refresh(job)
         return job
     
@@ -41,17 +56,12 @@ class DatabaseService:
         """Get jobs with filtering and pagination"""
         query = self.db.query(QuantumJob)
         
-        # Apply filters
-        if filters.status:
-            query = query.filter(QuantumJob.status == filters.status)
-        if filters.backend:
-            query = query.filter(QuantumJob.backend_name == filters.backend)
-        if filters.user_id:
-            query = query.filter(QuantumJob.user_id == filters.user_id)
-        if filters.start_date:
-            query = query.filter(QuantumJob.creation_date >= filters.start_date)
-        if filters.end_date:
-            query = query.filter(QuantumJob.creation_date <= filters.end_date)
+        # Apply filters (compiled to index-friendly IN / range predicates)
+        query = query.filter(*compile_filters(filters))
+        if filters.tags_any or filters.tags_all:
+            # Resolve tags on the job_tags posting lists before touching job rows
+            matching_ids = TagIndexService(self.db).matching_job_ids(filters.tags_any, filters.tags_all)
+            query = query.filter(QuantumJob.id.in_(matching_ids))
         
         # Get total count
         total = query.count()
@@ -81,17 +91,27 @@ class DatabaseService:
     
     async def bulk_create_jobs(self, jobs_data: List[Dict[str, Any]]) -> List[QuantumJob]:
         """Bulk create jobs"""
+        # Check which jobs already exist with a single query instead of one per row
+        job_ids = [job_data['job_id'] for job_data in jobs_data]
+        existing_ids = {
+            job_id for (job_id,) in self.db.query(QuantumJob.job_id).filter(QuantumJob.job_id.in_(job_ids))
+        } if job_ids else set()
+        
         jobs = []
         for job_data in jobs_data:
-            # Check if job already exists
-            existing_job = self.db.query(QuantumJob).filter(QuantumJob.job_id == job_data['job_id']).first()
-            if not existing_job:
+            if job_data['job_id'] not in existing_ids:
+                existing_ids.add(job_data['job_id'])
                 job = QuantumJob(**job_data)
                 jobs.append(job)
         
         if jobs:
             self.db.add_all(jobs)
+            self.db.flush()
+            TagIndexService(self.db).index_jobs((job.id, job.tags) for job in jobs)
+            for job in jobs:
+                record_change(self.db, 'job', job.job_id, 'created', created_fields('job', job))
             self.db.commit()
+            change_notifier.notify()
         
         return jobs
     
@@ -100,7 +120,10 @@ class DatabaseService:
         """Create a new backend record"""
         backend = QuantumBackend(**backend_data)
         self.db.add(backend)
+        self.db.flush()
+        record_change(self.db, 'backend', backend.name, 'created', created_fields('backend', backend))
         self.db.commit()
+        change_notifier.notify()
         self.db.refresh(backend)
         return backend
     
@@ -108,10 +131,14 @@ class DatabaseService:
         """Update an existing backend"""
         backend = self.db.query(QuantumBackend).filter(QuantumBackend.name == name).first()
         if backend:
+            changes = changed_fields('backend', backend, backend_data)
             for key, value in backend_data.items():
                 setattr(backend, key, value)
             backend.updated_at = datetime.now()
+            record_change(self.db, 'backend', name, 'updated', changes)
             self.db.commit()
+            if changes:
+                change_notifier.notify()
             self.db.refresh(backend)
         return backend
     
@@ -124,42 +151,66 @@ class DatabaseService:
         return self.db.query(QuantumBackend).all()
     
     async def bulk_upsert_backends(self, backends_data: List[Dict[str, Any]]) -> List[QuantumBackend]:
-        """Bulk upsert backends"""
+        """Bulk upsert backends; returns the backends that were created or changed"""
         backends = []
+        created = []
         for backend_data in backends_data:
+            # Live-only fields (operational, ...) are not stored
+            backend_data = {key: value for key, value in backend_data.items() if key in BACKEND_COLUMNS}
             existing_backend = self.db.query(QuantumBackend).filter(QuantumBackend.name == backend_data['name']).first()
             if existing_backend:
                 # Update existing
+                changes = changed_fields('backend', existing_backend, backend_data)
                 for key, value in backend_data.items():
                     setattr(existing_backend, key, value)
                 existing_backend.updated_at = datetime.now()
-                backends.append(existing_backend)
+                record_change(self.db, 'backend', existing_backend.name, 'updated', changes)
+                if changes:
+                    backends.append(existing_backend)
             else:
                 # Create new
                 backend = QuantumBackend(**backend_data)
                 self.db.add(backend)
                 backends.append(backend)
+                created.append(backend)
         
+        if created:
+            self.db.flush()
+            for backend in created:
+                record_change(self.db, 'backend', backend.name, 'created', created_fields('backend', backend))
         self.db.commit()
+        if backends:
+            change_notifier.notify()
         return backends
     
     # Queue operations
     async def update_queue_info(self, queue_data: List[Dict[str, Any]]) -> List[JobQueue]:
-        """Update queue information"""
+        """Update queue information; returns the queues that were created or changed"""
         queues = []
+        created = []
         for data in queue_data:
             existing_queue = self.db.query(JobQueue).filter(JobQueue.backend_name == data['backend_name']).first()
             if existing_queue:
+                changes = changed_fields('queue', existing_queue, data)
                 for key, value in data.items():
                     setattr(existing_queue, key, value)
                 existing_queue.last_updated = datetime.now()
-                queues.append(existing_queue)
+                record_change(self.db, 'queue', existing_queue.backend_name, 'updated', changes)
+                if changes:
+                    queues.append(existing_queue)
             else:
                 queue = JobQueue(**data)
                 self.db.add(queue)
                 queues.append(queue)
+                created.append(queue)
         
+        if created:
+            self.db.flush()
+            for queue in created:
+                record_change(self.db, 'queue', queue.backend_name, 'created', created_fields('queue', queue))
         self.db.commit()
+        if queues:
+            change_notifier.notify()
         return queues
     
     async def get_queue_info(self) -> List[JobQueue]:
@@ -168,7 +219,7 @@ class DatabaseService:
     
     # System status operations
     async def update_system_status(self, status_data: List[Dict[str, Any]]) -> List[SystemStatus]:
-        """Update system status"""
+        """Update system status; returns the statuses that were created or changed"""
         statuses = []
         for data in status_data:
             existing_status = self.db.query(SystemStatus).filter(
@@ -176,10 +227,14 @@ class DatabaseService:
             ).first()
             
             if existing_status:
+                changed = any(
+                    getattr(existing_status, key) != value for key, value in data.items() if key != 'last_check'
+                )
                 for key, value in data.items():
                     setattr(existing_status, key, value)
                 existing_status.last_check = datetime.now()
-                statuses.append(existing_status)
+                if changed:
+                    statuses.append(existing_status)
             else:
                 status = SystemStatus(**data)
                 self.db.add(status)
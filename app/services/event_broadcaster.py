@@ -0,0 +1,132 @@
+"""
+Change events published by the sync pipeline and fanned out to WebSocket channels
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services.event_bus import EventBus, create_event_bus
+from app.services.fast_read_service import encode_json
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ('dashboard', 'jobs', 'queue')
+# Worker-to-worker channels, not served to WebSocket clients
+INTERNAL_CHANNELS = ('sync',)
+
+# Fields of a job carried in job events
+JOB_EVENT_FIELDS = ('job_id', 'name', 'backend_name', 'status', 'user_id', 'creation_date', 'start_time', 'end_time', 'shots')
+
+# listener(channel, event, message): the event and its serialized form
+Listener = Callable[[str, Dict[str, Any], str], Awaitable[None]]
+
+def job_event_fields(job: Any) -> Dict[str, Any]:
+    """Event payload of a job (dict or QuantumJob row)"""
+    if isinstance(job, dict):
+        return {name: job.get(name) for name in JOB_EVENT_FIELDS}
+    return {name: getattr(job, name, None) for name in JOB_EVENT_FIELDS}
+
+class EventBroadcaster:
+    """One delivery task per channel.
+
+    Publishers enqueue events without waiting on clients. Each channel's
+    task serializes an event once and publishes it on the event bus; every
+    worker's broadcaster receives it from the bus and hands the same
+    message to its listeners (the WebSocket connection manager), so
+    per-connection cost is only the socket write. A channel keeps at most
+    `max_pending` events; when the bus falls that far behind the oldest
+    events are dropped.
+    """
+
+    def __init__(self, channels=CHANNELS, max_pending: int = 1000, bus: Optional[EventBus] = None):
+        self.channels = channels
+        self.max_pending = max_pending
+        self.bus = bus
+        self.queues: Dict[str, asyncio.Queue] = {channel: asyncio.Queue(maxsize=max_pending) for channel in channels}
+        self.listeners: List[Tuple[Listener, Sequence[str]]] = []
+        self.tasks: List[asyncio.Task] = []
+        self.published = {channel: 0 for channel in channels}
+        self.dropped = {channel: 0 for channel in channels}
+
+    def add_listener(self, listener: Listener, channels: Sequence[str] = CHANNELS):
+        self.listeners.append((listener, channels))
+
+    def publish(self, channel: str, event_type: str, data: Any):
+        """Queue an event for a channel; never blocks the publisher"""
+        if channel not in self.queues:
+            raise ValueError(f"Unknown channel '{channel}'")
+        queue = self.queues[channel]
+        if queue.full():
+            queue.get_nowait()
+            self.dropped[channel] += 1
+        queue.put_nowait({
+            'type': event_type,
+            'timestamp': datetime.now(timezone.utc),
+            'data': data
+        })
+        self.published[channel] += 1
+
+    async def _deliver(self, channel: str):
+        queue = self.queues[channel]
+        while True:
+            event = await queue.get()
+            try:
+                await self.bus.publish(channel, encode_json(event), event)
+            except Exception as e:
+                logger.error(f"Error publishing {event['type']} on channel {channel}: {e}")
+
+    async def _dispatch(self, channel: str, message: bytes, event: Optional[Dict[str, Any]]):
+        """Hand an event received from the bus to the listeners of this worker"""
+        if channel not in self.queues:
+            return
+        if event is None:
+            event = json.loads(message)
+        text = message.decode()
+        for listener, channels in list(self.listeners):
+            if channel not in channels:
+                continue
+            try:
+                await listener(channel, event, text)
+            except Exception as e:
+                logger.error(f"Error delivering {event['type']} on channel {channel}: {e}")
+
+    async def start(self):
+        """Connect the event bus and start the per-channel delivery tasks (on the running event loop)"""
+        if self.tasks:
+            return
+        if self.bus is None:
+            self.bus = create_event_bus()
+        try:
+            await self.bus.start(self._dispatch)
+        except Exception as e:
+            logger.warning(f"{self.bus.name} event bus unavailable, delivering events in-process only: {e}")
+            self.bus = EventBus()
+            await self.bus.start(self._dispatch)
+        self.tasks = [asyncio.create_task(self._deliver(channel)) for channel in self.channels]
+        logger.info(f"Event broadcaster started on the {self.bus.name} bus for channels: {', '.join(self.channels)}")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.bus is not None:
+            await self.bus.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            channel: {
+                'pending': self.queues[channel].qsize(),
+                'published': self.published[channel],
+                'dropped': self.dropped[channel]
+            }
+            for channel in self.channels
+        }
+        if self.bus is not None:
+            stats['bus'] = self.bus.stats()
+        return stats
+
+# Global instance
+event_broadcaster = EventBroadcaster(channels=CHANNELS + INTERNAL_CHANNELS)
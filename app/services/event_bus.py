@@ -0,0 +1,276 @@
+"""
+Pub/sub backbone carrying serialized channel events to the broadcaster of every worker
+"""
+import asyncio
+import logging
+import os
+import struct
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+from app.utils.helpers import try_lock_file
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUSES = ('memory', 'redis', 'socket')
+REDIS_CHANNEL = 'quantum_jobs:events'
+
+# handler(channel, message, event): event is the unserialized event when it never left the process
+Handler = Callable[[str, bytes, Optional[Dict[str, Any]]], Awaitable[None]]
+
+class EventBus:
+    """In-process bus: events go straight to this worker's handler.
+
+    Remote buses wrap each message in a frame carrying its channel, the
+    publishing bus's origin ID and a per-origin sequence number. Every
+    worker subscribes once and drops frames it has already seen, so each
+    event reaches every worker's clients exactly once, including the
+    worker that published it.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self.handler: Optional[Handler] = None
+        self.origin = uuid.uuid4().hex
+        self.seq = 0
+        self.last_seen: Dict[str, int] = {}
+        self.received = 0
+        self.duplicates = 0
+
+    async def start(self, handler: Handler):
+        self.handler = handler
+
+    async def stop(self):
+        pass
+
+    async def publish(self, channel: str, message: bytes, event: Optional[Dict[str, Any]] = None):
+        self.seq += 1
+        self.received += 1
+        await self.handler(channel, message, event)
+
+    def _frame(self, channel: str, message: bytes) -> bytes:
+        self.seq += 1
+        return f"{channel} {self.origin} {self.seq}\n".encode() + message
+
+    async def _receive(self, frame: bytes):
+        header, _, message = frame.partition(b'\n')
+        channel, origin, seq = header.decode().split(' ')
+        seq = int(seq)
+        if seq <= self.last_seen.get(origin, 0):
+            self.duplicates += 1
+            return
+        self.last_seen[origin] = seq
+        self.received += 1
+        try:
+            await self.handler(channel, message, None)
+        except Exception as e:
+            logger.error(f"Error handling {channel} event from {origin}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {'bus': self.name, 'published': self.seq, 'received': self.received, 'duplicates': self.duplicates}
+
+class RedisEventBus(EventBus):
+    """Redis pub/sub on settings.redis_url; every worker subscribes to one Redis channel"""
+
+    name = 'redis'
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+        self.client = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Handler):
+        self.handler = handler
+        self.client = aioredis.Redis.from_url(self.url, socket_connect_timeout=1)
+        await self.client.ping()
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(REDIS_CHANNEL)
+        self.task = asyncio.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub):
+        while True:
+            try:
+                async for item in pubsub.listen():
+                    if item['type'] == 'message':
+                        await self._receive(item['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis event subscription lost, resubscribing: {e}")
+                await asyncio.sleep(1)
+                try:
+                    pubsub = self.client.pubsub()
+                    await pubsub.subscribe(REDIS_CHANNEL)
+                except Exception as e:
+                    logger.warning(f"Redis resubscribe failed: {e}")
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        if self.client is not None:
+            await self.client.close()
+
+    async def publish(self, channel: str, message: bytes, event: Optional[Dict[str, Any]] = None):
+        await self.client.publish(REDIS_CHANNEL, self._frame(channel, message))
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (size,) = struct.unpack('>I', await reader.readexactly(4))
+    return await reader.readexactly(size)
+
+def _write_frame(writer: asyncio.StreamWriter, frame: bytes):
+    writer.write(struct.pack('>I', len(frame)) + frame)
+
+class LocalBroker:
+    """Relays every length-prefixed frame it receives on a Unix socket to all connected clients"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.server = None
+        self.writers: Set[asyncio.StreamWriter] = set()
+        self.tasks: Set[asyncio.Task] = set()
+
+    async def start(self):
+        self.server = await asyncio.start_unix_server(self._serve, path=self.path)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.writers.add(writer)
+        self.tasks.add(asyncio.current_task())
+        try:
+            while True:
+                frame = await _read_frame(reader)
+                for client in list(self.writers):
+                    _write_frame(client, frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            self.tasks.discard(asyncio.current_task())
+            writer.close()
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            # Closing the transports ends the client handlers (cancelling them trips asyncio.streams on 3.11)
+            for writer in list(self.writers):
+                writer.close()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+            await self.server.wait_closed()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+class LocalSocketEventBus(EventBus):
+    """Unix socket bus for tests and single-host workers.
+
+    The worker holding an exclusive lock on `<path>.lock` hosts the broker;
+    the lock is released when that worker exits, however it exits. When the
+    broker goes away the other workers reconnect, one of them taking the
+    lock and hosting a new broker, and until then each delivers its own
+    events in-process only.
+    """
+
+    name = 'socket'
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.broker: Optional[LocalBroker] = None
+        self.lock = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.task: Optional[asyncio.Task] = None
+        self.reconnects = 0
+
+    def _claim_broker(self) -> bool:
+        """Take the broker lock without blocking; False while another live worker holds it"""
+        self.lock = try_lock_file(f"{self.path}.lock")
+        return self.lock is not None
+
+    async def _connect(self, attempts: int = 50):
+        for _ in range(attempts):
+            try:
+                return await asyncio.open_unix_connection(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                pass
+            if self.broker is None and self._claim_broker():
+                if os.path.exists(self.path):
+                    os.unlink(self.path)  # socket file left behind by a stopped broker
+                self.broker = LocalBroker(self.path)
+                await self.broker.start()
+            else:
+                await asyncio.sleep(0.1)  # the lock holder is still starting its broker
+        raise ConnectionError(f"No event broker on {self.path}")
+
+    async def start(self, handler: Handler):
+        self.handler = handler
+        reader, self.writer = await self._connect()
+        self.task = asyncio.create_task(self._listen(reader))
+
+    async def _listen(self, reader: asyncio.StreamReader):
+        while True:
+            try:
+                while True:
+                    await self._receive(await _read_frame(reader))
+            except (asyncio.IncompleteReadError, ConnectionError):
+                logger.warning("Event broker connection closed, reconnecting")
+            self.writer.close()
+            self.writer = None
+            reader = await self._reconnect()
+
+    async def _reconnect(self) -> asyncio.StreamReader:
+        delay = 0.1
+        while True:
+            try:
+                reader, self.writer = await self._connect()
+                self.reconnects += 1
+                logger.info(f"Event broker reconnected{' (hosting it)' if self.broker else ''}")
+                return reader
+            except OSError as e:
+                logger.warning(f"Event broker reconnect failed: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5)
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        if self.writer is not None:
+            self.writer.close()
+        if self.broker is not None:
+            await self.broker.stop()
+        if self.lock is not None:
+            self.lock.close()
+
+    async def publish(self, channel: str, message: bytes, event: Optional[Dict[str, Any]] = None):
+        if self.writer is not None and not self.writer.is_closing():
+            try:
+                _write_frame(self.writer, self._frame(channel, message))
+                await self.writer.drain()
+                return
+            except ConnectionError:
+                pass
+        # Between brokers: keep serving this worker's own clients
+        await super().publish(channel, message, event)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), 'broker_host': self.broker is not None, 'reconnects': self.reconnects}
+
+def create_event_bus(kind: str = settings.event_bus) -> EventBus:
+    """Event bus selected by EVENT_BUS; Redis falls back to the in-process bus when its package is missing"""
+    if kind not in EVENT_BUSES:
+        raise ValueError(f"Unknown event bus '{kind}'. Valid: {', '.join(EVENT_BUSES)}")
+    if kind == 'redis':
+        if REDIS_AVAILABLE:
+            return RedisEventBus(settings.redis_url)
+        logger.warning("redis package not available, events are delivered in-process only")
+    if kind == 'socket':
+        return LocalSocketEventBus(settings.event_bus_socket)
+    return EventBus()
@@ -0,0 +1,122 @@
+"""
+ORM-free read path for list endpoints: Core row tuples serialized in bulk
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import JobQueue, QuantumBackend, QuantumJob
+from app.schemas.quantum_schemas import FilterParams, JobQueueSchema, QuantumBackendSchema, QuantumJobSchema
+from app.services.query_filters import compile_filters
+from app.services.tag_index_service import TagIndexService
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+def encode_json(content: Any) -> bytes:
+    """Serialize plain Python data to JSON bytes (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        # Z suffix for UTC matches pydantic's datetime encoding
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(jsonable_encoder(content), separators=(',', ':')).encode()
+
+def json_bytes_response(payload: bytes, response: Response) -> Response:
+    """Raw JSON response carrying the headers dependencies set (e.g. ETag)"""
+    return Response(content=payload, media_type="application/json", headers=dict(response.headers))
+
+class RowShape:
+    """Columns selected for a response schema, in the schema's field order"""
+
+    def __init__(self, model: Any, schema: Type[BaseModel]):
+        table_columns = model.__table__.columns
+        self.keys = [name for name in schema.model_fields if name in table_columns]
+        self.columns = [table_columns[name] for name in self.keys]
+        # Schema fields without a column keep the schema default
+        self.defaults = {
+            name: field.default for name, field in schema.model_fields.items() if name not in table_columns
+        }
+
+    def to_dicts(self, rows: List[Any]) -> List[Dict[str, Any]]:
+        keys = self.keys
+        if self.defaults:
+            return [{**dict(zip(keys, row)), **self.defaults} for row in rows]
+        return [dict(zip(keys, row)) for row in rows]
+
+JOB_SHAPE = RowShape(QuantumJob, QuantumJobSchema)
+BACKEND_SHAPE = RowShape(QuantumBackend, QuantumBackendSchema)
+QUEUE_SHAPE = RowShape(JobQueue, JobQueueSchema)
+
+class FastReadService:
+    """Serves list endpoints from plain row tuples, skipping ORM and pydantic.
+
+    Produces the same JSON as QuantumJobSchema / QuantumBackendSchema /
+    JobQueueSchema through response_model, but each row is materialized
+    once as a dict and the whole page is encoded in a single call.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _rows(self, shape: RowShape, stmt) -> List[Dict[str, Any]]:
+        return shape.to_dicts(self.db.execute(stmt).all())
+
+    def jobs_page(self, filters: FilterParams) -> bytes:
+        """Paginated jobs, same shape as DatabaseService.get_jobs; raises ValueError on invalid filters"""
+        conditions = compile_filters(filters)
+        if filters.tags_any or filters.tags_all:
+            matching_ids = TagIndexService(self.db).matching_job_ids(filters.tags_any, filters.tags_all)
+            conditions.append(QuantumJob.id.in_(matching_ids))
+
+        total = self.db.execute(select(func.count(QuantumJob.id)).where(*conditions)).scalar()
+        offset = (filters.page - 1) * filters.per_page
+        items = self._rows(
+            JOB_SHAPE,
+            select(*JOB_SHAPE.columns).where(*conditions)
+            .order_by(desc(QuantumJob.creation_date)).offset(offset).limit(filters.per_page)
+        )
+
+        pages = (total + filters.per_page - 1) // filters.per_page
+        return encode_json({
+            'items': items,
+            'total': total,
+            'page': filters.page,
+            'per_page': filters.per_page,
+            'pages': pages,
+            'has_next': filters.page < pages,
+            'has_prev': filters.page > 1
+        })
+
+    def jobs_by_ids(self, job_ids: List[str], chunk_size: int = 500) -> Dict[str, Dict[str, Any]]:
+        """Jobs keyed by job_id, fetched with one IN query per chunk of IDs"""
+        found = {}
+        job_ids = list(dict.fromkeys(job_ids))
+        for start in range(0, len(job_ids), chunk_size):
+            chunk = job_ids[start:start + chunk_size]
+            for job in self._rows(JOB_SHAPE, select(*JOB_SHAPE.columns).where(QuantumJob.job_id.in_(chunk))):
+                found[job['job_id']] = job
+        return found
+
+    def recent_jobs(self, limit: int = 20) -> bytes:
+        """Most recently created jobs"""
+        return encode_json(self._rows(
+            JOB_SHAPE, select(*JOB_SHAPE.columns).order_by(desc(QuantumJob.creation_date)).limit(limit)
+        ))
+
+    def backends(self, *conditions: Any) -> bytes:
+        """Backends matching optional column conditions"""
+        return encode_json(self._rows(BACKEND_SHAPE, select(*BACKEND_SHAPE.columns).where(*conditions)))
+
+    def queue_info(self) -> bytes:
+        """Queue information for all backends"""
+        return encode_json(self._rows(QUEUE_SHAPE, select(*QUEUE_SHAPE.columns)))
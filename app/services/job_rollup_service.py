@@ -0,0 +1,113 @@
+"""
+Daily job rollups: per (day, backend, status) aggregates maintained by the sync pipeline
+"""
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Iterable, Optional, Set
+
+from sqlalchemy import Date, and_, cast, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import JobDailyRollup, QuantumJob
+
+logger = logging.getLogger(__name__)
+
+def seconds_between(dialect: str, start: Any, end: Any) -> Any:
+    """SQL expression for the seconds from start to end (NULL when either is NULL)"""
+    if dialect == 'postgresql':
+        return func.extract('epoch', end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400.0
+
+def epoch_seconds(dialect: str, column: Any) -> Any:
+    """SQL expression for a timestamp as Unix epoch seconds (naive values are UTC)"""
+    if dialect == 'postgresql':
+        return func.extract('epoch', column)
+    # julianday is a float of days; round off its error so whole seconds stay whole
+    return func.round((func.julianday(column) - 2440587.5) * 86400.0, 3)
+
+def utc_day(dialect: str, column: Any) -> Any:
+    """SQL expression for the UTC calendar day of a timestamp column"""
+    if dialect == 'postgresql':
+        return cast(func.timezone('UTC', column), Date)
+    return func.date(column)
+
+def _day_of(value: Any) -> Optional[date]:
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+class JobRollupService:
+    """Maintains job_daily_rollups, the pre-aggregated grain for day-level analytics"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def _aggregate(self, *conditions: Any):
+        queue_time = seconds_between(self.dialect, QuantumJob.creation_date, QuantumJob.start_time)
+        execution_time = seconds_between(self.dialect, QuantumJob.start_time, QuantumJob.end_time)
+        day = utc_day(self.dialect, QuantumJob.creation_date)
+        return select(
+            day,
+            QuantumJob.backend_name,
+            QuantumJob.status,
+            func.count(QuantumJob.id),
+            func.count(QuantumJob.shots),
+            func.coalesce(func.sum(QuantumJob.shots), 0),
+            func.count(queue_time),
+            func.coalesce(func.sum(queue_time), 0.0),
+            func.count(execution_time),
+            func.coalesce(func.sum(execution_time), 0.0),
+        ).where(QuantumJob.creation_date.isnot(None), *conditions).group_by(
+            day, QuantumJob.backend_name, QuantumJob.status
+        )
+
+    def _insert(self, select_stmt):
+        self.db.execute(insert(JobDailyRollup).from_select([
+            'day', 'backend_name', 'status', 'job_count', 'shots_count', 'total_shots',
+            'queue_time_count', 'queue_time_sum', 'execution_time_count', 'execution_time_sum'
+        ], select_stmt))
+
+    def refresh_days(self, days: Iterable[date]):
+        """Recompute the rollup rows of the given creation days"""
+        days = sorted(set(day for day in days if day is not None))
+        if not days:
+            return
+        self.db.execute(delete(JobDailyRollup).where(JobDailyRollup.day.in_(days)))
+        # Per-day ranges on the bare column keep the scan on the creation_date index
+        ranges = [
+            and_(
+                QuantumJob.creation_date >= datetime.combine(day, time.min),
+                QuantumJob.creation_date < datetime.combine(day + timedelta(days=1), time.min)
+            )
+            for day in days
+        ]
+        self._insert(self._aggregate(or_(*ranges)))
+        self.db.commit()
+
+    def refresh_jobs(self, jobs: Iterable[Any]):
+        """Recompute the days that new or updated jobs (dicts or QuantumJob rows) fall on"""
+        days: Set[date] = set()
+        for job in jobs:
+            value = job.get('creation_date') if isinstance(job, dict) else getattr(job, 'creation_date', None)
+            days.add(_day_of(value))
+        self.refresh_days(days)
+
+    def rebuild(self) -> int:
+        """Recompute every rollup row; returns the number of rows written"""
+        self.db.execute(delete(JobDailyRollup))
+        self._insert(self._aggregate())
+        self.db.commit()
+        rows = self.db.query(func.count(JobDailyRollup.id)).scalar()
+        logger.info(f"Job rollups rebuilt ({rows} rows)")
+        return rows
+
+    def build_if_empty(self) -> int:
+        """Build the rollups for existing jobs on first start"""
+        if self.db.query(JobDailyRollup.id).first() is not None:
+            return 0
+        if self.db.query(QuantumJob.id).first() is None:
+            return 0
+        return self.rebuild()
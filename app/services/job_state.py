@@ -0,0 +1,40 @@
+"""
+Job-derived state: the persisted rollup, latency sketch and cost tables and the in-memory models built from stored jobs
+"""
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.job_rollup_service import JobRollupService
+from app.services.latency_sketch_service import LatencySketchService
+from app.services.cost_accounting_service import CostAccountingService
+from app.services.columnar_job_store import columnar_job_store
+from app.services.wait_time_estimator import wait_time_estimator
+from app.services.user_activity_service import user_activity_tracker
+from app.services.usage_heatmap_service import usage_heatmap
+from app.services.throughput_service import throughput_counters
+
+logger = logging.getLogger(__name__)
+
+def build_job_tables(db: Session, rebuild: bool = False):
+    """Derived job tables; built only when empty unless `rebuild` (after a bulk import)"""
+    for service in (JobRollupService(db), LatencySketchService(db), CostAccountingService(db)):
+        if rebuild:
+            service.rebuild()
+        else:
+            service.build_if_empty()
+
+def load_job_models(db: Session):
+    """(Re)load this process's in-memory job models from the stored jobs"""
+    if settings.columnar_store or columnar_job_store.loaded:
+        columnar_job_store.load(db)
+    wait_time_estimator.load_history(db)
+    user_activity_tracker.load_history(db)
+    usage_heatmap.load_history(db)
+    throughput_counters.load_history(db)
+
+def load_job_state(db: Session, rebuild: bool = False):
+    """Derived tables then in-memory models; blocking, so run it in a threadpool from request handlers"""
+    build_job_tables(db, rebuild=rebuild)
+    load_job_models(db)
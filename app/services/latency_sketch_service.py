@@ -0,0 +1,258 @@
+"""
+Per-backend, per-day quantile sketches of job queue and execution times
+"""
+import logging
+import math
+import struct
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import JobLatencySketch, QuantumJob
+from app.services.job_rollup_service import _day_of, seconds_between, utc_day
+from app.utils.helpers import record_field
+
+logger = logging.getLogger(__name__)
+
+RELATIVE_ACCURACY = 0.01
+# Durations below this many seconds (including negative clock skew) share the zero bucket
+MIN_VALUE = 1e-3
+QUANTILES = (0.5, 0.9, 0.99)
+METRICS = ('queue_time', 'execution_time')
+
+SketchKey = Tuple[date, str, str]  # (day, backend_name, metric)
+
+class DDSketch:
+    """Quantile sketch with relative-error guarantees (DDSketch).
+
+    Values map to logarithmic buckets ceil(log_gamma(x)), so every quantile
+    is returned within RELATIVE_ACCURACY of an actual value. Sketches with
+    the same accuracy merge by adding bucket counts, which is what lets
+    day-level sketches roll up into any date range or backend set.
+    """
+
+    HEADER = struct.Struct('<dII')
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, values: Iterable[float]):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        small = values < MIN_VALUE
+        self.zero_count += int(small.sum())
+        indexes = np.ceil(np.log(values[~small]) / self.log_gamma).astype(np.int64)
+        for index, count in zip(*(array.tolist() for array in np.unique(indexes, return_counts=True))):
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.count += int(values.size)
+
+    def merge(self, other: 'DDSketch'):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracies")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        cumulative = self.zero_count
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_bytes(self) -> bytes:
+        """Header, then delta-encoded bucket indexes and their counts, zlib-compressed"""
+        indexes = np.array(sorted(self.bins), dtype=np.int64)
+        counts = np.array([self.bins[index] for index in indexes.tolist()], dtype=np.uint32)
+        deltas = np.diff(indexes, prepend=0).astype(np.int32)
+        header = self.HEADER.pack(self.relative_accuracy, self.zero_count, len(indexes))
+        return zlib.compress(header + deltas.tobytes() + counts.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'DDSketch':
+        data = zlib.decompress(data)
+        relative_accuracy, zero_count, size = cls.HEADER.unpack_from(data)
+        offset = cls.HEADER.size
+        deltas = np.frombuffer(data, dtype=np.int32, count=size, offset=offset)
+        counts = np.frombuffer(data, dtype=np.uint32, count=size, offset=offset + 4 * size)
+
+        sketch = cls(relative_accuracy)
+        sketch.bins = dict(zip(np.cumsum(deltas, dtype=np.int64).tolist(), counts.tolist()))
+        sketch.zero_count = zero_count
+        sketch.count = zero_count + int(counts.sum())
+        return sketch
+
+def _seconds(start: Any, end: Any) -> Optional[float]:
+    if not isinstance(start, datetime) or not isinstance(end, datetime):
+        return None
+    if (start.tzinfo is None) != (end.tzinfo is None):
+        start, end = (value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value for value in (start, end))
+    return (end - start).total_seconds()
+
+def percentile_summary(sketch: DDSketch) -> Dict[str, Any]:
+    summary = {'count': sketch.count}
+    for q in QUANTILES:
+        value = sketch.quantile(q)
+        summary[f"p{int(q * 100)}"] = round(value, 3) if value is not None else None
+    return summary
+
+class LatencySketchService:
+    """Maintains job_latency_sketches, one DDSketch per (creation day, backend, duration).
+
+    New jobs are merged into their day's sketches as they are ingested;
+    jobs whose timings change (refreshes) recompute the days they fall on.
+    Reads merge the stored sketches and never touch quantum_jobs.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def _save(self, sketches: Dict[SketchKey, DDSketch]):
+        if not sketches:
+            return
+        self.db.execute(delete(JobLatencySketch).where(
+            tuple_(JobLatencySketch.day, JobLatencySketch.backend_name, JobLatencySketch.metric).in_(list(sketches))
+        ))
+        self.db.add_all(
+            JobLatencySketch(day=day, backend_name=backend, metric=metric, count=sketch.count, sketch=sketch.to_bytes())
+            for (day, backend, metric), sketch in sketches.items() if sketch.count
+        )
+        self.db.commit()
+
+    def _compute(self, *conditions: Any) -> Dict[SketchKey, DDSketch]:
+        """Sketches built from the durations of the jobs matching conditions"""
+        statement = select(
+            utc_day(self.dialect, QuantumJob.creation_date),
+            QuantumJob.backend_name,
+            seconds_between(self.dialect, QuantumJob.creation_date, QuantumJob.start_time),
+            seconds_between(self.dialect, QuantumJob.start_time, QuantumJob.end_time),
+        ).where(QuantumJob.creation_date.isnot(None), QuantumJob.backend_name.isnot(None), *conditions)
+
+        values: Dict[SketchKey, List[float]] = defaultdict(list)
+        for day, backend, queue_time, execution_time in self.db.execute(statement):
+            if isinstance(day, str):
+                day = date.fromisoformat(day)
+            for metric, value in zip(METRICS, (queue_time, execution_time)):
+                if value is not None:
+                    values[(day, backend, metric)].append(value)
+
+        sketches = {}
+        for key, durations in values.items():
+            sketches[key] = DDSketch()
+            sketches[key].add(durations)
+        return sketches
+
+    def add_jobs(self, jobs: Iterable[Any]):
+        """Merge the durations of newly ingested jobs into their day's sketches"""
+        values: Dict[SketchKey, List[float]] = defaultdict(list)
+        for job in jobs:
+            day, backend = _day_of(record_field(job, 'creation_date')), record_field(job, 'backend_name')
+            if day is None or backend is None:
+                continue
+            durations = (
+                _seconds(record_field(job, 'creation_date'), record_field(job, 'start_time')),
+                _seconds(record_field(job, 'start_time'), record_field(job, 'end_time')),
+            )
+            for metric, value in zip(METRICS, durations):
+                if value is not None:
+                    values[(day, backend, metric)].append(value)
+        if not values:
+            return
+
+        sketches = self.load_sketches(keys=list(values))
+        for key, durations in values.items():
+            sketches.setdefault(key, DDSketch()).add(durations)
+        self._save(sketches)
+
+    def refresh_days(self, days: Iterable[date]):
+        """Recompute the sketches of the given creation days"""
+        days = sorted(set(day for day in days if day is not None))
+        if not days:
+            return
+        self.db.execute(delete(JobLatencySketch).where(JobLatencySketch.day.in_(days)))
+        ranges = [
+            and_(
+                QuantumJob.creation_date >= datetime.combine(day, time.min),
+                QuantumJob.creation_date < datetime.combine(day + timedelta(days=1), time.min)
+            )
+            for day in days
+        ]
+        self._save(self._compute(or_(*ranges)))
+        self.db.commit()
+
+    def refresh_jobs(self, jobs: Iterable[Any]):
+        """Recompute the days that updated jobs (dicts or QuantumJob rows) fall on"""
+        days: Set[date] = {_day_of(record_field(job, 'creation_date')) for job in jobs}
+        self.refresh_days(days)
+
+    def rebuild(self) -> int:
+        """Recompute every sketch; returns the number of rows written"""
+        self.db.execute(delete(JobLatencySketch))
+        sketches = self._compute()
+        self._save(sketches)
+        self.db.commit()
+        logger.info(f"Latency sketches rebuilt ({len(sketches)} rows)")
+        return len(sketches)
+
+    def build_if_empty(self) -> int:
+        """Build the sketches for existing jobs on first start"""
+        if self.db.query(JobLatencySketch.id).first() is not None:
+            return 0
+        if self.db.query(QuantumJob.id).first() is None:
+            return 0
+        return self.rebuild()
+
+    def load_sketches(
+        self,
+        keys: Optional[List[SketchKey]] = None,
+        since: Optional[date] = None,
+        backend: Optional[str] = None
+    ) -> Dict[SketchKey, DDSketch]:
+        query = self.db.query(
+            JobLatencySketch.day, JobLatencySketch.backend_name, JobLatencySketch.metric, JobLatencySketch.sketch
+        )
+        if keys is not None:
+            query = query.filter(
+                tuple_(JobLatencySketch.day, JobLatencySketch.backend_name, JobLatencySketch.metric).in_(keys)
+            )
+        if since is not None:
+            query = query.filter(JobLatencySketch.day >= since)
+        if backend is not None:
+            query = query.filter(JobLatencySketch.backend_name == backend)
+        return {(day, name, metric): DDSketch.from_bytes(data) for day, name, metric, data in query.all()}
+
+    def backend_latency(self, since: Optional[date] = None, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+        """p50/p90/p99 queue and execution time per backend, merged over days"""
+        merged: Dict[str, Dict[str, DDSketch]] = defaultdict(lambda: {metric: DDSketch() for metric in METRICS})
+        for (_, name, metric), sketch in self.load_sketches(since=since, backend=backend).items():
+            merged[name][metric].merge(sketch)
+        return [
+            {'backend': name, **{metric: percentile_summary(sketch) for metric, sketch in sketches.items()}}
+            for name, sketches in sorted(merged.items())
+        ]
+
+    def overall_latency(self, since: Optional[date] = None) -> Dict[str, Dict[str, Any]]:
+        """p50/p90/p99 queue and execution time across all backends"""
+        merged = {metric: DDSketch() for metric in METRICS}
+        for (_, _, metric), sketch in self.load_sketches(since=since).items():
+            merged[metric].merge(sketch)
+        return {metric: percentile_summary(sketch) for metric, sketch in merged.items()}
@@ -1,8 +1,9 @@
 import asyncio
 import logging
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import httpx
+from fastapi.concurrency import run_in_threadpool
 
 # Try to import Qiskit components with graceful fallback
 try:
@@ -25,6 +26,8 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models.quantum_models import QuantumJob, QuantumBackend, JobQueue
 from app.schemas.quantum_schemas import QuantumJobSchema, QuantumBackendSchema, JobQueueSchema
+from app.services.wait_time_estimator import wait_time_estimator
+from app.utils.helpers import parse_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -150,7 +153,9 @@ class QuantumService:
                         "parametric_pulses": getattr(config, 'parametric_pulses', []),
                         "dt": getattr(config, 'dt', None),
                         "dtm": getattr(config, 'dtm', None),
-                        "conditional": getattr(config, 'conditional', False)
+                        "conditional": getattr(config, 'conditional', False),
+                        "error_rate": error_rate,
+                        "gate_time": gate_time
                     }
                     backends_data.append(backend_data)
                     logger.info(f"Processed backend: {backend.name} ({backend_data['n_qubits']} qubits)")
@@ -210,20 +215,7 @@ class QuantumService:
             
             for job in jobs:
                 try:
-                    job_data = {
-                        'job_id': job.job_id(),
-                        'name': getattr(job, 'name', None),
-                        'backend_name': job.backend().name if job.backend() else 'unknown',
-                        'status': job.status().name if hasattr(job.status(), 'name') else str(job.status()),
-                        'creation_date': job.creation_date,
-                        'tags': getattr(job, 'tags', []),
-                        'user_id': getattr(job, 'user_id', None),
-                        'program_id': getattr(job, 'program_id', None),
-                        'usage': job.usage() if hasattr(job, 'usage') else {},
-                        'error_message': job.error_message() if hasattr(job, 'error_message') else None,
-                        'queue_position': getattr(job, 'queue_position', None),
-                        'result': job.result().to_dict() if hasattr(job, 'result') and job.status().name == 'DONE' else None
-                    }
+                    job_data = self._job_to_dict(job)
                     jobs_data.append(job_data)
                     logger.info(f"Processed job: {job.job_id()} - {job_data['status']}")
                 except Exception as e:
@@ -235,6 +227,51 @@ class QuantumService:
         
         return jobs_data
     
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the current state of a single job from IBM Quantum"""
+        if not self.initialized:
+            raise Exception("IBM Quantum service not initialized. Real connection required.")
+            
+        try:
+            # The runtime client and the job's metrics/result calls block on HTTP
+            return await run_in_threadpool(lambda: self._job_to_dict(self.service.job(job_id)))
+        except Exception as e:
+            logger.error(f"Error getting job {job_id}: {e}")
+            return None
+    
+    def _job_to_dict(self, job) -> Dict[str, Any]:
+        """Convert a runtime job into a job record"""
+        return {
+            'job_id': job.job_id(),
+            'name': getattr(job, 'name', None),
+            'backend_name': job.backend().name if job.backend() else 'unknown',
+            'status': job.status().name if hasattr(job.status(), 'name') else str(job.status()),
+            'creation_date': job.creation_date,
+            'tags': getattr(job, 'tags', []),
+            'user_id': getattr(job, 'user_id', None),
+            'program_id': getattr(job, 'program_id', None),
+            'usage': job.usage() if hasattr(job, 'usage') else {},
+            'error_message': job.error_message() if hasattr(job, 'error_message') else None,
+            'queue_position': getattr(job, 'queue_position', None),
+            'result': job.result().to_dict() if hasattr(job, 'result') and job.status().name == 'DONE' else None,
+            **self._job_timestamps(job)
+        }
+    
+    def _job_timestamps(self, job) -> Dict[str, Optional[datetime]]:
+        """start_time/end_time (naive UTC) from the runtime job's metrics; None while not yet running/finished"""
+        try:
+            timestamps = (job.metrics() or {}).get('timestamps') or {}
+        except Exception as e:
+            logger.warning(f"Could not read metrics of job {job.job_id()}: {e}")
+            return {}
+        times = {}
+        for field, name in (('start_time', 'running'), ('end_time', 'finished')):
+            value = parse_timestamp(timestamps.get(name))
+            if value is not None and value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            times[field] = value
+        return times
+    
     def _get_mock_jobs(self) -> List[Dict[str, Any]]:
         """Generate mock job data for demo purposes"""
         import random
@@ -286,13 +323,16 @@ class QuantumService:
                     backend = self.service.backend(backend_info['name'])
                     status = backend.status()
                     
+                    # IBM doesn't provide wait times directly - estimate them from observed job timings
+                    wait_estimate = wait_time_estimator.estimate(backend_info['name'], getattr(status, 'pending_jobs', 0))
+                    
                     queue_info = {
                         'backend_name': backend_info['name'],
                         'queue_length': getattr(status, 'pending_jobs', 0),
                         'pending_jobs': getattr(status, 'pending_jobs', 0),
                         'running_jobs': 1 if getattr(status, 'status_msg', '') == 'active' else 0,
-                        'average_wait_time': None,  # IBM doesn't provide this directly
-                        'estimated_wait_time': None,  # IBM doesn't provide this directly
+                        'average_wait_time': wait_estimate['average_wait_time'],
+                        'estimated_wait_time': wait_estimate['estimated_wait_time'],
                         'status': getattr(status, 'status_msg', 'unknown'),
                         'last_updated': datetime.now()
                     }
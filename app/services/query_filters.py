@@ -0,0 +1,168 @@
+"""
+Structured job filters compiled to index-friendly SQL predicates
+"""
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QuantumJob
+from app.schemas.quantum_schemas import FilterCondition, FilterParams
+from app.utils.helpers import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+EQUALITY_OPS = {'eq', 'in'}
+RANGE_OPS = {'gt', 'gte', 'lt', 'lte'}
+
+def _parse_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    parsed = parse_timestamp(str(value))
+    if parsed is None:
+        raise ValueError(f"Invalid datetime: {value}")
+    return parsed
+
+class FilterField:
+    """A filterable job column, the value parser and the operators it supports.
+
+    Only sargable operators are offered (equality, IN and ranges on the bare
+    column), so every predicate can be answered from the column's index.
+    """
+
+    def __init__(self, column: Any, parse: Callable[[Any], Any], ops: set):
+        self.column = column
+        self.parse = parse
+        self.ops = ops
+
+FILTER_FIELDS: Dict[str, FilterField] = {
+    'status': FilterField(QuantumJob.status, str, EQUALITY_OPS),
+    'backend': FilterField(QuantumJob.backend_name, str, EQUALITY_OPS),
+    'user_id': FilterField(QuantumJob.user_id, str, EQUALITY_OPS),
+    'shots': FilterField(QuantumJob.shots, int, EQUALITY_OPS | RANGE_OPS),
+    'circuits': FilterField(QuantumJob.circuits, int, EQUALITY_OPS | RANGE_OPS),
+    'creation_date': FilterField(QuantumJob.creation_date, _parse_datetime, RANGE_OPS),
+    'start_time': FilterField(QuantumJob.start_time, _parse_datetime, RANGE_OPS),
+    'end_time': FilterField(QuantumJob.end_time, _parse_datetime, RANGE_OPS),
+}
+
+def parse_filter_expression(expression: Optional[str]) -> List[FilterCondition]:
+    """Parse 'field:op:value;field:op:value' into conditions.
+
+    'in' takes a comma-separated list, e.g.
+    status:in:DONE,ERROR;shots:gte:1000;start_time:lt:2024-06-01T00:00:00Z
+    """
+    conditions = []
+    for clause in (expression or '').split(';'):
+        clause = clause.strip()
+        if not clause:
+            continue
+        parts = clause.split(':', 2)
+        if len(parts) != 3:
+            raise ValueError(f"Invalid filter clause '{clause}', expected field:op:value")
+        field, op, value = (part.strip() for part in parts)
+        conditions.append(FilterCondition(
+            field=field,
+            op=op,
+            value=[item.strip() for item in value.split(',') if item.strip()] if op == 'in' else value
+        ))
+    return conditions
+
+def _predicate(condition: FilterCondition):
+    field = FILTER_FIELDS.get(condition.field)
+    if field is None:
+        raise ValueError(f"Unknown filter field '{condition.field}'. Valid fields: {', '.join(FILTER_FIELDS)}")
+    if condition.op not in field.ops:
+        raise ValueError(f"Operator '{condition.op}' not supported for '{condition.field}'. Valid: {', '.join(sorted(field.ops))}")
+
+    column = field.column
+    if condition.op == 'in':
+        values = condition.value if isinstance(condition.value, list) else [condition.value]
+        return column.in_([field.parse(v) for v in values])
+
+    value = field.parse(condition.value)
+    return {
+        'eq': lambda: column == value,
+        'gt': lambda: column > value,
+        'gte': lambda: column >= value,
+        'lt': lambda: column < value,
+        'lte': lambda: column <= value,
+    }[condition.op]()
+
+def filter_conditions(filters: FilterParams) -> List[FilterCondition]:
+    """All conditions expressed by FilterParams, from shorthand parameters and the filter language"""
+    conditions = []
+
+    def add_values(field: str, values: List[str]):
+        if len(values) == 1:
+            conditions.append(FilterCondition(field=field, op='eq', value=values[0]))
+        elif values:
+            conditions.append(FilterCondition(field=field, op='in', value=values))
+
+    add_values('status', ([filters.status] if filters.status else []) + (filters.statuses or []))
+    add_values('backend', ([filters.backend] if filters.backend else []) + (filters.backends or []))
+    add_values('user_id', ([filters.user_id] if filters.user_id else []) + (filters.user_ids or []))
+
+    ranges = [
+        ('creation_date', 'gte', filters.start_date), ('creation_date', 'lte', filters.end_date),
+        ('shots', 'gte', filters.min_shots), ('shots', 'lte', filters.max_shots),
+        ('circuits', 'gte', filters.min_circuits), ('circuits', 'lte', filters.max_circuits),
+        ('start_time', 'gte', filters.started_after), ('start_time', 'lte', filters.started_before),
+        ('end_time', 'gte', filters.ended_after), ('end_time', 'lte', filters.ended_before),
+    ]
+    conditions.extend(
+        FilterCondition(field=field, op=op, value=value) for field, op, value in ranges if value is not None
+    )
+    conditions.extend(filters.conditions or [])
+    return conditions
+
+def compile_filters(filters: FilterParams) -> List[Any]:
+    """SQLAlchemy predicates for FilterParams; raises ValueError on invalid conditions"""
+    return [_predicate(condition) for condition in filter_conditions(filters)]
+
+def explain_filters(db: Session, filters: FilterParams) -> Dict[str, Any]:
+    """Query plan of the count query for a filter shape, flagging full table scans"""
+    stmt = select(func.count(QuantumJob.id)).where(*compile_filters(filters))
+    bind = db.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'sqlite':
+        compiled = stmt.compile(dialect=bind.dialect, compile_kwargs={'render_postcompile': True})
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+        plan = [row[-1] for row in rows]
+        full_scan = any(
+            step.startswith(f"SCAN {QuantumJob.__tablename__}") and 'INDEX' not in step for step in plan
+        )
+    elif dialect == 'postgresql':
+        compiled = stmt.compile(dialect=bind.dialect, compile_kwargs={'render_postcompile': True})
+        rows = db.connection().exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).all()
+        plan = [row[0] for row in rows]
+        full_scan = any(f"Seq Scan on {QuantumJob.__tablename__}" in step for step in plan)
+    else:
+        return {'dialect': dialect, 'plan': [], 'full_scan': None}
+
+    return {'dialect': dialect, 'plan': plan, 'full_scan': full_scan}
+
+def _sample_value(field: FilterField) -> Any:
+    if field.parse is int:
+        return '1'
+    if field.parse is str:
+        return 'sample'
+    return '2024-01-01T00:00:00Z'
+
+def check_filter_plans(db: Session) -> List[str]:
+    """Explain every single-condition filter shape and report the ones that scan the whole table"""
+    offenders = []
+    for name, field in FILTER_FIELDS.items():
+        for op in sorted(field.ops):
+            value = [_sample_value(field)] * 2 if op == 'in' else _sample_value(field)
+            shape = FilterParams(conditions=[FilterCondition(field=name, op=op, value=value)])
+            if explain_filters(db, shape)['full_scan']:
+                offenders.append(f"{name}:{op}")
+
+    if offenders:
+        logger.warning(f"Job filter shapes that need a full table scan: {', '.join(offenders)}")
+    return offenders
@@ -0,0 +1,283 @@
+"""
+Queue-length history: in-memory ring of raw samples per backend, downsampled
+into persisted 1-minute, 1-hour and 1-day min/max/avg tiers
+"""
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QueueHistory
+from app.utils.helpers import format_timestamp
+
+logger = logging.getLogger(__name__)
+
+# (resolution, bucket width in seconds, source tier or None for the raw ring)
+TIERS: List[Tuple[str, int, Optional[str]]] = [
+    ('1m', 60, None),
+    ('1h', 3600, '1m'),
+    ('1d', 86400, '1h'),
+]
+TIER_WIDTHS = {name: width for name, width, _ in TIERS}
+
+# How long each persisted tier is kept (None keeps it forever)
+TIER_RETENTION = {
+    '1m': timedelta(days=7),
+    '1h': timedelta(days=180),
+    '1d': None,
+}
+
+# Nominal spacing of raw samples (queue sync interval)
+RAW_SAMPLE_INTERVAL = 15
+
+def _to_epoch(dt: datetime) -> float:
+    """Convert a datetime to epoch seconds, treating naive values as UTC"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def _from_epoch(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+def _aggregate_buckets(
+    width: int,
+    timestamps: np.ndarray,
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    sums: np.ndarray,
+    counts: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Reduce time-ordered samples into fixed-width buckets.
+
+    Inputs must be sorted by timestamp so each bucket is a contiguous run,
+    which lets the min/max/sum reductions run as single reduceat calls.
+    """
+    buckets = np.floor(timestamps / width) * width
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    total = np.add.reduceat(sums, starts)
+    count = np.add.reduceat(counts, starts)
+    return {
+        'bucket_start': buckets[starts],
+        'min': np.minimum.reduceat(mins, starts),
+        'max': np.maximum.reduceat(maxs, starts),
+        'avg': total / np.maximum(count, 1),
+        'count': count,
+    }
+
+class QueueSampleRing:
+    """Fixed-size circular buffer of (timestamp, queue_length) samples"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.head = 0
+        self.size = 0
+
+    def append(self, timestamp: float, value: float):
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    @property
+    def oldest(self) -> Optional[float]:
+        if self.size == 0:
+            return None
+        return float(self.timestamps[self.head if self.size == self.capacity else 0])
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples with start <= timestamp < end, oldest first"""
+        if self.size < self.capacity:
+            timestamps, values = self.timestamps[:self.size], self.values[:self.size]
+        else:
+            timestamps = np.concatenate((self.timestamps[self.head:], self.timestamps[:self.head]))
+            values = np.concatenate((self.values[self.head:], self.values[:self.head]))
+
+        mask = np.ones(len(timestamps), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start
+        if end is not None:
+            mask &= timestamps < end
+        return timestamps[mask], values[mask]
+
+class QueueHistoryService:
+    """Append-only queue-length time series per backend"""
+
+    def __init__(self, ring_capacity: int = 24 * 3600 // RAW_SAMPLE_INTERVAL):
+        self.ring_capacity = ring_capacity
+        self.rings: Dict[str, QueueSampleRing] = {}
+        # (backend, tier) -> epoch seconds up to which buckets have been persisted
+        self.watermarks: Dict[Tuple[str, str], float] = {}
+
+    def record_samples(self, queue_data: List[Dict[str, Any]]):
+        """Append one raw sample per backend from a queue sync, stamped with the sync time"""
+        # Epoch time, not the payload's last_updated: that is a naive local datetime
+        now = time.time()
+        for data in queue_data:
+            ring = self.rings.get(data['backend_name'])
+            if ring is None:
+                ring = self.rings[data['backend_name']] = QueueSampleRing(self.ring_capacity)
+            ring.append(now, float(data.get('queue_length') or 0))
+
+    def downsample(self, db: Session):
+        """Persist every newly completed bucket of each tier and apply retention"""
+        now = time.time()
+        written = 0
+
+        for backend_name in list(self.rings):
+            for tier, width, source in TIERS:
+                complete_until = np.floor(now / width) * width
+                start = self._watermark(db, backend_name, tier, source)
+                if start is None or start >= complete_until:
+                    continue
+
+                if source is None:
+                    timestamps, values = self.rings[backend_name].window(start, complete_until)
+                    if len(timestamps) == 0:
+                        continue
+                    ones = np.ones(len(values))
+                    buckets = _aggregate_buckets(width, timestamps, values, values, values, ones)
+                else:
+                    rows = db.query(QueueHistory).filter(
+                        QueueHistory.backend_name == backend_name,
+                        QueueHistory.resolution == source,
+                        QueueHistory.bucket_start >= _from_epoch(start),
+                        QueueHistory.bucket_start < _from_epoch(complete_until)
+                    ).order_by(QueueHistory.bucket_start).all()
+                    if not rows:
+                        continue
+                    counts = np.array([r.sample_count for r in rows], dtype=np.float64)
+                    buckets = _aggregate_buckets(
+                        width,
+                        np.array([_to_epoch(r.bucket_start) for r in rows]),
+                        np.array([r.min_queue_length for r in rows], dtype=np.float64),
+                        np.array([r.max_queue_length for r in rows], dtype=np.float64),
+                        np.array([r.avg_queue_length for r in rows], dtype=np.float64) * counts,
+                        counts
+                    )
+
+                db.add_all([
+                    QueueHistory(
+                        backend_name=backend_name,
+                        resolution=tier,
+                        bucket_start=_from_epoch(bucket_start),
+                        sample_count=int(count),
+                        min_queue_length=float(low),
+                        max_queue_length=float(high),
+                        avg_queue_length=float(avg)
+                    )
+                    for bucket_start, low, high, avg, count in zip(
+                        buckets['bucket_start'], buckets['min'], buckets['max'], buckets['avg'], buckets['count']
+                    )
+                ])
+                db.flush()  # make fresh buckets visible to the next (coarser) tier
+                written += len(buckets['bucket_start'])
+                self.watermarks[(backend_name, tier)] = float(complete_until)
+
+        for tier, retention in TIER_RETENTION.items():
+            if retention is not None:
+                db.query(QueueHistory).filter(
+                    QueueHistory.resolution == tier,
+                    QueueHistory.bucket_start < _from_epoch(now) - retention
+                ).delete(synchronize_session=False)
+
+        db.commit()
+        if written:
+            logger.info(f"Persisted {written} downsampled queue history buckets")
+
+    def _watermark(self, db: Session, backend_name: str, tier: str, source: Optional[str]) -> Optional[float]:
+        """Start of the first bucket of a tier that has not been persisted yet"""
+        key = (backend_name, tier)
+        if key in self.watermarks:
+            return self.watermarks[key]
+
+        width = TIER_WIDTHS[tier]
+        last_bucket = db.query(func.max(QueueHistory.bucket_start)).filter(
+            QueueHistory.backend_name == backend_name,
+            QueueHistory.resolution == tier
+        ).scalar()
+        if last_bucket is not None:
+            watermark = _to_epoch(last_bucket) + width
+        elif source is None:
+            oldest = self.rings[backend_name].oldest
+            watermark = np.floor(oldest / width) * width if oldest is not None else None
+        else:
+            first_source = db.query(func.min(QueueHistory.bucket_start)).filter(
+                QueueHistory.backend_name == backend_name,
+                QueueHistory.resolution == source
+            ).scalar()
+            watermark = np.floor(_to_epoch(first_source) / width) * width if first_source is not None else None
+
+        if watermark is not None:
+            self.watermarks[key] = float(watermark)
+        return watermark
+
+    def get_history(
+        self,
+        db: Session,
+        backend_name: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: str = 'auto',
+        max_points: int = 1000
+    ) -> Dict[str, Any]:
+        """Queue history for a backend, answered from the finest tier that fits max_points"""
+        end_ts = _to_epoch(end) if end else time.time()
+        start_ts = _to_epoch(start) if start else end_ts - 86400
+        span = max(end_ts - start_ts, 0)
+
+        if resolution == 'auto':
+            ring = self.rings.get(backend_name)
+            resolution = '1d'
+            if ring is not None and ring.oldest is not None and ring.oldest <= start_ts \
+                    and span / RAW_SAMPLE_INTERVAL <= max_points:
+                resolution = 'raw'
+            else:
+                for tier, width, _ in TIERS:
+                    if span / width <= max_points:
+                        resolution = tier
+                        break
+
+        if resolution == 'raw':
+            ring = self.rings.get(backend_name)
+            timestamps, values = ring.window(start_ts, end_ts) if ring else (np.array([]), np.array([]))
+            truncated = len(timestamps) > max_points
+            points = [
+                {'timestamp': format_timestamp(_from_epoch(ts)), 'min': value, 'max': value, 'avg': value, 'samples': 1}
+                for ts, value in zip(timestamps[-max_points:].tolist(), values[-max_points:].tolist())
+            ]
+        else:
+            rows = db.query(QueueHistory).filter(
+                QueueHistory.backend_name == backend_name,
+                QueueHistory.resolution == resolution,
+                QueueHistory.bucket_start >= _from_epoch(start_ts),
+                QueueHistory.bucket_start < _from_epoch(end_ts)
+            ).order_by(QueueHistory.bucket_start.desc()).limit(max_points + 1).all()
+            truncated = len(rows) > max_points
+            points = [
+                {
+                    'timestamp': format_timestamp(row.bucket_start),
+                    'min': row.min_queue_length,
+                    'max': row.max_queue_length,
+                    'avg': row.avg_queue_length,
+                    'samples': row.sample_count
+                }
+                for row in reversed(rows[:max_points])
+            ]
+
+        return {
+            'backend_name': backend_name,
+            'resolution': resolution,
+            'from': format_timestamp(_from_epoch(start_ts)),
+            'to': format_timestamp(_from_epoch(end_ts)),
+            'points': points,
+            'truncated': truncated
+        }
+
+# Global instance
+queue_history_service = QueueHistoryService()
@@ -0,0 +1,134 @@
+"""
+Backend recommendations ranked by predicted turnaround and device quality
+"""
+import logging
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QuantumBackend
+from app.services.wait_time_estimator import wait_time_estimator
+from app.utils.helpers import format_timestamp, record_field
+
+logger = logging.getLogger(__name__)
+
+# Composite score weights (sum to 1)
+WAIT_WEIGHT = 0.5
+QUALITY_WEIGHT = 0.35
+QUBITS_WEIGHT = 0.15
+
+# Predicted wait at which the wait component has decayed to 1/e
+WAIT_SCALE_SECONDS = 3600.0
+# Average gate error at (or above) which the quality component is 0
+MAX_ERROR_RATE = 0.05
+# Component value used when a backend has no wait or calibration data
+UNKNOWN_COMPONENT = 0.5
+
+class RecommendationService:
+    """Precomputed ranking of operational real devices.
+
+    Backend attributes arrive with each backend sync and pending job counts
+    with each queue sync; both rebuild a list of candidates sorted by a
+    composite score of predicted wait, calibration error rate and qubit count.
+    Recommendation requests only filter that list, so they never touch the DB.
+    """
+
+    def __init__(self):
+        self.backends: Dict[str, Dict[str, Any]] = {}
+        self.pending_jobs: Dict[str, int] = {}
+        self.ranked: List[Dict[str, Any]] = []
+        self.updated_at: Optional[datetime] = None
+
+    def load(self, db: Session):
+        """Seed the index from the stored backends"""
+        self.update_backends(db.query(QuantumBackend).all())
+
+    def update_backends(self, backends: Iterable[Any]):
+        """Refresh backend attributes after a backend sync"""
+        self.backends = {}
+        for backend in backends:
+            name = record_field(backend, 'name')
+            self.backends[name] = {
+                'name': name,
+                'n_qubits': record_field(backend, 'n_qubits', 0),
+                'status': record_field(backend, 'status'),
+                'simulator': bool(record_field(backend, 'simulator', False)),
+                'basis_gates': frozenset(record_field(backend, 'basis_gates', [])),
+                'error_rate': record_field(backend, 'error_rate'),
+            }
+            self.pending_jobs.setdefault(name, record_field(backend, 'pending_jobs', 0))
+        self._rebuild()
+
+    def update_queue(self, queue_data: Iterable[Dict[str, Any]]):
+        """Refresh pending job counts after a queue sync"""
+        for data in queue_data:
+            self.pending_jobs[data['backend_name']] = data.get('pending_jobs') or 0
+        self._rebuild()
+
+    def _rebuild(self):
+        candidates = [
+            b for b in self.backends.values()
+            if b['status'] == 'operational' and not b['simulator']
+        ]
+        max_qubits = max((b['n_qubits'] for b in candidates), default=0)
+
+        ranked = []
+        for backend in candidates:
+            pending = self.pending_jobs.get(backend['name'], 0)
+            wait = wait_time_estimator.estimate(backend['name'], pending)['estimated_wait_time']
+
+            wait_score = math.exp(-wait / WAIT_SCALE_SECONDS) if wait is not None else UNKNOWN_COMPONENT
+            if backend['error_rate'] is not None:
+                quality_score = 1.0 - min(backend['error_rate'] / MAX_ERROR_RATE, 1.0)
+            else:
+                quality_score = UNKNOWN_COMPONENT
+            qubits_score = math.log2(1 + backend['n_qubits']) / math.log2(1 + max_qubits) if max_qubits else 0.0
+
+            ranked.append({
+                **backend,
+                'pending_jobs': pending,
+                'predicted_wait_time': wait,
+                'score': round(
+                    WAIT_WEIGHT * wait_score + QUALITY_WEIGHT * quality_score + QUBITS_WEIGHT * qubits_score, 4
+                ),
+            })
+
+        ranked.sort(key=lambda b: b['score'], reverse=True)
+        # Publish by reference swap so readers never see a half-built list
+        self.ranked = ranked
+        self.updated_at = datetime.now()
+
+    def recommend(
+        self,
+        min_qubits: int = 0,
+        max_wait: Optional[float] = None,
+        required_gates: Optional[Iterable[str]] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Best-scoring backends that satisfy the constraints"""
+        gates = frozenset(required_gates or [])
+        results = []
+        for backend in self.ranked:
+            if backend['n_qubits'] < min_qubits:
+                continue
+            if max_wait is not None and (backend['predicted_wait_time'] is None or backend['predicted_wait_time'] > max_wait):
+                continue
+            if not gates <= backend['basis_gates']:
+                continue
+            results.append({
+                'name': backend['name'],
+                'score': backend['score'],
+                'n_qubits': backend['n_qubits'],
+                'pending_jobs': backend['pending_jobs'],
+                'predicted_wait_time': backend['predicted_wait_time'],
+                'error_rate': backend['error_rate'],
+                'basis_gates': sorted(backend['basis_gates']),
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+# Global instance
+recommendation_service = RecommendationService()
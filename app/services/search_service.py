@@ -0,0 +1,175 @@
+"""
+Full-text search over job names, tags, program IDs and error messages
+"""
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import text, or_, desc, cast, String
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QuantumJob
+from app.schemas.quantum_schemas import QuantumJobSchema, PaginatedResponse
+
+logger = logging.getLogger(__name__)
+
+# SQLite: external-content FTS5 table over quantum_jobs, kept in sync by triggers
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS quantum_jobs_fts USING fts5(
+        name, tags, program_id, error_message,
+        content='quantum_jobs', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quantum_jobs_fts_ai AFTER INSERT ON quantum_jobs BEGIN
+        INSERT INTO quantum_jobs_fts(rowid, name, tags, program_id, error_message)
+        VALUES (new.id, new.name, new.tags, new.program_id, new.error_message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quantum_jobs_fts_ad AFTER DELETE ON quantum_jobs BEGIN
+        INSERT INTO quantum_jobs_fts(quantum_jobs_fts, rowid, name, tags, program_id, error_message)
+        VALUES ('delete', old.id, old.name, old.tags, old.program_id, old.error_message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quantum_jobs_fts_au AFTER UPDATE OF name, tags, program_id, error_message ON quantum_jobs BEGIN
+        INSERT INTO quantum_jobs_fts(quantum_jobs_fts, rowid, name, tags, program_id, error_message)
+        VALUES ('delete', old.id, old.name, old.tags, old.program_id, old.error_message);
+        INSERT INTO quantum_jobs_fts(rowid, name, tags, program_id, error_message)
+        VALUES (new.id, new.name, new.tags, new.program_id, new.error_message);
+    END
+    """,
+]
+
+# PostgreSQL: expression GIN index, maintained by the database on every write
+POSTGRES_TSVECTOR = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(tags::text, '') || ' ' || "
+    "coalesce(program_id, '') || ' ' || coalesce(error_message, ''))"
+)
+POSTGRES_FTS_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_quantum_jobs_fts ON quantum_jobs USING GIN ({POSTGRES_TSVECTOR})",
+]
+
+# bm25 column weights: name, tags, program_id, error_message
+SQLITE_BM25_WEIGHTS = "10.0, 5.0, 5.0, 1.0"
+
+def ensure_search_index(engine: Engine) -> bool:
+    """Create the full-text index for the current backend; returns False when unsupported"""
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as connection:
+            if dialect == 'sqlite':
+                created = connection.execute(text(
+                    "SELECT count(*) FROM sqlite_master WHERE name = 'quantum_jobs_fts'"
+                )).scalar() == 0
+                for statement in SQLITE_FTS_DDL:
+                    connection.execute(text(statement))
+                if created:
+                    # Index the rows that existed before the FTS table
+                    connection.execute(text("INSERT INTO quantum_jobs_fts(quantum_jobs_fts) VALUES ('rebuild')"))
+            elif dialect == 'postgresql':
+                for statement in POSTGRES_FTS_DDL:
+                    connection.execute(text(statement))
+            else:
+                return False
+    except Exception as e:
+        logger.warning(f"Full-text search index unavailable, falling back to LIKE search: {e}")
+        return False
+
+    logger.info(f"Full-text search index ready ({dialect})")
+    return True
+
+def build_fts5_query(q: str) -> str:
+    """Turn free text into an FTS5 query: every term must match, 'term*' is a prefix search"""
+    terms = []
+    for term in q.split():
+        prefix = term.endswith('*')
+        term = term.rstrip('*').replace('"', '""')
+        if term:
+            terms.append(f'"{term}"*' if prefix else f'"{term}"')
+    return ' '.join(terms)
+
+class SearchService:
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    async def search_jobs(self, q: str, page: int = 1, per_page: int = 50) -> PaginatedResponse:
+        """Ranked, paginated full-text search over jobs"""
+        offset = (page - 1) * per_page
+        try:
+            if self.dialect == 'sqlite':
+                total, ids = self._search_sqlite(q, offset, per_page)
+            elif self.dialect == 'postgresql':
+                total, ids = self._search_postgres(q, offset, per_page)
+            else:
+                total, ids = self._search_like(q, offset, per_page)
+        except Exception as e:
+            # Missing FTS table (e.g. SQLite built without FTS5)
+            logger.warning(f"Full-text search failed, using LIKE search: {e}")
+            self.db.rollback()
+            total, ids = self._search_like(q, offset, per_page)
+
+        jobs = {job.id: job for job in self.db.query(QuantumJob).filter(QuantumJob.id.in_(ids))} if ids else {}
+        pages = (total + per_page - 1) // per_page
+
+        return PaginatedResponse(
+            items=[QuantumJobSchema.from_orm(jobs[job_id]) for job_id in ids if job_id in jobs],
+            total=total,
+            page=page,
+            per_page=per_page,
+            pages=pages,
+            has_next=page < pages,
+            has_prev=page > 1
+        )
+
+    def _search_sqlite(self, q: str, offset: int, limit: int) -> Tuple[int, List[int]]:
+        match = build_fts5_query(q)
+        if not match:
+            return 0, []
+
+        total = self.db.execute(
+            text("SELECT count(*) FROM quantum_jobs_fts WHERE quantum_jobs_fts MATCH :match"),
+            {'match': match}
+        ).scalar()
+        rows = self.db.execute(
+            text(
+                f"SELECT rowid FROM quantum_jobs_fts WHERE quantum_jobs_fts MATCH :match "
+                f"ORDER BY bm25(quantum_jobs_fts, {SQLITE_BM25_WEIGHTS}) LIMIT :limit OFFSET :offset"
+            ),
+            {'match': match, 'limit': limit, 'offset': offset}
+        )
+        return total, [row[0] for row in rows]
+
+    def _search_postgres(self, q: str, offset: int, limit: int) -> Tuple[int, List[int]]:
+        params = {'q': q, 'limit': limit, 'offset': offset}
+        condition = f"{POSTGRES_TSVECTOR} @@ plainto_tsquery('simple', :q)"
+
+        total = self.db.execute(text(f"SELECT count(*) FROM quantum_jobs WHERE {condition}"), params).scalar()
+        rows = self.db.execute(
+            text(
+                f"SELECT id FROM quantum_jobs WHERE {condition} "
+                f"ORDER BY ts_rank({POSTGRES_TSVECTOR}, plainto_tsquery('simple', :q)) DESC "
+                f"LIMIT :limit OFFSET :offset"
+            ),
+            params
+        )
+        return total, [row[0] for row in rows]
+
+    def _search_like(self, q: str, offset: int, limit: int) -> Tuple[int, List[int]]:
+        query = self.db.query(QuantumJob.id)
+        for term in q.split():
+            pattern = f"%{term.rstrip('*')}%"
+            query = query.filter(or_(
+                QuantumJob.name.ilike(pattern),
+                cast(QuantumJob.tags, String).ilike(pattern),
+                QuantumJob.program_id.ilike(pattern),
+                QuantumJob.error_message.ilike(pattern)
+            ))
+
+        total = query.count()
+        rows = query.order_by(desc(QuantumJob.creation_date)).offset(offset).limit(limit).all()
+        return total, [row[0] for row in rows]
@@ -0,0 +1,157 @@
+"""
+WebSocket subscriptions: filter parsing, an entity-key index of subscribers and field-level deltas
+"""
+import logging
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, List, Set
+
+from sqlalchemy import desc, select
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import JobQueue, QuantumJob
+from app.services.event_broadcaster import JOB_EVENT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Channel -> filter name -> entity field, most selective filter first
+CHANNEL_FILTERS: Dict[str, Dict[str, str]] = {
+    'jobs': {'job_ids': 'job_id', 'users': 'user_id', 'backends': 'backend_name', 'statuses': 'status'},
+    'queue': {'backends': 'backend'},
+}
+MAX_FILTER_VALUES = 1000
+
+def parse_filters(channel: str, raw: Any) -> Dict[str, Set[str]]:
+    """Validated filters of a subscribe message; raises ValueError"""
+    allowed = CHANNEL_FILTERS.get(channel)
+    if allowed is None:
+        raise ValueError(f"Channel '{channel}' does not support subscriptions")
+    if raw is None:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError("filters must be an object")
+    filters = {}
+    for name, values in raw.items():
+        if name not in allowed:
+            raise ValueError(f"Unknown filter '{name}'. Valid: {', '.join(allowed)}")
+        if isinstance(values, str):
+            values = [values]
+        if not isinstance(values, list) or not values or len(values) > MAX_FILTER_VALUES:
+            raise ValueError(f"Filter '{name}' takes a list of 1 to {MAX_FILTER_VALUES} values")
+        filters[name] = {str(value) for value in values}
+    return filters
+
+class Subscription:
+    """A subscriber's filters: any listed value per filter, all filters at once"""
+
+    def __init__(self, subscriber: Hashable, fields: Dict[str, str], filters: Dict[str, Set[str]]):
+        self.subscriber = subscriber
+        self.conditions = {fields[name]: values for name, values in filters.items()}
+
+    def matches(self, entity: Dict[str, Any]) -> bool:
+        return all(entity.get(field) in values for field, values in self.conditions.items())
+
+class SubscriptionIndex:
+    """Subscriptions of one channel, indexed by entity field value.
+
+    Each subscription is filed under the values of its most selective
+    filter (or with the unfiltered ones), so routing an entity touches only
+    the subscriptions filed under that entity's own values before the full
+    filter check.
+    """
+
+    def __init__(self, channel: str):
+        self.fields = CHANNEL_FILTERS[channel]
+        self.index: Dict[str, Dict[str, Set[Subscription]]] = {field: defaultdict(set) for field in self.fields.values()}
+        self.unfiltered: Set[Subscription] = set()
+        self.subscriptions: Dict[Hashable, Subscription] = {}
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def __contains__(self, subscriber: Hashable) -> bool:
+        return subscriber in self.subscriptions
+
+    def _slot(self, subscription: Subscription):
+        for field in self.fields.values():
+            if field in subscription.conditions:
+                return field, subscription.conditions[field]
+        return None, ()
+
+    def add(self, subscriber: Hashable, filters: Dict[str, Set[str]]) -> Subscription:
+        self.remove(subscriber)
+        subscription = self.subscriptions[subscriber] = Subscription(subscriber, self.fields, filters)
+        field, values = self._slot(subscription)
+        if field is None:
+            self.unfiltered.add(subscription)
+        for value in values:
+            self.index[field][value].add(subscription)
+        return subscription
+
+    def remove(self, subscriber: Hashable):
+        subscription = self.subscriptions.pop(subscriber, None)
+        if subscription is None:
+            return
+        field, values = self._slot(subscription)
+        if field is None:
+            self.unfiltered.discard(subscription)
+        for value in values:
+            bucket = self.index[field].get(value)
+            if bucket is not None:
+                bucket.discard(subscription)
+                if not bucket:
+                    del self.index[field][value]
+
+    def match(self, *entities: Dict[str, Any]) -> List[Hashable]:
+        """Subscribers whose filters match any of the entities (e.g. a job before and after a change)"""
+        candidates = set(self.unfiltered)
+        for entity in entities:
+            for field, subscriptions in self.index.items():
+                bucket = subscriptions.get(entity.get(field))
+                if bucket:
+                    candidates.update(bucket)
+        return [
+            subscription.subscriber for subscription in candidates
+            if any(subscription.matches(entity) for entity in entities)
+        ]
+
+class EntityStates:
+    """Last published fields per entity key (bounded LRU), to turn updates into field-level deltas"""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.states: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+
+    def diff(self, key: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Fields that changed since the entity was last seen (all of them for unknown entities)"""
+        previous = self.states.pop(key, None)
+        self.states[key] = dict(fields)
+        if len(self.states) > self.max_entries:
+            self.states.popitem(last=False)
+        if previous is None:
+            return dict(fields)
+        return {name: value for name, value in fields.items() if previous.get(name) != value}
+
+def job_snapshot(db: Session, filters: Dict[str, Set[str]], limit: int = 100) -> List[Dict[str, Any]]:
+    """Most recent jobs matching subscription filters"""
+    columns = {field: getattr(QuantumJob, field) for field in CHANNEL_FILTERS['jobs'].values()}
+    statement = select(*(getattr(QuantumJob, name) for name in JOB_EVENT_FIELDS)).where(*(
+        columns[CHANNEL_FILTERS['jobs'][name]].in_(values) for name, values in filters.items()
+    )).order_by(desc(QuantumJob.creation_date)).limit(limit)
+    return [dict(zip(JOB_EVENT_FIELDS, row)) for row in db.execute(statement)]
+
+def queue_snapshot(db: Session, filters: Dict[str, Set[str]]) -> List[Dict[str, Any]]:
+    """Current queue state of the subscribed backends"""
+    query = db.query(JobQueue)
+    if 'backends' in filters:
+        query = query.filter(JobQueue.backend_name.in_(filters['backends']))
+    return [
+        {
+            'backend': queue.backend_name,
+            'queue_length': queue.queue_length,
+            'pending_jobs': queue.pending_jobs,
+            'running_jobs': queue.running_jobs,
+            'estimated_wait_time': queue.estimated_wait_time,
+            'status': queue.status
+        }
+        for queue in query.all()
+    ]
@@ -0,0 +1,108 @@
+"""
+Inverted tag index over QuantumJob.tags
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import desc, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import JobTag, QuantumJob
+
+logger = logging.getLogger(__name__)
+
+TAGS_TABLE = JobTag.__table__
+
+def normalize_tags(tags: Any) -> List[str]:
+    """Distinct non-empty string tags from a JSON tags value"""
+    if not isinstance(tags, list):
+        return []
+    return list(dict.fromkeys(tag.strip() for tag in tags if isinstance(tag, str) and tag.strip()))
+
+class TagIndexService:
+    """Maintains job_tags, the (tag, job) posting lists used for tag filters"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def index_jobs(self, jobs: Iterable[Tuple[int, Any]]):
+        """Add postings for (quantum_jobs.id, tags) pairs; existing postings are left alone"""
+        rows = [
+            {'tag': tag, 'job_id': job_pk}
+            for job_pk, tags in jobs
+            for tag in normalize_tags(tags)
+        ]
+        if not rows:
+            return
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == 'sqlite':
+            stmt = sqlite_insert(TAGS_TABLE).on_conflict_do_nothing()
+        elif dialect == 'postgresql':
+            stmt = pg_insert(TAGS_TABLE).on_conflict_do_nothing()
+        else:
+            existing = set(self.db.query(JobTag.tag, JobTag.job_id).filter(
+                JobTag.job_id.in_({row['job_id'] for row in rows})
+            ))
+            rows = [row for row in rows if (row['tag'], row['job_id']) not in existing]
+            if not rows:
+                return
+            stmt = insert(TAGS_TABLE)
+        self.db.execute(stmt, rows)
+
+    def reindex_job(self, job_pk: int, tags: Any):
+        """Replace the postings of a job whose tags changed"""
+        self.db.query(JobTag).filter(JobTag.job_id == job_pk).delete(synchronize_session=False)
+        self.index_jobs([(job_pk, tags)])
+
+    def backfill(self, batch_size: int = 5000) -> int:
+        """Build the index for existing jobs when it is empty; returns the number of jobs indexed"""
+        if self.db.query(JobTag.job_id).first() is not None:
+            return 0
+
+        indexed = 0
+        batch = []
+        for job_pk, tags in self.db.query(QuantumJob.id, QuantumJob.tags).filter(
+            QuantumJob.tags.isnot(None)
+        ).yield_per(batch_size):
+            batch.append((job_pk, tags))
+            if len(batch) >= batch_size:
+                self.index_jobs(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            self.index_jobs(batch)
+            indexed += len(batch)
+
+        self.db.commit()
+        if indexed:
+            logger.info(f"Tag index backfilled from {indexed} jobs")
+        return indexed
+
+    def matching_job_ids(self, tags_any: Optional[List[str]] = None, tags_all: Optional[List[str]] = None):
+        """Subquery of quantum_jobs.id matching the tag filters, resolved on job_tags alone"""
+        subquery = None
+        if tags_any:
+            subquery = select(JobTag.job_id).where(JobTag.tag.in_(tags_any)).distinct()
+        if tags_all:
+            tags_all = list(dict.fromkeys(tags_all))
+            all_query = select(JobTag.job_id).where(JobTag.tag.in_(tags_all)).group_by(JobTag.job_id).having(
+                func.count(JobTag.tag) == len(tags_all)
+            )
+            subquery = all_query if subquery is None else subquery.intersect(all_query)
+        return subquery
+
+    def tag_counts(self, prefix: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """Tags with their job cardinalities, most used first"""
+        query = self.db.query(JobTag.tag, func.count(JobTag.job_id).label('job_count'))
+        if prefix:
+            query = query.filter(JobTag.tag.startswith(prefix, autoescape=True))
+        total_tags = query.with_entities(func.count(func.distinct(JobTag.tag))).scalar()
+        rows = query.group_by(JobTag.tag).order_by(desc('job_count'), JobTag.tag).limit(limit).all()
+
+        return {
+            'tags': [{'tag': row.tag, 'job_count': row.job_count} for row in rows],
+            'total_tags': total_tags
+        }
@@ -0,0 +1,152 @@
+"""
+Sliding-window job throughput counters per backend, kept in bucketed ring arrays
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QuantumJob
+from app.services.columnar_job_store import to_epoch
+from app.services.job_rollup_service import epoch_seconds
+from app.utils.helpers import record_field
+
+logger = logging.getLogger(__name__)
+
+# Event -> job timestamp that marks it
+EVENTS = {'submitted': 'creation_date', 'started': 'start_time', 'completed': 'end_time'}
+EVENT_NAMES = list(EVENTS)
+
+# Window -> (ring, seconds); 1h and 24h are exact to the minute, 7d and 30d to the hour
+WINDOWS = {
+    '1h': ('minute', 3600),
+    '24h': ('minute', 86400),
+    '7d': ('hour', 7 * 86400),
+    '30d': ('hour', 30 * 86400),
+}
+
+class BucketRing:
+    """Per-event counts in `size` buckets of `width` seconds, reused round-robin.
+
+    Each slot remembers which absolute bucket it holds; a slot is cleared
+    lazily when a newer bucket maps onto it, and reads ignore slots outside
+    the requested window, so there is no background expiry.
+    """
+
+    def __init__(self, width: int, size: int):
+        self.width = width
+        self.size = size
+        self.buckets = np.full(size, -1, dtype=np.int64)
+        self.counts = np.zeros((len(EVENT_NAMES), size), dtype=np.int64)
+
+    def add(self, event: int, timestamps: np.ndarray, now: float):
+        current = int(now // self.width)
+        buckets = np.minimum(np.floor(timestamps[~np.isnan(timestamps)] / self.width).astype(np.int64), current)
+        buckets = buckets[buckets > current - self.size]
+        if not buckets.size:
+            return
+        buckets, counts = np.unique(buckets, return_counts=True)
+        slots = buckets % self.size
+        stale = self.buckets[slots] != buckets
+        # Reclaimed slots only ever move forward in time
+        reclaim = stale & (buckets > self.buckets[slots])
+        self.counts[:, slots[reclaim]] = 0
+        self.buckets[slots[reclaim]] = buckets[reclaim]
+        live = ~stale | reclaim
+        self.counts[event, slots[live]] += counts[live]
+
+    def window(self, seconds: int, now: float) -> np.ndarray:
+        """Counts per event over the last `seconds`, at bucket granularity"""
+        current = int(now // self.width)
+        in_window = (self.buckets > current - seconds // self.width) & (self.buckets <= current)
+        return self.counts[:, in_window].sum(axis=1)
+
+class BackendThroughput:
+    def __init__(self):
+        self.rings = {'minute': BucketRing(60, 24 * 60), 'hour': BucketRing(3600, 30 * 24)}
+
+    def add(self, event: str, timestamps: np.ndarray, now: float):
+        for ring in self.rings.values():
+            ring.add(EVENT_NAMES.index(event), timestamps, now)
+
+    def window(self, name: str, now: float) -> np.ndarray:
+        ring, seconds = WINDOWS[name]
+        return self.rings[ring].window(seconds, now)
+
+class ThroughputCounters:
+    """Submitted, started and completed job counts per backend over the last 1h, 24h, 7d and 30d.
+
+    Events are counted by the timestamp that marks them (creation, start and
+    end time) as jobs are ingested or change state; reading a window sums
+    at most 1440 buckets regardless of job volume.
+    """
+
+    def __init__(self):
+        self.backends: Dict[str, BackendThroughput] = {}
+
+    def _backend(self, name: Optional[str]) -> BackendThroughput:
+        name = name or 'unknown'
+        counters = self.backends.get(name)
+        if counters is None:
+            counters = self.backends[name] = BackendThroughput()
+        return counters
+
+    def observe_jobs(self, jobs: Iterable[Any], events: Sequence[str] = EVENT_NAMES, now: Optional[float] = None):
+        """Count the given events of jobs (dicts or QuantumJob rows); each event of a job must be observed once"""
+        now = time.time() if now is None else now
+        by_backend: Dict[str, list] = {}
+        for job in jobs:
+            by_backend.setdefault(record_field(job, 'backend_name') or 'unknown', []).append(job)
+        for backend, backend_jobs in by_backend.items():
+            counters = self._backend(backend)
+            for event in events:
+                counters.add(event, np.array([to_epoch(record_field(job, EVENTS[event])) for job in backend_jobs]), now)
+
+    def load_history(self, db: Session):
+        """(Re)build the counters from jobs with any event in the last 30 days"""
+        self.backends = {}
+        now = time.time()
+        dialect = db.get_bind().dialect.name
+        cutoff = datetime.utcnow() - timedelta(days=30, hours=1)
+        columns = [getattr(QuantumJob, column) for column in EVENTS.values()]
+        rows = db.execute(
+            select(QuantumJob.backend_name, *(epoch_seconds(dialect, column) for column in columns))
+            .where(or_(*(column >= cutoff for column in columns)))
+        ).all()
+        if not rows:
+            return
+
+        backends = np.array([row[0] or 'unknown' for row in rows], dtype=object)
+        timestamps = np.array([row[1:] for row in rows], dtype=float)
+        for backend in np.unique(backends):
+            selected = timestamps[backends == backend]
+            for index, event in enumerate(EVENT_NAMES):
+                self._backend(backend).add(event, selected[:, index], now)
+        logger.info(f"Throughput counters loaded {len(rows)} recent jobs")
+
+    def windows(self, backend: Optional[str] = None, now: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """{window: {event: count}} for one backend, or summed over all backends"""
+        now = time.time() if now is None else now
+        counters = [self.backends[backend]] if backend in self.backends else ([] if backend else list(self.backends.values()))
+        result = {}
+        for name in WINDOWS:
+            totals = sum((counter.window(name, now) for counter in counters), np.zeros(len(EVENT_NAMES), dtype=np.int64))
+            result[name] = dict(zip(EVENT_NAMES, totals.tolist()))
+        return result
+
+    def summary(self, backend: Optional[str] = None) -> Dict[str, Any]:
+        windows = self.windows(backend)
+        return {
+            'jobs_per_day': windows['30d']['submitted'] / 30,
+            'jobs_per_hour': windows['24h']['submitted'] / 24,
+            'completed_per_day': windows['30d']['completed'] / 30,
+            'completed_per_hour': windows['24h']['completed'] / 24,
+            'windows': windows,
+        }
+
+# Global instance
+throughput_counters = ThroughputCounters()
@@ -0,0 +1,173 @@
+"""
+Hour-of-week usage heatmaps: job submissions and running-job load per backend
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QuantumJob
+from app.services.columnar_job_store import to_epoch
+from app.services.job_rollup_service import epoch_seconds
+from app.utils.helpers import record_field
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_WEEK = 168
+# The Unix epoch fell on a Thursday, 72 hours after the start of its Monday-based week
+EPOCH_WEEK_OFFSET = 72
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+METRICS = ('submissions', 'running')
+
+def hour_of_week(timestamps: np.ndarray) -> np.ndarray:
+    """UTC hour-of-week slot (0 = Monday 00:00) of epoch-second timestamps"""
+    return (np.floor(timestamps / 3600).astype(np.int64) + EPOCH_WEEK_OFFSET) % HOURS_PER_WEEK
+
+def running_counts(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Per slot, how many (job, hour) pairs had a job running, from start/end epoch seconds.
+
+    A job counts once for every clock hour it touched. Whole weeks of a
+    long job add to every slot; the remainder is laid down with a
+    difference array over two weeks and folded back, so the cost is
+    independent of job durations.
+    """
+    counts = np.zeros(HOURS_PER_WEEK, dtype=np.int64)
+    valid = ~np.isnan(starts) & ~np.isnan(ends) & (ends >= starts)
+    if not valid.any():
+        return counts
+
+    first_hour = np.floor(starts[valid] / 3600).astype(np.int64)
+    hours = np.floor(ends[valid] / 3600).astype(np.int64) - first_hour + 1
+    full_weeks, remainder = np.divmod(hours, HOURS_PER_WEEK)
+    counts += int(full_weeks.sum())
+
+    slots = (first_hour + EPOCH_WEEK_OFFSET) % HOURS_PER_WEEK
+    diff = np.zeros(2 * HOURS_PER_WEEK + 1, dtype=np.int64)
+    np.add.at(diff, slots, 1)
+    np.add.at(diff, slots + remainder, -1)
+    spread = np.cumsum(diff[:-1])
+    return counts + spread[:HOURS_PER_WEEK] + spread[HOURS_PER_WEEK:]
+
+def utc_offset_hours(tz: Optional[str]) -> int:
+    """Whole-hour UTC offset of an IANA zone (current offset) or a '+HH:MM' string; raises ValueError"""
+    if not tz or tz.upper() == 'UTC':
+        return 0
+    if tz[0] in '+-':
+        hours, _, minutes = tz[1:].partition(':')
+        try:
+            offset_minutes = int(hours) * 60 + int(minutes or 0)
+        except ValueError:
+            raise ValueError(f"Invalid UTC offset '{tz}'")
+        offset_minutes *= -1 if tz[0] == '-' else 1
+    else:
+        try:
+            offset = datetime.now(ZoneInfo(tz)).utcoffset()
+        except Exception:
+            raise ValueError(f"Unknown timezone '{tz}'")
+        offset_minutes = int(offset.total_seconds() // 60)
+    if offset_minutes % 60:
+        raise ValueError("Only whole-hour UTC offsets are supported")
+    return offset_minutes // 60
+
+class UsageHeatmap:
+    """Dense 7x24 hour-of-week counters per backend, kept in UTC.
+
+    Submissions count jobs by creation hour; running load counts, for each
+    completed job, every hour it was running. Both are filled by a
+    vectorized backfill at startup and updated as the sync ingests jobs;
+    local-time views roll the UTC arrays by the zone's offset.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, np.ndarray]] = {metric: {} for metric in METRICS}
+
+    def _array(self, metric: str, backend: str) -> np.ndarray:
+        array = self.counts[metric].get(backend)
+        if array is None:
+            array = self.counts[metric][backend] = np.zeros(HOURS_PER_WEEK, dtype=np.int64)
+        return array
+
+    def _add(self, backends: np.ndarray, creation: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        for backend in np.unique(backends):
+            rows = backends == backend
+            created = creation[rows][~np.isnan(creation[rows])]
+            self._array('submissions', backend)[:] += np.bincount(hour_of_week(created), minlength=HOURS_PER_WEEK)
+            self._array('running', backend)[:] += running_counts(starts[rows], ends[rows])
+
+    def _columns(self, jobs: List[Any]):
+        backends = np.array([record_field(job, 'backend_name') or 'unknown' for job in jobs], dtype=object)
+        times = [np.array([to_epoch(record_field(job, name)) for job in jobs]) for name in ('creation_date', 'start_time', 'end_time')]
+        return backends, times
+
+    def observe_jobs(self, jobs: Iterable[Any]):
+        """Count newly ingested jobs (dicts or QuantumJob rows): submissions, and running load of finished ones"""
+        jobs = list(jobs)
+        if jobs:
+            backends, (creation, starts, ends) = self._columns(jobs)
+            self._add(backends, creation, starts, ends)
+
+    def observe_completed(self, jobs: Iterable[Any]):
+        """Add the running load of known jobs that have just finished"""
+        jobs = list(jobs)
+        if jobs:
+            backends, (_, starts, ends) = self._columns(jobs)
+            self._add(backends, np.full(len(jobs), np.nan), starts, ends)
+
+    def load_history(self, db: Session, batch_size: int = 100000):
+        """(Re)build the heatmaps from every job in the database"""
+        self.counts = {metric: {} for metric in METRICS}
+        dialect = db.get_bind().dialect.name
+        statement = select(
+            QuantumJob.backend_name,
+            *(epoch_seconds(dialect, column) for column in (QuantumJob.creation_date, QuantumJob.start_time, QuantumJob.end_time))
+        ).execution_options(yield_per=batch_size)
+
+        total = 0
+        for rows in db.execute(statement).partitions():
+            backends, creation, starts, ends = zip(*rows)
+            self._add(
+                np.array([backend or 'unknown' for backend in backends], dtype=object),
+                *(np.array(column, dtype=float) for column in (creation, starts, ends))
+            )
+            total += len(rows)
+        logger.info(f"Usage heatmap loaded {total} jobs for {len(self.counts['submissions'])} backends")
+
+    def matrix(self, metric: str = 'submissions', backend: Optional[str] = None, offset_hours: int = 0) -> np.ndarray:
+        """7x24 counts (rows Monday..Sunday) in local time at the given UTC offset"""
+        if backend is not None:
+            counts = self.counts[metric].get(backend, np.zeros(HOURS_PER_WEEK, dtype=np.int64))
+        else:
+            counts = sum(self.counts[metric].values(), np.zeros(HOURS_PER_WEEK, dtype=np.int64))
+        # UTC slot s is local slot s + offset
+        return np.roll(counts, offset_hours).reshape(7, 24)
+
+    def heatmap(self, metric: str = 'submissions', backend: Optional[str] = None, tz: Optional[str] = None) -> Dict[str, Any]:
+        """Heatmap payload; raises ValueError on unknown metrics or timezones"""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Valid: {', '.join(METRICS)}")
+        offset = utc_offset_hours(tz)
+        matrix = self.matrix(metric, backend, offset)
+        return {
+            'metric': metric,
+            'backend': backend,
+            'timezone': tz or 'UTC',
+            'utc_offset_hours': offset,
+            'days': WEEKDAYS,
+            'hours': list(range(24)),
+            'matrix': matrix.tolist(),
+            'total': int(matrix.sum()),
+            'backends': sorted(self.counts[metric]),
+        }
+
+    def peak_hours(self, top: int = 3, offset_hours: int = 0) -> List[Dict[str, int]]:
+        """Hours of the day with the most submissions, summed over weekdays"""
+        by_hour = self.matrix('submissions', offset_hours=offset_hours).sum(axis=0)
+        hours = np.argsort(-by_hour, kind='stable')[:top]
+        return [{'hour': int(hour), 'job_count': int(by_hour[hour])} for hour in hours if by_hour[hour] > 0]
+
+# Global instance
+usage_heatmap = UsageHeatmap()
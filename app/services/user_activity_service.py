@@ -0,0 +1,226 @@
+"""
+User activity analytics from streaming sketches: HyperLogLog distinct users and space-saving top users
+"""
+import hashlib
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QuantumJob
+from app.services.job_rollup_service import utc_day
+from app.utils.helpers import record_field
+
+logger = logging.getLogger(__name__)
+
+def _utc_date(value: Any) -> Optional[date]:
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+    return value if isinstance(value, date) else None
+
+class HyperLogLog:
+    """Distinct-count sketch with 2^precision one-byte registers (~1.04/sqrt(2^precision) error).
+
+    Registers merge by element-wise max, so daily sketches union into weeks
+    or arbitrary ranges without revisiting the underlying jobs.
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, value: str):
+        hashed = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    @classmethod
+    def union(cls, sketches: List['HyperLogLog'], precision: int = 12) -> 'HyperLogLog':
+        merged = cls(precision)
+        if sketches:
+            merged.registers = np.max([sketch.registers for sketch in sketches], axis=0)
+        return merged
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+class SpaceSaving:
+    """Top-k heavy hitters in bounded memory (Metwally et al.'s space-saving).
+
+    Keeps `capacity` counters; an unseen item replaces the smallest one and
+    inherits its count as the error bound, so reported counts overestimate
+    by at most `error` and every item above total/capacity is retained.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts: Dict[str, float] = {}
+        self.errors: Dict[str, float] = {}
+
+    def add(self, item: str, weight: float = 1):
+        if item in self.counts:
+            self.counts[item] += weight
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0
+            return
+        smallest = min(self.counts, key=self.counts.get)
+        floor = self.counts.pop(smallest)
+        self.errors.pop(smallest)
+        self.counts[item] = floor + weight
+        self.errors[item] = floor
+
+    def top(self, k: int) -> List[Tuple[str, float, float]]:
+        """(item, estimated count, maximum overestimate), highest first"""
+        items = sorted(self.counts, key=self.counts.get, reverse=True)[:k]
+        return [(item, self.counts[item], self.errors[item]) for item in items]
+
+    def get(self, item: str) -> Optional[float]:
+        return self.counts.get(item)
+
+class UserActivityTracker:
+    """Streaming user activity model, fed by the job sync.
+
+    Holds one HyperLogLog of active users per UTC creation day, space-saving
+    sketches of the heaviest users by job count and by shots, and each
+    user's first-seen day bucketed by day. Answers cost the same however
+    many jobs have been ingested.
+    """
+
+    def __init__(self, retention_days: int = 400, precision: int = 12, top_capacity: int = 1000):
+        self.retention_days = retention_days
+        self.precision = precision
+        self.top_capacity = top_capacity
+        self._reset()
+
+    def _reset(self):
+        self.daily_users: Dict[date, HyperLogLog] = {}
+        self.jobs_by_user = SpaceSaving(self.top_capacity)
+        self.shots_by_user = SpaceSaving(self.top_capacity)
+        self.first_seen: Dict[str, date] = {}
+        self.new_users_by_day: Dict[date, int] = {}
+
+    def _mark_active(self, day: date, user_id: str):
+        sketch = self.daily_users.get(day)
+        if sketch is None:
+            sketch = self.daily_users[day] = HyperLogLog(self.precision)
+        sketch.add(user_id)
+
+    def _mark_seen(self, day: date, user_id: str):
+        first = self.first_seen.get(user_id)
+        if first is not None and first <= day:
+            return
+        if first is not None:
+            self.new_users_by_day[first] -= 1
+        self.first_seen[user_id] = day
+        self.new_users_by_day[day] = self.new_users_by_day.get(day, 0) + 1
+
+    def _prune(self):
+        if not self.daily_users:
+            return
+        cutoff = max(self.daily_users) - timedelta(days=self.retention_days)
+        for day in [day for day in self.daily_users if day < cutoff]:
+            del self.daily_users[day]
+
+    def observe_jobs(self, jobs: Iterable[Any]):
+        """Count newly ingested jobs (dicts or QuantumJob rows); each job must be observed once"""
+        for job in jobs:
+            user_id = record_field(job, 'user_id')
+            if not user_id:
+                continue
+            self.jobs_by_user.add(user_id)
+            self.shots_by_user.add(user_id, record_field(job, 'shots') or 0)
+            day = _utc_date(record_field(job, 'creation_date'))
+            if day is not None:
+                self._mark_active(day, user_id)
+                self._mark_seen(day, user_id)
+        self._prune()
+
+    def load_history(self, db: Session):
+        """(Re)build the sketches from the jobs in the database, aggregated in SQL"""
+        self._reset()
+        dialect = db.get_bind().dialect.name
+        day = utc_day(dialect, QuantumJob.creation_date)
+
+        for job_day, user_id in db.query(day, QuantumJob.user_id).filter(
+            QuantumJob.user_id.isnot(None), QuantumJob.creation_date.isnot(None)
+        ).distinct():
+            self._mark_active(_utc_date(job_day), user_id)
+
+        totals = db.query(
+            QuantumJob.user_id,
+            func.count(QuantumJob.id),
+            func.coalesce(func.sum(QuantumJob.shots), 0),
+            func.min(day)
+        ).filter(QuantumJob.user_id.isnot(None)).group_by(QuantumJob.user_id).all()
+        for user_id, job_count, total_shots, first_day in totals:
+            self.jobs_by_user.add(user_id, job_count)
+            self.shots_by_user.add(user_id, total_shots)
+            if first_day is not None:
+                self._mark_seen(_utc_date(first_day), user_id)
+
+        self._prune()
+        logger.info(f"User activity loaded {len(totals)} users over {len(self.daily_users)} days")
+
+    def summary(self, days: int = 7, top: int = 10, today: Optional[date] = None) -> Dict[str, Any]:
+        """Distinct active users per day and week, new users and the heaviest users"""
+        today = today or datetime.now(timezone.utc).date()
+        window = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+        empty = HyperLogLog(self.precision)
+
+        weeks: Dict[date, List[HyperLogLog]] = {}
+        for day in window:
+            weeks.setdefault(day - timedelta(days=day.weekday()), []).append(self.daily_users.get(day, empty))
+
+        def top_users(sketch: SpaceSaving, other: SpaceSaving, key: str, other_key: str) -> List[Dict[str, Any]]:
+            # other_key comes from the other sketch and is None when that sketch no longer tracks the user
+            return [
+                {
+                    'user_id': user_id,
+                    key: int(count),
+                    other_key: int(other.get(user_id)) if other.get(user_id) is not None else None,
+                    'max_overcount': int(error)
+                }
+                for user_id, count, error in sketch.top(top)
+            ]
+
+        return {
+            'active_users': HyperLogLog.union(
+                [self.daily_users[day] for day in window if day in self.daily_users], self.precision
+            ).count(),
+            'total_users': len(self.first_seen),
+            'new_users_this_week': sum(
+                self.new_users_by_day.get(today - timedelta(days=offset), 0) for offset in range(7)
+            ),
+            'daily_active_users': [
+                {'date': day.isoformat(), 'users': self.daily_users[day].count() if day in self.daily_users else 0}
+                for day in window
+            ],
+            'weekly_active_users': [
+                {'week_start': week.isoformat(), 'users': HyperLogLog.union(sketches, self.precision).count()}
+                for week, sketches in sorted(weeks.items())
+            ],
+            'top_users': top_users(self.jobs_by_user, self.shots_by_user, 'job_count', 'total_shots'),
+            'top_users_by_shots': top_users(self.shots_by_user, self.jobs_by_user, 'total_shots', 'job_count'),
+        }
+
+# Global instance
+user_activity_tracker = UserActivityTracker()
@@ -0,0 +1,172 @@
+"""
+Queue wait-time estimation learned from observed job timings
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from app.models.quantum_models import QuantumJob
+from app.services.columnar_job_store import to_epoch
+from app.utils.helpers import record_field
+
+logger = logging.getLogger(__name__)
+
+# z-score of the 90th percentile of a standard normal distribution
+Z_P90 = 1.2815515655446004
+
+# Observed timing -> the job timestamps it spans
+TIMINGS = {'queue': ('creation_date', 'start_time'), 'service': ('start_time', 'end_time')}
+
+def _durations(starts: List[Optional[datetime]], ends: List[Optional[datetime]]) -> np.ndarray:
+    """Positive durations in seconds between paired timestamps (naive values are UTC), skipping incomplete pairs"""
+    pairs = [(to_epoch(s), to_epoch(e)) for s, e in zip(starts, ends) if s is not None and e is not None]
+    if not pairs:
+        return np.empty(0)
+    values = np.array(pairs, dtype=np.float64)
+    durations = values[:, 1] - values[:, 0]
+    return durations[durations > 0]
+
+class DurationWindow:
+    """Fixed-size window of the most recent duration observations"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.values = np.empty(capacity, dtype=np.float64)
+        self.head = 0
+        self.size = 0
+
+    def extend(self, durations: np.ndarray):
+        durations = durations[-self.capacity:]
+        if len(durations) == 0:
+            return
+        positions = (self.head + np.arange(len(durations))) % self.capacity
+        self.values[positions] = durations
+        self.head = (self.head + len(durations)) % self.capacity
+        self.size = min(self.size + len(durations), self.capacity)
+
+    def data(self) -> np.ndarray:
+        return self.values[:self.size]
+
+class BackendTimingStats:
+    """Learned queue-time and service-time distribution for one backend"""
+
+    def __init__(self, capacity: int):
+        self.queue_times = DurationWindow(capacity)
+        self.service_times = DurationWindow(capacity)
+        self.summary: Dict[str, Optional[float]] = {}
+
+    def refresh(self):
+        """Recompute the distribution summary from the current windows"""
+        queue = self.queue_times.data()
+        service = self.service_times.data()
+        self.summary = {
+            'queue_mean': float(queue.mean()) if queue.size else None,
+            'queue_p90': float(np.percentile(queue, 90)) if queue.size else None,
+            'service_mean': float(service.mean()) if service.size else None,
+            'service_std': float(service.std()) if service.size else None,
+            'service_p90': float(np.percentile(service, 90)) if service.size else None,
+            'queue_samples': int(queue.size),
+            'service_samples': int(service.size),
+        }
+
+class WaitTimeEstimator:
+    """Per-backend wait-time model.
+
+    Each backend keeps a window of recent queue times (start_time - creation_date)
+    and service times (end_time - start_time). A job submitted now waits for the
+    pending_jobs ahead of it, so its expected wait is pending * mean service time;
+    the p90 uses the normal approximation of that sum. Backends without service
+    time observations fall back to the observed queue-time distribution.
+    """
+
+    def __init__(self, window_size: int = 5000):
+        self.window_size = window_size
+        self.stats: Dict[str, BackendTimingStats] = {}
+        self.estimates: Dict[str, Dict[str, Any]] = {}
+
+    def observe_jobs(self, jobs: Iterable[Any], timings: Sequence[str] = tuple(TIMINGS)):
+        """Learn from jobs (dicts or QuantumJob rows) that carry timing information.
+
+        Each timing of a job must be observed once: pass only 'queue' for jobs
+        that just started and only 'service' for jobs that just finished.
+        """
+        by_backend: Dict[str, List[Any]] = {}
+        for job in jobs:
+            if record_field(job, 'start_time') is None:
+                continue
+            by_backend.setdefault(record_field(job, 'backend_name') or 'unknown', []).append(job)
+
+        for backend_name, backend_jobs in by_backend.items():
+            stats = self.stats.get(backend_name)
+            if stats is None:
+                stats = self.stats[backend_name] = BackendTimingStats(self.window_size)
+
+            windows = {'queue': stats.queue_times, 'service': stats.service_times}
+            for timing in timings:
+                begin, finish = TIMINGS[timing]
+                windows[timing].extend(_durations(
+                    [record_field(job, begin) for job in backend_jobs], [record_field(job, finish) for job in backend_jobs]
+                ))
+            stats.refresh()
+            self._reestimate(backend_name)
+
+    def _reestimate(self, backend_name: str):
+        """Recompute a cached estimate after the distribution moved, keeping the last synced pending_jobs"""
+        cached = self.estimates.pop(backend_name, None)
+        if cached is not None:
+            self.estimate(backend_name, cached['pending_jobs'])
+
+    def load_history(self, db: Session, limit: int = 50000):
+        """(Re)seed the model from the most recently started jobs in the database"""
+        self.stats = {}
+        jobs = db.query(
+            QuantumJob.backend_name, QuantumJob.creation_date, QuantumJob.start_time, QuantumJob.end_time
+        ).filter(QuantumJob.start_time.isnot(None)).order_by(desc(QuantumJob.start_time)).limit(limit).all()
+
+        # Oldest first so the most recent observations end up at the head of each window
+        self.observe_jobs([job._asdict() for job in reversed(jobs)])
+        for backend_name in list(self.estimates):
+            self._reestimate(backend_name)
+        logger.info(f"Wait-time estimator loaded {len(jobs)} historical jobs for {len(self.stats)} backends")
+
+    def estimate(self, backend_name: str, pending_jobs: Optional[int]) -> Dict[str, Any]:
+        """Expected and p90 wait (seconds) for a job submitted to backend_name now"""
+        pending = int(pending_jobs or 0)
+        cached = self.estimates.get(backend_name)
+        if cached is not None and cached['pending_jobs'] == pending:
+            return cached
+
+        summary = self.stats[backend_name].summary if backend_name in self.stats else {}
+        expected = p90 = None
+        if summary.get('service_mean') is not None:
+            mean, std = summary['service_mean'], summary['service_std']
+            expected = pending * mean
+            if pending == 1:
+                p90 = summary['service_p90']
+            else:
+                p90 = expected + Z_P90 * np.sqrt(pending) * std
+        elif summary.get('queue_mean') is not None:
+            expected, p90 = summary['queue_mean'], summary['queue_p90']
+
+        result = {
+            'backend_name': backend_name,
+            'pending_jobs': pending,
+            'average_wait_time': summary.get('queue_mean'),
+            'estimated_wait_time': expected,
+            'p90_wait_time': max(float(p90), expected) if p90 is not None else None,
+            'queue_time_samples': summary.get('queue_samples', 0),
+            'service_time_samples': summary.get('service_samples', 0),
+        }
+        self.estimates[backend_name] = result
+        return result
+
+    def get_estimates(self) -> List[Dict[str, Any]]:
+        """All cached estimates, as of the last queue sync"""
+        return list(self.estimates.values())
+
+# Global instance
+wait_time_estimator = WaitTimeEstimator()
@@ -2,7 +2,8 @@
 Utility functions for data processing and formatting
 """
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, IO, List, Optional
+import fcntl
 import json
 
 def format_timestamp(dt: Optional[datetime]) -> Optional[str]:
@@ -22,6 +23,21 @@ def parse_timestamp(timestamp_str: Optional[str]) -> Optional[datetime]:
     except (ValueError, AttributeError):
         return None
 
+def record_field(record: Any, name: str, default: Any = None) -> Any:
+    """Read a field from either a dict or an ORM row (job, backend, ...); `default` when missing or None"""
+    value = record.get(name) if isinstance(record, dict) else getattr(record, name, None)
+    return default if value is None else value
+
+def try_lock_file(path: str) -> Optional[IO]:
+    """Exclusive non-blocking lock on a file; held until the returned file is closed or the process exits"""
+    lock = open(path, 'w')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
 def safe_json_loads(json_str: Optional[str]) -> Optional[Dict[str, Any]]:
     """Safely parse JSON string"""
     if not json_str:
@@ -69,6 +85,12 @@ def calculate_wait_time_category(wait_time: Optional[float]) -> str:
     else:
         return "long"
 
+def parse_csv_param(value: Optional[str]) -> List[str]:
+    """Split a comma-separated query parameter into its non-empty items"""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(',') if item.strip()]
+
 def sanitize_backend_name(name: str) -> str:
     """Sanitize backend name for safe usage"""
     return name.lower().replace(' ', '_').replace('-', '_')
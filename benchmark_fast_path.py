@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the ORM read path against the Core/bulk-serialization fast path
+
+Usage:
+    python benchmark_fast_path.py
+    python benchmark_fast_path.py --jobs 20000 --page-size 1000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.schemas.quantum_schemas import FilterParams
+from app.services.bulk_import_service import BulkImportService
+from app.services.database_service import DatabaseService
+from app.services.fast_read_service import FastReadService, ORJSON_AVAILABLE
+
+STATUSES = ["DONE", "DONE", "DONE", "ERROR", "CANCELLED", "RUNNING", "QUEUED"]
+BACKENDS = ["ibm_brisbane", "ibm_kyoto", "ibm_osaka", "ibm_sherbrooke"]
+
+def synthetic_jobs(count: int):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        created = start + timedelta(minutes=i)
+        yield {
+            "job_id": f"bench-{i:08d}",
+            "name": f"benchmark-job-{i}",
+            "backend_name": random.choice(BACKENDS),
+            "status": random.choice(STATUSES),
+            "creation_date": created,
+            "start_time": created + timedelta(seconds=random.randint(10, 3600)),
+            "end_time": created + timedelta(seconds=random.randint(3700, 7200)),
+            "tags": [f"team-{i % 7}", "benchmark"],
+            "user_id": f"user-{i % 50}",
+            "shots": random.choice([1024, 2048, 4096, 8192]),
+            "circuits": random.randint(1, 20),
+            "usage": {"quantum_seconds": round(random.random() * 10, 3)},
+        }
+
+def orm_page(db, filters: FilterParams) -> bytes:
+    """Previous path: ORM rows, from_orm per row, response_model encoding"""
+    result = asyncio.run(DatabaseService(db).get_jobs(filters))
+    return json.dumps(jsonable_encoder(result)).encode()
+
+def fast_page(db, filters: FilterParams) -> bytes:
+    return FastReadService(db).jobs_page(filters)
+
+def measure(name: str, func, db, filters: FilterParams, repeat: int):
+    func(db, filters)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        payload = func(db, filters)
+    elapsed = (time.perf_counter() - start) / repeat
+    rows = filters.per_page / elapsed
+    print(f"   {name:<12} {elapsed * 1000:>9.2f} ms/page | {rows:>12,.0f} rows/s | {len(payload):>10,} bytes")
+    return rows, payload
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job list serialization paths")
+    parser.add_argument("--jobs", type=int, default=5000, help="Synthetic jobs to load")
+    parser.add_argument("--page-size", type=int, default=1000, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=10, help="Pages fetched per path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            BulkImportService(db).import_rows(synthetic_jobs(args.jobs))
+            filters = FilterParams(page=1, per_page=args.page_size)
+
+            print(f"⏱️  {args.page_size:,}-row page of {args.jobs:,} jobs, {args.repeat} runs "
+                  f"(serializer: {'orjson' if ORJSON_AVAILABLE else 'json'})")
+            print("=" * 60)
+            orm_rows, orm_payload = measure("ORM", orm_page, db, filters, args.repeat)
+            fast_rows, fast_payload = measure("fast path", fast_page, db, filters, args.repeat)
+            print("=" * 60)
+
+            same = json.loads(orm_payload) == json.loads(fast_payload)
+            print(f"{'✅' if same else '❌'} Identical JSON: {same} | speedup {fast_rows / orm_rows:.1f}x")
+        finally:
+            db.close()
+            engine.dispose()
+    return same
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Bulk import historical quantum job dumps (NDJSON or Parquet)
+
+Usage:
+    python import_jobs.py jobs.ndjson
+    python import_jobs.py jobs.parquet --chunk-size 10000
+"""
+import argparse
+import logging
+import sys
+
+from app.core.cache import data_generation
+from app.core.database import SessionLocal, engine, Base
+from app.services.bulk_import_service import BulkImportService, iter_ndjson, iter_parquet
+from app.services.job_state import build_job_tables
+
+def print_progress(progress):
+    print(
+        f"   📦 {progress.rows_read:>10,} read | {progress.rows_inserted:>10,} inserted | "
+        f"{progress.rows_skipped:>8,} skipped | {progress.rows_per_second:>10,.0f} rows/s",
+        flush=True
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import historical quantum jobs")
+    parser.add_argument("path", help="Path to an NDJSON (.ndjson/.jsonl) or Parquet (.parquet) file")
+    parser.add_argument("--format", choices=["ndjson", "parquet"], help="Input format (defaults to file extension)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per INSERT batch")
+    parser.add_argument("--chunks-per-transaction", type=int, default=20, help="Chunks committed together")
+    parser.add_argument("--keep-indexes", action="store_true", help="Maintain secondary indexes during the load")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    input_format = args.format or ("parquet" if args.path.endswith(".parquet") else "ndjson")
+
+    print(f"🚚 Importing {input_format} jobs from {args.path}")
+    print("=" * 60)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        service = BulkImportService(
+            db,
+            chunk_size=args.chunk_size,
+            chunks_per_transaction=args.chunks_per_transaction,
+            defer_indexes=not args.keep_indexes,
+            progress_callback=print_progress
+        )
+        if input_format == "parquet":
+            progress = service.import_rows(iter_parquet(args.path))
+        else:
+            with open(args.path, "rb") as stream:
+                progress = service.import_rows(iter_ndjson(stream))
+        build_job_tables(db, rebuild=True)
+        # Invalidates cached job responses of running workers only when they share the Redis tier
+        data_generation.bump('jobs')
+    except Exception as e:
+        print(f"   ❌ Import failed: {e}")
+        return False
+    finally:
+        db.close()
+
+    summary = progress.to_dict()
+    print("=" * 60)
+    print(f"✅ Imported {summary['rows_inserted']:,} of {summary['rows_read']:,} rows "
+          f"in {summary['elapsed_seconds']}s ({summary['rows_per_second']:,.0f} rows/s)")
+    print("   ℹ️  Restart running API workers to reload their in-memory job models and dashboard")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)